@@ -0,0 +1,109 @@
+# --- app/config.py ---
+# Pengaturan aplikasi dari file pos.ini (opsional) + override lewat environment variable.
+#
+#   [receipt]
+#   backend = escpos          ; pdf | text | escpos
+#   width = 32                ; jumlah karakter per baris (58mm = 32, 80mm = 48)
+#   target = /dev/usb/lp0     ; escpos: path device/file, atau tcp://host:9100
+#   folder =                  ; folder output pdf/text (default ~/Downloads)
+#   lane =                    ; id kasir/terminal ini (default nama komputer); struk hanya dicetak di lane-nya
+#
+#   [export]
+#   pdf_workers = 0           ; proses render katalog PDF (0 = otomatis, 1 = tanpa paralel)
+#   threads = 1               ; thread untuk export/import file (terpisah dari thread kasir)
+#
+#   [startup]
+#   report = 0                ; 1 = cetak laporan waktu startup ke stderr
+#   budget_ms = 2000
+#
+#   [report]
+#   cache_entries = 128       ; hasil query laporan yang disimpan di memori (LRU)
+#   cache_file =              ; file cache bulan yang sudah lewat; kosong = hanya di memori
+#
+#   [forecast]
+#   method = ewma             ; ewma | sma (perkiraan penjualan per hari)
+#   lead_time_days = 7        ; lihat app/services/forecast.py untuk opsi lain
+#
+#   [profiling]
+#   enabled = 0               ; 1 = catat query lambat & waktu navigasi layar ke log
+#   slow_query_ms = 100       ; lihat app/perflog.py untuk opsi lain
+#
+# Environment variable memakai pola POS_<SECTION>_<KEY>, mis. POS_RECEIPT_BACKEND=text.
+
+import os
+import configparser
+from pathlib import Path
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "pos.ini"
+
+DEFAULTS = {
+    "receipt": {
+        "backend": "pdf",
+        "width": "32",
+        "target": "",
+        "folder": "",
+        "lane": "",
+    },
+    "export": {
+        "pdf_workers": "0",
+        "threads": "1",
+    },
+    "startup": {
+        "report": "0",
+        "budget_ms": "2000",
+    },
+    "report": {
+        "cache_entries": "128",
+        "cache_file": "",
+    },
+    "forecast": {
+        "method": "ewma",
+        "window": "28",
+        "alpha": "0.1",
+        "history_days": "730",
+        "lead_time_days": "7",
+        "target_days": "30",
+    },
+    "profiling": {
+        "enabled": "0",
+        "slow_query_ms": "100",
+        "explain": "1",
+        "log_file": "pos_perf.log",
+        "max_kb": "1024",
+        "backups": "3",
+    },
+}
+
+_config = None
+
+
+def load_config(path=None):
+    """Baca ulang file konfigurasi (dipanggil otomatis saat pertama kali dibutuhkan)."""
+    global _config
+    config = configparser.ConfigParser()
+    config.read_dict(DEFAULTS)
+    config.read(path or os.environ.get("POS_CONFIG") or CONFIG_PATH, encoding="utf-8")
+    _config = config
+    return config
+
+
+def get_setting(section, key, fallback=None):
+    env = os.environ.get(f"POS_{section.upper()}_{key.upper()}")
+    if env is not None:
+        return env
+    config = _config or load_config()
+    return config.get(section, key, fallback=fallback)
+
+
+def get_int_setting(section, key, fallback=0):
+    try:
+        return int(get_setting(section, key, fallback))
+    except (TypeError, ValueError):
+        return fallback
+
+
+def get_bool_setting(section, key, fallback=False):
+    value = get_setting(section, key, None)
+    if value is None:
+        return fallback
+    return value.strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,16 @@
+# --- app/database/backfill.py ---
+# Hitung ulang tabel rollup penjualan dari data mentah.
+# Jalankan: python -m app.database.backfill
+
+from app.database.db import init_db, rebuild_rollups, close_connections, DB_PATH
+
+
+def main():
+    init_db()
+    rebuild_rollups()
+    close_connections()
+    print(f"Rollup penjualan selesai dibangun ulang: {DB_PATH}")
+
+
+if __name__ == "__main__":
+    main()
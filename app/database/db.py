@@ -1,104 +1,941 @@
 # --- app/database/db.py ---
 
+import re
+import random
+import socket
 import sqlite3
+import threading
+import time
+import queue
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from app.config import get_setting
+from app.database.profiling import connection_factory, log_query_summary
+
 DB_PATH = Path(__file__).resolve().parent.parent.parent / "pos.db"
 
+# Pengaturan PRAGMA yang dipasang sekali per koneksi saat dibuka
+READER_POOL_SIZE = 3
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 20000           # ~20 MB page cache per koneksi
+MMAP_SIZE = 256 * 1024 * 1024   # 256 MB memory-mapped I/O
+FETCH_BATCH = 2000              # baris per fetchmany saat streaming hasil query
+
+# Checkout dari beberapa kasir: ulangi transaksi jika database sedang dikunci lane lain
+CHECKOUT_RETRIES = 5
+CHECKOUT_BACKOFF = 0.05         # detik, digandakan setiap percobaan
+
+# Antrian cetak struk
+RECEIPT_MAX_ATTEMPTS = 5
+RECEIPT_RETRY_SECONDS = 10      # jeda dasar sebelum job gagal dicoba lagi
+
 
 # ------------------------------
-# CONNECT & INIT DATABASE
+# CONNECTION MANAGER
 # ------------------------------
-def get_connection():
-    return sqlite3.connect(DB_PATH)
+class ConnectionManager:
+    """Menyimpan koneksi SQLite yang berumur panjang.
+
+    Satu koneksi writer (dijaga lock) dan beberapa koneksi reader di pool.
+    Semua koneksi memakai mode autocommit; transaksi dibuka eksplisit
+    lewat ``transaction()`` sehingga BEGIN/COMMIT selalu jelas.
+    """
+
+    def __init__(self, db_path=None, readers=READER_POOL_SIZE):
+        self.db_path = Path(db_path or DB_PATH)
+        self._write_lock = threading.RLock()
+        self._depth = 0             # kedalaman transaction() yang sedang berjalan (dijaga _write_lock)
+        self._writer = self._connect()
+        # WAL cukup di-set sekali; tersimpan permanen di file database
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._readers = queue.LifoQueue()
+        self._all_readers = []
+        for _ in range(readers):
+            conn = self._connect()
+            self._readers.put(conn)
+            self._all_readers.append(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            factory=connection_factory(),   # instrumentasi query jika [profiling] aktif
+        )
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """Pinjam koneksi baca dari pool, kembalikan setelah selesai."""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """Buka transaksi tulis di koneksi writer; commit otomatis atau rollback jika error."""
+        with self._write_lock:
+            conn = self._writer
+            if self._depth:
+                # transaksi bersarang: ikut transaksi yang sudah berjalan
+                self._depth += 1
+                try:
+                    yield conn
+                finally:
+                    self._depth -= 1
+                return
+            if conn.in_transaction:
+                # sisa transaksi yang tidak selesai (mis. COMMIT gagal): jangan ikut terbawa
+                conn.rollback()
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            self._depth = 1
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                # termasuk COMMIT yang gagal (disk penuh, I/O error): writer harus kembali bersih
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                self._depth = 0
+
+    def close(self):
+        with self._write_lock:
+            # perbarui statistik query planner (murah, hanya tabel yang berubah)
+            self._writer.execute("PRAGMA optimize")
+            self._writer.close()
+        for conn in self._all_readers:
+            conn.close()
+        log_query_summary()
+
+
+_manager = None
+_manager_lock = threading.Lock()
 
 
+def get_manager():
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ConnectionManager()
+    return _manager
+
+
+def close_connections():
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+            _manager = None
+
+
+def read_connection():
+    """Context manager koneksi baca: ``with read_connection() as conn: ...``"""
+    return get_manager().reader()
+
+
+def stream_query(sql, params=(), batch_size=FETCH_BATCH):
+    """Generator batch baris hasil query (list per ``fetchmany``), memori tetap kecil.
+
+    Koneksi reader dipinjam selama generator berjalan; tutup generator
+    (atau habiskan) agar koneksi kembali ke pool.
+    """
+    with read_connection() as conn:
+        cursor = conn.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+
+def transaction(immediate=False):
+    """Context manager transaksi tulis: ``with transaction() as conn: ...``"""
+    return get_manager().transaction(immediate=immediate)
+
+
+# ------------------------------
+# VERSI DATA (untuk refresh layar)
+# ------------------------------
+_data_versions = {"products": 0, "sales": 0}
+_change_listeners = []
+_versions_lock = threading.Lock()
+
+
+def mark_changed(*kinds):
+    """Naikkan versi data ("products" / "sales") setelah perubahan di-commit.
+
+    Layar yang sedang disembunyikan membandingkan versi ini saat ditampilkan
+    lagi, sehingga hanya data yang berubah yang dimuat ulang. Listener
+    dipanggil di thread yang melakukan perubahan (bisa thread worker).
+    """
+    with _versions_lock:
+        for kind in kinds:
+            _data_versions[kind] = _data_versions.get(kind, 0) + 1
+        listeners = list(_change_listeners)
+    for listener in listeners:
+        listener(kinds)
+
+
+def data_versions():
+    with _versions_lock:
+        return dict(_data_versions)
+
+
+def add_change_listener(listener):
+    with _versions_lock:
+        _change_listeners.append(listener)
+
+
+def remove_change_listener(listener):
+    with _versions_lock:
+        if listener in _change_listeners:
+            _change_listeners.remove(listener)
+
+
+# ------------------------------
+# INIT DATABASE
+# ------------------------------
 def init_db():
-    conn = get_connection()
-    cur = conn.cursor()
+    with transaction() as conn:
+        cur = conn.cursor()
+
+        # Tabel produk
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            stock INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+            barcode TEXT,
+            reorder_level INTEGER NOT NULL DEFAULT 0
+        )
+        """)
+
+        # Migrasi database lama: kolom barcode/SKU dan batas restock
+        columns = {row[1] for row in cur.execute("PRAGMA table_info(products)")}
+        if "barcode" not in columns:
+            cur.execute("ALTER TABLE products ADD COLUMN barcode TEXT")
+        if "reorder_level" not in columns:
+            cur.execute("ALTER TABLE products ADD COLUMN reorder_level INTEGER NOT NULL DEFAULT 0")
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_products_barcode ON products(barcode)")
+        # Import CSV mencocokkan produk tanpa barcode berdasarkan nama (tanpa beda huruf besar/kecil)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_products_name ON products(name COLLATE NOCASE)")
+
+        # Tabel penjualan
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_date TEXT NOT NULL,
+            total REAL NOT NULL
+        )
+        """)
+
+        # Tabel detail item penjualan
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS sales_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            qty INTEGER NOT NULL,
+            price REAL NOT NULL,
+            FOREIGN KEY(sale_id) REFERENCES sales(id),
+            FOREIGN KEY(product_id) REFERENCES products(id)
+        )
+        """)
+
+        # Index untuk laporan (range tanggal) & join detail item
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sales_sale_date ON sales(sale_date)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sales_items_sale_id ON sales_items(sale_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sales_items_product_id ON sales_items(product_id)")
+
+        # Tabel rollup (ringkasan) yang diperbarui setiap transaksi disimpan
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS sales_daily (
+            day TEXT PRIMARY KEY,
+            sales_count INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            items_qty INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS sales_monthly (
+            month TEXT PRIMARY KEY,
+            sales_count INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            items_qty INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS sales_product_daily (
+            day TEXT NOT NULL,
+            product_id INTEGER NOT NULL,
+            qty INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, product_id)
+        ) WITHOUT ROWID
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS sales_hourly (
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            sales_count INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            items_qty INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, hour)
+        ) WITHOUT ROWID
+        """)
+
+        # Database lama (sebelum ada rollup / rollup per jam): isi sekali dari data mentah
+        needs_backfill = cur.execute("""
+            SELECT EXISTS (SELECT 1 FROM sales)
+               AND (NOT EXISTS (SELECT 1 FROM sales_daily) OR NOT EXISTS (SELECT 1 FROM sales_hourly))
+        """).fetchone()[0]
+        if needs_backfill:
+            _rebuild_rollups(cur)
+
+        _create_low_stock_watchlist(cur)
+
+        # Antrian struk: diisi di dalam transaksi checkout, dicetak oleh worker background
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS receipt_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_id INTEGER NOT NULL,
+            amount_paid REAL NOT NULL,
+            change REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT NOT NULL,
+            last_error TEXT,
+            file_path TEXT,
+            created_at TEXT NOT NULL,
+            lane TEXT NOT NULL DEFAULT '',
+            claimed_by TEXT,
+            FOREIGN KEY(sale_id) REFERENCES sales(id)
+        )
+        """)
+        # Migrasi: lane pemilik job & lane yang sedang mencetaknya (beberapa kasir berbagi pos.db)
+        columns = {row[1] for row in cur.execute("PRAGMA table_info(receipt_jobs)")}
+        if "lane" not in columns:
+            cur.execute("ALTER TABLE receipt_jobs ADD COLUMN lane TEXT NOT NULL DEFAULT ''")
+        if "claimed_by" not in columns:
+            cur.execute("ALTER TABLE receipt_jobs ADD COLUMN claimed_by TEXT")
+        cur.execute("DROP INDEX IF EXISTS idx_receipt_jobs_pending")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_receipt_jobs_lane ON receipt_jobs(lane, status, next_attempt_at)"
+        )
+
+        _create_product_search(cur)
+
+
+def _create_product_search(cur):
+    """Index FTS5 untuk nama produk, disinkronkan oleh trigger pada tabel products."""
+    global FTS_ENABLED
+    exists = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'products_fts'"
+    ).fetchone()
+    try:
+        cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            name,
+            content='products',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite tanpa FTS5: pencarian jatuh ke LIKE biasa
+        FTS_ENABLED = False
+        return
+    FTS_ENABLED = True
 
-    # Tabel produk
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS products (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        price REAL NOT NULL,
-        stock INTEGER NOT NULL DEFAULT 0,
-        created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
-    )
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO products_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """)
+
+    # Index baru dibuat: isi dari produk yang sudah ada
+    if not exists:
+        cur.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+
+# ------------------------------
+# RANGE TANGGAL (half-open: start <= sale_date < end)
+# ------------------------------
+def day_range(day=None):
+    """Batas satu hari, mis. ('2025-10-05', '2025-10-06')."""
+    day = day or datetime.now().date()
+    return day.isoformat(), (day + timedelta(days=1)).isoformat()
+
+
+def month_range(year, month):
+    """Batas satu bulan, mis. ('2025-10-01', '2025-11-01')."""
+    start = f"{year:04d}-{month:02d}-01"
+    if month == 12:
+        end = f"{year + 1:04d}-01-01"
+    else:
+        end = f"{year:04d}-{month + 1:02d}-01"
+    return start, end
+
+
+def recent_months(count, today=None):
+    """Daftar 'YYYY-MM' untuk ``count`` bulan terakhir (termasuk bulan ini), urut naik."""
+    today = today or datetime.now().date()
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append(f"{year:04d}-{month:02d}")
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return months[::-1]
+
+
+# ------------------------------
+# SIMPAN TRANSAKSI & ROLLUP
+# ------------------------------
+class InsufficientStockError(Exception):
+    """Stok satu baris keranjang tidak cukup saat checkout (transaksi dibatalkan)."""
+
+    def __init__(self, line, product_id, name, requested, available):
+        self.line = line
+        self.product_id = product_id
+        self.name = name
+        self.requested = requested
+        self.available = available
+        super().__init__(
+            f"Stok {name} tidak cukup: diminta {requested}, tersedia {available}."
+        )
+
+
+def is_busy_error(error):
+    """True jika error berasal dari SQLITE_BUSY / SQLITE_LOCKED (database dipakai koneksi lain)."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (5, 6)  # SQLITE_BUSY, SQLITE_LOCKED (+ extended code)
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def save_sale(items, sale_date=None, payment=None):
+    """Simpan satu transaksi beserta detail item, stok, dan rollup dalam satu transaksi DB.
+
+    ``items`` berisi tuple ``(product_id, qty, price)``. Mengembalikan id transaksi.
+
+    Transaksi dibuka dengan BEGIN IMMEDIATE sehingga kunci tulis diambil di awal,
+    lalu stok dipotong dengan syarat ``stock >= qty``. Jika satu baris gagal,
+    seluruh transaksi di-rollback dan ``InsufficientStockError`` dilempar.
+    Jika database sedang dikunci kasir lain, transaksi diulang dengan jeda bertahap.
+
+    ``payment`` = ``(amount_paid, change)``: jika diisi, job cetak struk ikut
+    dimasukkan ke antrian dalam transaksi yang sama.
+    """
+    sale_date = sale_date or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    for attempt in range(CHECKOUT_RETRIES):
+        try:
+            sale_id = _save_sale(items, sale_date, payment)
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e) or attempt == CHECKOUT_RETRIES - 1:
+                raise
+            time.sleep(CHECKOUT_BACKOFF * (2 ** attempt) * (1 + random.random()))
+        else:
+            mark_changed("sales", "products")
+            return sale_id
+
+
+def _save_sale(items, sale_date, payment):
+    total = sum(qty * price for _, qty, price in items)
+
+    with transaction(immediate=True) as conn:
+        cursor = conn.cursor()
+
+        # Validasi ulang stok di dalam transaksi: hanya berhasil jika stok masih cukup
+        for line, (pid, qty, _) in enumerate(items):
+            cursor.execute(
+                "UPDATE products SET stock = stock - ? WHERE id = ? AND stock >= ?",
+                (qty, pid, qty)
+            )
+            if cursor.rowcount == 0:
+                row = cursor.execute("SELECT name, stock FROM products WHERE id = ?", (pid,)).fetchone()
+                name, available = row if row else (f"#{pid}", 0)
+                raise InsufficientStockError(line, pid, name, qty, available)
+
+        cursor.execute("INSERT INTO sales (sale_date, total) VALUES (?, ?)", (sale_date, total))
+        sale_id = cursor.lastrowid
+
+        cursor.executemany(
+            "INSERT INTO sales_items (sale_id, product_id, qty, price) VALUES (?, ?, ?, ?)",
+            [(sale_id, pid, qty, price) for pid, qty, price in items]
+        )
+
+        apply_sale_rollups(cursor, sale_date, items)
+
+        if payment is not None:
+            enqueue_receipt(cursor, sale_id, *payment)
+
+    return sale_id
+
+
+# ------------------------------
+# ANTRIAN STRUK
+# ------------------------------
+# Setiap job milik lane (kasir) yang membuatnya dan hanya dicetak oleh spooler lane itu.
+# Job diklaim dulu (status 'printing' + claimed_by) dengan UPDATE bersyarat sebelum
+# dicetak, jadi satu job tidak pernah dicetak dua kali walaupun beberapa lane
+# memakai pos.db yang sama. Job dari database lama (lane '') boleh diklaim lane mana pun.
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def receipt_lane():
+    """Id lane/terminal ini: ``[receipt] lane`` di pos.ini (env POS_RECEIPT_LANE), default nama komputer."""
+    return get_setting("receipt", "lane", "").strip() or socket.gethostname()
+
+
+def enqueue_receipt(cursor, sale_id, amount_paid, change, lane=None):
+    """Masukkan job cetak struk ke antrian (memakai cursor transaksi yang sedang berjalan)."""
+    now = _now()
+    cursor.execute("""
+        INSERT INTO receipt_jobs (sale_id, amount_paid, change, next_attempt_at, created_at, lane)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (sale_id, amount_paid, change, now, now, lane or receipt_lane()))
+    return cursor.lastrowid
+
+
+def enqueue_reprint(sale_id):
+    """Antrikan cetak ulang struk. Mengembalikan id job, atau None jika transaksi tidak ada."""
+    with transaction() as conn:
+        sale = conn.execute("SELECT total FROM sales WHERE id = ?", (sale_id,)).fetchone()
+        if sale is None:
+            return None
+        # Pakai data pembayaran dari job terakhir; transaksi lama dianggap uang pas
+        last = conn.execute(
+            "SELECT amount_paid, change FROM receipt_jobs WHERE sale_id = ? ORDER BY id DESC LIMIT 1",
+            (sale_id,)
+        ).fetchone()
+        amount_paid, change = last if last else (sale[0], 0)
+        return enqueue_receipt(conn.cursor(), sale_id, amount_paid, change)
+
+
+def claim_due_receipt_jobs(limit=20, lane=None):
+    """Klaim job lane ini yang sudah waktunya dicetak (urut sesuai antrian).
+
+    Setiap job diambil dengan ``UPDATE ... WHERE status = 'pending'``; job yang
+    sudah diklaim spooler lain dilewati. Mengembalikan job yang berhasil diklaim:
+    [(id, sale_id, amount_paid, change, attempts)].
+    """
+    lane = lane or receipt_lane()
+    claimed = []
+    with transaction(immediate=True) as conn:
+        jobs = conn.execute("""
+            SELECT id, sale_id, amount_paid, change, attempts FROM receipt_jobs
+            WHERE lane IN (?, '') AND status = 'pending' AND next_attempt_at <= ?
+            ORDER BY id LIMIT ?
+        """, (lane, _now(), limit)).fetchall()
+        for job in jobs:
+            cursor = conn.execute(
+                "UPDATE receipt_jobs SET status = 'printing', claimed_by = ? WHERE id = ? AND status = 'pending'",
+                (lane, job[0])
+            )
+            if cursor.rowcount == 1:
+                claimed.append(job)
+    return claimed
+
+
+def requeue_interrupted_receipts(lane=None):
+    """Job yang masih 'printing' milik lane ini (aplikasi tertutup saat mencetak) dikembalikan ke antrian."""
+    with transaction() as conn:
+        return conn.execute(
+            "UPDATE receipt_jobs SET status = 'pending', claimed_by = NULL WHERE status = 'printing' AND claimed_by = ?",
+            (lane or receipt_lane(),)
+        ).rowcount
+
+
+def requeue_receipt_job(job_id):
+    """Lepas klaim satu job yang belum sempat dicetak."""
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE receipt_jobs SET status = 'pending', claimed_by = NULL WHERE id = ? AND status = 'printing'",
+            (job_id,)
+        )
+
+
+def count_pending_receipts(lane=None):
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM receipt_jobs WHERE lane IN (?, '') AND status = 'pending'",
+            (lane or receipt_lane(),)
+        ).fetchone()[0]
+
+
+def get_receipt_data(sale_id):
+    """Ambil (sale_date, items) untuk struk; items berisi (name, price, qty, total)."""
+    with read_connection() as conn:
+        sale = conn.execute("SELECT sale_date FROM sales WHERE id = ?", (sale_id,)).fetchone()
+        if sale is None:
+            return None
+        items = conn.execute("""
+            SELECT COALESCE(p.name, 'Produk #' || si.product_id), si.price, si.qty, si.price * si.qty
+            FROM sales_items si
+            LEFT JOIN products p ON p.id = si.product_id
+            WHERE si.sale_id = ?
+            ORDER BY si.id
+        """, (sale_id,)).fetchall()
+    return sale[0], items
+
+
+def mark_receipt_done(job_id, file_path):
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE receipt_jobs SET status = 'done', file_path = ?, last_error = NULL, claimed_by = NULL WHERE id = ?",
+            (str(file_path), job_id)
+        )
+
+
+def mark_receipt_failed(job_id, attempts, error):
+    """Catat kegagalan; job dicoba lagi dengan jeda bertahap sampai batas percobaan."""
+    attempts += 1
+    status = "failed" if attempts >= RECEIPT_MAX_ATTEMPTS else "pending"
+    retry_at = datetime.now() + timedelta(seconds=RECEIPT_RETRY_SECONDS * 2 ** (attempts - 1))
+    with transaction() as conn:
+        conn.execute("""
+            UPDATE receipt_jobs SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?,
+                claimed_by = NULL
+            WHERE id = ?
+        """, (status, attempts, str(error), retry_at.strftime("%Y-%m-%d %H:%M:%S"), job_id))
+    return status
+
+
+def apply_sale_rollups(cursor, sale_date, items):
+    """Tambahkan satu transaksi ke tabel rollup harian, per jam, bulanan, dan produk-harian."""
+    day, month, hour = sale_date[:10], sale_date[:7], int(sale_date[11:13] or 0)
+    revenue = sum(qty * price for _, qty, price in items)
+    qty_total = sum(qty for _, qty, _ in items)
+
+    cursor.execute("""
+        INSERT INTO sales_daily (day, sales_count, revenue, items_qty) VALUES (?, 1, ?, ?)
+        ON CONFLICT(day) DO UPDATE SET
+            sales_count = sales_count + 1,
+            revenue = revenue + excluded.revenue,
+            items_qty = items_qty + excluded.items_qty
+    """, (day, revenue, qty_total))
+    cursor.execute("""
+        INSERT INTO sales_hourly (day, hour, sales_count, revenue, items_qty) VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT(day, hour) DO UPDATE SET
+            sales_count = sales_count + 1,
+            revenue = revenue + excluded.revenue,
+            items_qty = items_qty + excluded.items_qty
+    """, (day, hour, revenue, qty_total))
+    cursor.execute("""
+        INSERT INTO sales_monthly (month, sales_count, revenue, items_qty) VALUES (?, 1, ?, ?)
+        ON CONFLICT(month) DO UPDATE SET
+            sales_count = sales_count + 1,
+            revenue = revenue + excluded.revenue,
+            items_qty = items_qty + excluded.items_qty
+    """, (month, revenue, qty_total))
+    cursor.executemany("""
+        INSERT INTO sales_product_daily (day, product_id, qty, revenue) VALUES (?, ?, ?, ?)
+        ON CONFLICT(day, product_id) DO UPDATE SET
+            qty = qty + excluded.qty,
+            revenue = revenue + excluded.revenue
+    """, [(day, pid, qty, qty * price) for pid, qty, price in items])
+
+
+def rebuild_rollups():
+    """Hitung ulang semua tabel rollup dari sales & sales_items (backfill sekali jalan)."""
+    with transaction() as conn:
+        _rebuild_rollups(conn.cursor())
+    mark_changed("sales")
+
+
+def _rebuild_rollups(cur):
+    cur.execute("DELETE FROM sales_daily")
+    cur.execute("DELETE FROM sales_monthly")
+    cur.execute("DELETE FROM sales_product_daily")
+    cur.execute("DELETE FROM sales_hourly")
+
+    cur.execute("""
+        INSERT INTO sales_daily (day, sales_count, revenue, items_qty)
+        SELECT
+            substr(s.sale_date, 1, 10),
+            COUNT(DISTINCT s.id),
+            IFNULL(SUM(si.qty * si.price), 0),
+            IFNULL(SUM(si.qty), 0)
+        FROM sales s
+        LEFT JOIN sales_items si ON s.id = si.sale_id
+        GROUP BY 1
+    """)
+    cur.execute("""
+        INSERT INTO sales_monthly (month, sales_count, revenue, items_qty)
+        SELECT substr(day, 1, 7), SUM(sales_count), SUM(revenue), SUM(items_qty)
+        FROM sales_daily
+        GROUP BY 1
     """)
+    cur.execute("""
+        INSERT INTO sales_product_daily (day, product_id, qty, revenue)
+        SELECT substr(s.sale_date, 1, 10), si.product_id, SUM(si.qty), SUM(si.qty * si.price)
+        FROM sales s
+        JOIN sales_items si ON s.id = si.sale_id
+        GROUP BY 1, 2
+    """)
+    cur.execute("""
+        INSERT INTO sales_hourly (day, hour, sales_count, revenue, items_qty)
+        SELECT
+            substr(s.sale_date, 1, 10),
+            CAST(substr(s.sale_date, 12, 2) AS INTEGER),
+            COUNT(DISTINCT s.id),
+            IFNULL(SUM(si.qty * si.price), 0),
+            IFNULL(SUM(si.qty), 0)
+        FROM sales s
+        LEFT JOIN sales_items si ON s.id = si.sale_id
+        GROUP BY 1, 2
+    """)
+
+
+# ------------------------------
+# WATCHLIST STOK MENIPIS
+# ------------------------------
+LOW_STOCK_LIMIT = 200
+DASHBOARD_LOW_STOCK_ITEMS = 10  # nama produk di tooltip kartu dashboard
 
-    # Tabel penjualan
+
+def _create_low_stock_watchlist(cur):
+    """Tabel low_stock berisi produk dengan stok <= reorder_level, dijaga oleh trigger.
+
+    Setiap perubahan stok (checkout, edit, import) memperbarui satu baris di sini,
+    jadi dashboard & kasir cukup membaca tabel kecil ini, bukan memindai semua produk.
+    """
+    is_new = cur.execute(
+        "SELECT NOT EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'low_stock')"
+    ).fetchone()[0]
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS sales (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        sale_date TEXT NOT NULL,
-        total REAL NOT NULL
+    CREATE TABLE IF NOT EXISTS low_stock (
+        product_id INTEGER PRIMARY KEY,
+        stock INTEGER NOT NULL,
+        reorder_level INTEGER NOT NULL,
+        since TEXT NOT NULL
     )
     """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_low_stock_stock ON low_stock(stock)")
 
-    # Tabel detail item penjualan
+    # Upsert bersama untuk INSERT & UPDATE; "since" dipertahankan selama produk tetap menipis
+    upsert = """
+        DELETE FROM low_stock WHERE product_id = NEW.id AND NEW.stock > NEW.reorder_level;
+        INSERT INTO low_stock (product_id, stock, reorder_level, since)
+        SELECT NEW.id, NEW.stock, NEW.reorder_level, datetime('now', 'localtime')
+        WHERE NEW.stock <= NEW.reorder_level
+        ON CONFLICT(product_id) DO UPDATE SET
+            stock = excluded.stock,
+            reorder_level = excluded.reorder_level;
+    """
+    cur.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_low_stock_insert AFTER INSERT ON products
+    BEGIN {upsert} END
+    """)
+    cur.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_low_stock_update AFTER UPDATE OF stock, reorder_level ON products
+    BEGIN {upsert} END
+    """)
     cur.execute("""
-    CREATE TABLE IF NOT EXISTS sales_items (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        sale_id INTEGER NOT NULL,
-        product_id INTEGER NOT NULL,
-        qty INTEGER NOT NULL,
-        price REAL NOT NULL,
-        FOREIGN KEY(sale_id) REFERENCES sales(id),
-        FOREIGN KEY(product_id) REFERENCES products(id)
-    )
+    CREATE TRIGGER IF NOT EXISTS trg_low_stock_delete AFTER DELETE ON products
+    BEGIN
+        DELETE FROM low_stock WHERE product_id = OLD.id;
+    END
     """)
 
-    conn.commit()
-    conn.close()
+    if is_new:
+        cur.execute("""
+            INSERT INTO low_stock (product_id, stock, reorder_level, since)
+            SELECT id, stock, reorder_level, datetime('now', 'localtime')
+            FROM products WHERE stock <= reorder_level
+        """)
+
+
+def get_low_stock(limit=LOW_STOCK_LIMIT):
+    """Produk menipis, stok paling sedikit dulu: [(id, name, stock, reorder_level)]."""
+    with read_connection() as conn:
+        return conn.execute("""
+            SELECT l.product_id, p.name, l.stock, l.reorder_level
+            FROM low_stock l
+            JOIN products p ON p.id = l.product_id
+            ORDER BY l.stock, l.product_id
+            LIMIT ?
+        """, (limit,)).fetchall()
+
+
+# ------------------------------
+# PENCARIAN PRODUK
+# ------------------------------
+FTS_ENABLED = True
+SEARCH_LIMIT = 200
+
+
+def search_tokens(text):
+    """Pecah kata kunci menjadi token huruf kecil, mis. 'Indomie  Goreng' -> ['indomie', 'goreng']."""
+    return re.findall(r"\w+", text.lower())
+
+
+def matches_search(name, text):
+    """Cek di Python apakah nama cocok dengan pencarian (semua token = awalan sebuah kata)."""
+    words = search_tokens(name)
+    return all(any(w.startswith(t) for w in words) for t in search_tokens(text))
+
+
+def search_products(text, limit=SEARCH_LIMIT):
+    """Cari produk dengan awalan kata (multi-kata = semua harus cocok), urut relevansi."""
+    tokens = search_tokens(text)
+    if not tokens:
+        return []
+
+    with read_connection() as conn:
+        if FTS_ENABLED:
+            match = " ".join(f'"{t}"*' for t in tokens)
+            return conn.execute("""
+                SELECT p.id, p.name, p.price, p.stock, p.barcode, p.reorder_level
+                FROM products_fts f
+                JOIN products p ON p.id = f.rowid
+                WHERE products_fts MATCH ?
+                ORDER BY f.rank
+                LIMIT ?
+            """, (match, limit)).fetchall()
+
+        where = " AND ".join("name LIKE ?" for _ in tokens)
+        return conn.execute(
+            f"SELECT id, name, price, stock, barcode, reorder_level FROM products WHERE {where} ORDER BY id LIMIT ?",
+            [f"%{t}%" for t in tokens] + [limit]
+        ).fetchall()
+
+
+def find_product_by_barcode(barcode):
+    """Satu lookup lewat unique index barcode.
+
+    Mengembalikan (id, name, price, stock, barcode, reorder_level) atau None.
+    """
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT id, name, price, stock, barcode, reorder_level FROM products WHERE barcode = ?", (barcode,)
+        ).fetchone()
+
+
+def lookup_products(text, limit=20):
+    """Produk untuk picker kasir: kode persis (barcode / id) lebih dulu, lalu awalan nama via FTS."""
+    text = text.strip()
+    results = []
+    with read_connection() as conn:
+        row = conn.execute(
+            "SELECT id, name, price, stock, barcode, reorder_level FROM products WHERE barcode = ?", (text,)
+        ).fetchone()
+        if row is None and text.isdigit():
+            row = conn.execute(
+                "SELECT id, name, price, stock, barcode, reorder_level FROM products WHERE id = ?", (int(text),)
+            ).fetchone()
+    if row:
+        results.append(row)
+
+    seen = {r[0] for r in results}
+    for row in search_products(text, limit):
+        if row[0] not in seen:
+            results.append(row)
+    return results[:limit]
 
 
 # ------------------------------
 # SIMPLE GETTER
 # ------------------------------
 def get_all_products():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT id, name, price, stock FROM products ORDER BY id")
-    rows = cur.fetchall()
-    conn.close()
+    with read_connection() as conn:
+        rows = conn.execute("SELECT id, name, price, stock FROM products ORDER BY id").fetchall()
     return [{"id": r[0], "name": r[1], "price": r[2], "stock": r[3]} for r in rows]
 
+
+# ------------------------------
+# CRUD PRODUK
+# ------------------------------
+def create_product(name, price, stock, barcode=None, reorder_level=0):
+    with transaction() as conn:
+        product_id = conn.execute(
+            "INSERT INTO products (name, price, stock, barcode, reorder_level) VALUES (?, ?, ?, ?, ?)",
+            (name, price, stock, barcode or None, reorder_level)
+        ).lastrowid
+    mark_changed("products")
+    return product_id
+
+
+def edit_product(product_id, name, price, stock, barcode=None, reorder_level=0):
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE products SET name=?, price=?, stock=?, barcode=?, reorder_level=? WHERE id=?",
+            (name, price, stock, barcode or None, reorder_level, product_id)
+        )
+    mark_changed("products")
+
+
+def remove_product(product_id):
+    with transaction() as conn:
+        conn.execute("DELETE FROM products WHERE id=?", (product_id,))
+    mark_changed("products")
+
 # =====================================================
 # 📈 Statistik untuk Dashboard
 # =====================================================
 def get_dashboard_stats():
-    conn = get_connection()
-    cursor = conn.cursor()
+    today, _ = day_range()
+    with read_connection() as conn:
+        cursor = conn.cursor()
 
-    # Jumlah produk
-    cursor.execute("SELECT COUNT(*) FROM products")
-    total_products = cursor.fetchone()[0]
+        # Jumlah produk
+        cursor.execute("SELECT COUNT(*) FROM products")
+        total_products = cursor.fetchone()[0]
 
-    # Transaksi hari ini
-    cursor.execute("""
-        SELECT COUNT(*)
-        FROM sales
-        WHERE DATE(sale_date) = DATE('now', 'localtime')
-    """)
-    sales_today = cursor.fetchone()[0]
+        # Transaksi & pendapatan hari ini (dari rollup harian, satu baris)
+        cursor.execute("SELECT sales_count, revenue FROM sales_daily WHERE day = ?", (today,))
+        row = cursor.fetchone()
+        sales_today, revenue_today = row if row else (0, 0)
 
-    # Total pendapatan hari ini
-    cursor.execute("""
-        SELECT IFNULL(SUM(si.qty * si.price), 0)
-        FROM sales s
-        JOIN sales_items si ON s.id = si.sale_id
-        WHERE DATE(s.sale_date) = DATE('now', 'localtime')
-    """)
-    revenue_today = cursor.fetchone()[0]
+        # Produk menipis (tabel watchlist kecil, dijaga trigger)
+        cursor.execute("SELECT COUNT(*) FROM low_stock")
+        low_stock = cursor.fetchone()[0]
 
-    conn.close()
     return {
         "products": total_products,
         "sales_today": sales_today,
-        "revenue_today": revenue_today
+        "revenue_today": revenue_today,
+        "low_stock": low_stock,
+        "low_stock_items": get_low_stock(DASHBOARD_LOW_STOCK_ITEMS) if low_stock else [],
     }
 
 
@@ -106,33 +943,16 @@ def get_dashboard_stats():
 # 📊 Pendapatan 3 Bulan Terakhir
 # =====================================================
 def get_last_3_months_revenue():
-    from datetime import datetime, timedelta
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT 
-            strftime('%Y-%m', s.sale_date) AS month,
-            SUM(si.qty * si.price) AS total
-        FROM sales s
-        JOIN sales_items si ON s.id = si.sale_id
-        WHERE s.sale_date >= DATE('now', '-3 months')
-        GROUP BY month
-        ORDER BY month
-    """)
-    data = cursor.fetchall()
-    conn.close()
+    months = recent_months(3)
+    with read_connection() as conn:
+        data = conn.execute(
+            "SELECT month, revenue FROM sales_monthly WHERE month >= ? AND month <= ?",
+            (months[0], months[-1])
+        ).fetchall()
 
     # ubah hasil DB ke dict: {'2025-08': 50000, '2025-10': 120000, ...}
     data_dict = {month: (total or 0) for month, total in data}
 
-    # buat list 3 bulan terakhir sesuai format DB
-    months = []
-    today = datetime.now().replace(day=1)
-    for i in range(2, -1, -1):
-        m = (today - timedelta(days=30 * i)).strftime("%Y-%m")
-        months.append(m)
-
     # isi pendapatan, kalau bulan hilang = 0
     formatted = [(m, data_dict.get(m, 0)) for m in months]
 
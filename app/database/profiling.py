@@ -0,0 +1,273 @@
+# --- app/database/profiling.py ---
+# Instrumentasi query SQLite: teks query, bentuk parameter, durasi dan jumlah baris.
+#
+# Jika [profiling] enabled = 1 (lihat app/perflog.py), ConnectionManager membuka
+# koneksi dengan InstrumentedConnection; kalau tidak, koneksi sqlite3 biasa dipakai
+# tanpa overhead apa pun. Durasi satu query = execute + semua fetch sampai hasilnya
+# habis (atau cursor ditutup/dibuang), jadi query yang di-stream per batch tetap
+# terukur utuh; waktu aplikasi mengolah baris di antara fetch tidak ikut dihitung.
+#
+# Query di atas ``slow_query_ms`` ditulis ke log performa, dan untuk SELECT yang
+# lambat disertakan EXPLAIN QUERY PLAN (sekali per teks query). Nilai parameter
+# tidak pernah dicatat, hanya bentuknya, mis. "tuple[3]" atau "many[120] x tuple[4]".
+
+import re
+import sqlite3
+import threading
+import time
+
+from app.config import get_int_setting, get_bool_setting
+from app.perflog import profiling_enabled, get_perf_logger
+
+SQL_LOG_CHARS = 600        # panjang maksimum teks query di log
+SUMMARY_QUERIES = 10       # query teratas (total waktu) di ringkasan saat koneksi ditutup
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Satu baris, spasi dirapikan: query yang sama dari tempat berbeda dihitung bersama."""
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def param_shape(params):
+    if params is None:
+        return "-"
+    if isinstance(params, dict):
+        return "dict{" + ",".join(sorted(params)) + "}"
+    try:
+        return f"{type(params).__name__}[{len(params)}]"
+    except TypeError:
+        return type(params).__name__
+
+
+def is_select(sql):
+    words = sql.split(None, 1)
+    return bool(words) and words[0].upper() in ("SELECT", "WITH")
+
+
+# ==========================================
+# PROFILER
+# ==========================================
+class QueryProfiler:
+    """Statistik per teks query + log query lambat. Dipanggil dari banyak thread."""
+
+    def __init__(self, slow_ms=100, explain=True, logger=None):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.logger = logger
+        self.total_queries = 0
+        self._stats = {}            # sql -> [jumlah, total_ms, max_ms, baris]
+        self._explained = set()
+        self._lock = threading.Lock()
+
+    def record(self, conn, sql, shape, params, elapsed_ms, rows):
+        sql = normalize_sql(sql)
+        slow = elapsed_ms >= self.slow_ms
+        with self._lock:
+            self.total_queries += 1
+            stats = self._stats.get(sql)
+            if stats is None:
+                stats = self._stats[sql] = [0, 0.0, 0.0, 0]
+            stats[0] += 1
+            stats[1] += elapsed_ms
+            stats[2] = max(stats[2], elapsed_ms)
+            stats[3] += max(rows, 0)
+            need_plan = (slow and self.explain and params is not None
+                         and is_select(sql) and sql not in self._explained)
+            if need_plan:
+                self._explained.add(sql)
+        if not slow or self.logger is None:
+            return
+
+        message = f"SLOW QUERY {elapsed_ms:.1f} ms rows={rows} params={shape} | {sql[:SQL_LOG_CHARS]}"
+        if need_plan:
+            message += "".join(f"\n    {line}" for line in explain_plan(conn, sql, params))
+        self.logger.info(message)
+
+    def stats(self, limit=None):
+        """[(sql, jumlah, total_ms, max_ms, baris)] urut dari total waktu terbesar."""
+        with self._lock:
+            rows = [(sql, *values) for sql, values in self._stats.items()]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._explained.clear()
+            self.total_queries = 0
+
+    def log_summary(self, limit=SUMMARY_QUERIES):
+        rows = self.stats(limit)
+        if not rows or self.logger is None:
+            return
+        lines = [f"RINGKASAN QUERY ({self.total_queries} query, {limit} teratas menurut total waktu)"]
+        for sql, count, total_ms, max_ms, rows_total in rows:
+            lines.append(f"    {total_ms:9.1f} ms total  {count:6d}x  maks {max_ms:7.1f} ms  "
+                         f"{rows_total:8d} baris | {sql[:SQL_LOG_CHARS]}")
+        self.logger.info("\n".join(lines))
+
+
+def explain_plan(conn, sql, params):
+    """Baris EXPLAIN QUERY PLAN (terindentasi sesuai pohon plan), atau pesan error-nya."""
+    try:
+        # Lewat method sqlite3.Connection asli agar EXPLAIN tidak ikut diukur
+        plan = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    except sqlite3.Error as e:
+        return [f"(EXPLAIN gagal: {e})"]
+    depth = {0: 0}
+    lines = []
+    for node_id, parent, _, detail in plan:
+        depth[node_id] = depth.get(parent, 0) + 1
+        lines.append("  " * (depth[node_id] - 1) + detail)
+    return lines
+
+
+# ==========================================
+# KONEKSI & CURSOR TERINSTRUMENTASI
+# ==========================================
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor yang mengukur satu query dari execute sampai hasilnya habis dibaca."""
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self._query = None      # [sql, bentuk parameter, parameter, ms, baris]
+
+    def execute(self, sql, parameters=(), /):
+        self._finish()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._query = [sql, param_shape(parameters), parameters, (time.perf_counter() - start) * 1000, 0]
+        if self.description is None:
+            # Bukan SELECT: tidak ada baris untuk di-fetch, selesai di sini
+            self._query[4] = self.rowcount
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters, /):
+        self._finish()
+        counted = {"count": 0, "first": None}
+
+        def counting():
+            for params in seq_of_parameters:
+                if counted["count"] == 0:
+                    counted["first"] = params
+                counted["count"] += 1
+                yield params
+
+        start = time.perf_counter()
+        super().executemany(sql, counting())
+        shape = f"many[{counted['count']}] x {param_shape(counted['first'])}"
+        self._query = [sql, shape, None, (time.perf_counter() - start) * 1000, self.rowcount]
+        self._finish()
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0, True)
+            raise
+        self._fetched(start, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Hasil yang tidak dibaca sampai habis (mis. fetchone() untuk COUNT) dicatat saat cursor dibuang.
+        # Bisa terjadi kapan saja (GC) saat koneksinya sudah kembali ke pool atau dipakai
+        # thread lain, jadi koneksi tidak disentuh: dicatat tanpa EXPLAIN.
+        self._finish(explain=False)
+
+    def _fetched(self, start, rows, done):
+        query = self._query
+        if query is None:
+            return
+        query[3] += (time.perf_counter() - start) * 1000
+        query[4] += rows
+        if done:
+            self._finish()
+
+    def _finish(self, explain=True):
+        query = getattr(self, "_query", None)
+        if query is None or _profiler is None:
+            return
+        self._query = None
+        if not explain:
+            query[2] = None     # tanpa parameter, record() tidak menjalankan EXPLAIN
+        _profiler.record(self.connection if explain else None, *query)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=(), /):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        # COMMIT bisa lambat (fsync WAL), jadi dicatat seperti query biasa
+        start = time.perf_counter()
+        super().commit()
+        if _profiler is not None:
+            _profiler.record(self, "COMMIT", "-", None, (time.perf_counter() - start) * 1000, 0)
+
+
+# ==========================================
+# PROFILER GLOBAL
+# ==========================================
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler():
+    """Profiler aktif, atau None jika [profiling] enabled = 0."""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None and profiling_enabled():
+            _profiler = QueryProfiler(
+                slow_ms=get_int_setting("profiling", "slow_query_ms", 100),
+                explain=get_bool_setting("profiling", "explain", True),
+                logger=get_perf_logger(),
+            )
+        return _profiler
+
+
+def connection_factory():
+    """Class koneksi untuk sqlite3.connect(factory=...)."""
+    return InstrumentedConnection if get_profiler() is not None else sqlite3.Connection
+
+
+def query_count():
+    """Jumlah query yang sudah tercatat (0 jika profiling mati)."""
+    return _profiler.total_queries if _profiler is not None else 0
+
+
+def log_query_summary():
+    if _profiler is not None:
+        _profiler.log_summary()
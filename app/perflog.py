@@ -0,0 +1,75 @@
+# --- app/perflog.py ---
+# Log performa: query lambat (app/database/profiling.py) dan waktu navigasi layar
+# (MainWindow.switch_screen), ditulis ke file yang dirotasi otomatis.
+# log_error() mencatat error tugas background ke logger "pos" (dan ke log performa
+# jika profiling aktif).
+#
+#   [profiling]
+#   enabled = 0               ; 1 = aktifkan pencatatan
+#   slow_query_ms = 100       ; query lebih lama dari ini ditulis ke log
+#   explain = 1               ; sertakan EXPLAIN QUERY PLAN untuk SELECT yang lambat
+#   log_file = pos_perf.log   ; relatif ke folder project
+#   max_kb = 1024             ; ukuran satu file log sebelum dirotasi
+#   backups = 3               ; jumlah file log lama yang disimpan
+#
+# Contoh: POS_PROFILING_ENABLED=1 POS_PROFILING_SLOW_QUERY_MS=20 python main.py
+
+import threading
+
+from app.config import CONFIG_PATH, get_setting, get_int_setting, get_bool_setting
+
+LOGGER_NAME = "pos.perf"
+ERROR_LOGGER_NAME = "pos"
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def profiling_enabled():
+    return get_bool_setting("profiling", "enabled", False)
+
+
+def log_path():
+    return CONFIG_PATH.parent / get_setting("profiling", "log_file", "pos_perf.log").strip()
+
+
+def get_perf_logger():
+    """Logger ``pos.perf`` dengan RotatingFileHandler (dibuat sekali)."""
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            # logging baru dimuat di sini: tanpa profiling, startup tidak ikut membayar import-nya
+            import logging
+            from logging.handlers import RotatingFileHandler
+
+            logger = logging.getLogger(LOGGER_NAME)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            if not logger.handlers:
+                handler = RotatingFileHandler(
+                    log_path(),
+                    maxBytes=get_int_setting("profiling", "max_kb", 1024) * 1024,
+                    backupCount=get_int_setting("profiling", "backups", 3),
+                    encoding="utf-8",
+                    delay=True,     # file baru dibuat saat baris pertama ditulis
+                )
+                handler.setFormatter(logging.Formatter("%(asctime)s [%(threadName)s] %(message)s"))
+                logger.addHandler(handler)
+            _logger = logger
+        return _logger
+
+
+def log_error(message, error):
+    """Catat error beserta traceback-nya (jika ada) ke logger ``pos``.
+
+    Tanpa konfigurasi logging, pesan level ERROR tetap tampil di stderr.
+    """
+    import logging
+
+    text = f"{message}: {error}"
+    details = getattr(error, "traceback_text", None)
+    if details:
+        text += "\n" + details.rstrip()
+    logging.getLogger(ERROR_LOGGER_NAME).error(text)
+    if profiling_enabled():
+        get_perf_logger().error(text)
@@ -0,0 +1,189 @@
+# --- app/services/analytics.py ---
+# Analitik penjualan untuk rentang tanggal bebas (start <= tanggal < end, format 'YYYY-MM-DD').
+#
+# Semua query membaca tabel rollup (sales_daily, sales_hourly,
+# sales_product_daily) dengan range scan pada primary key-nya, jadi satu tahun
+# data tetap cepat walaupun sales_items berisi jutaan baris. Peringkat, porsi
+# kumulatif (ABC) dihitung dengan window function.
+
+from datetime import date
+
+from app.database.db import read_connection
+
+WEEKDAYS = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+HEATMAP_VALUES = ("sales_count", "revenue", "items_qty")
+TOP_PRODUCTS_ORDER = {"revenue": "revenue", "qty": "qty"}
+
+
+def _to_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def shift_years(day, years):
+    """Tanggal yang sama ``years`` tahun sebelumnya/sesudahnya (29 Feb -> 28 Feb)."""
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        return day.replace(year=day.year + years, day=28)
+
+
+def shift_months(day, months):
+    """Tanggal 1 bulan ``months`` bulan sebelumnya/sesudahnya dari ``day`` (harus tanggal 1)."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def whole_months(start, end):
+    """Jumlah bulan kalender jika ``start``..``end`` tepat beberapa bulan penuh, selain itu None."""
+    if start.day != 1 or end.day != 1 or end <= start:
+        return None
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+# ==========================================
+# PRODUK TERLARIS
+# ==========================================
+def top_products(start, end, limit=10, by="revenue"):
+    """Produk teratas menurut ``by`` ("revenue" atau "qty").
+
+    Mengembalikan [(peringkat, product_id, nama, qty, revenue, porsi_revenue)].
+    """
+    order = TOP_PRODUCTS_ORDER.get(by)
+    if order is None:
+        raise ValueError(f"Urutan tidak dikenal: {by!r}")
+    with read_connection() as conn:
+        return conn.execute(f"""
+            WITH totals AS (
+                SELECT product_id, SUM(qty) AS qty, SUM(revenue) AS revenue
+                FROM sales_product_daily
+                WHERE day >= ? AND day < ?
+                GROUP BY product_id
+            )
+            SELECT
+                RANK() OVER (ORDER BY t.{order} DESC) AS rank,
+                t.product_id,
+                COALESCE(p.name, '(produk dihapus)'),
+                t.qty,
+                t.revenue,
+                t.revenue / NULLIF(SUM(t.revenue) OVER (), 0)
+            FROM totals t
+            LEFT JOIN products p ON p.id = t.product_id
+            ORDER BY rank, t.product_id
+            LIMIT ?
+        """, (str(start), str(end), limit)).fetchall()
+
+
+# ==========================================
+# HEATMAP JAM x HARI
+# ==========================================
+def hourly_heatmap(start, end, value="revenue"):
+    """Matriks 7 x 24: baris = hari (Senin..Minggu), kolom = jam 0..23."""
+    if value not in HEATMAP_VALUES:
+        raise ValueError(f"Nilai heatmap tidak dikenal: {value!r}")
+    grid = [[0] * 24 for _ in WEEKDAYS]
+    with read_connection() as conn:
+        rows = conn.execute(f"""
+            SELECT (CAST(strftime('%w', day) AS INTEGER) + 6) % 7 AS weekday, hour, SUM({value})
+            FROM sales_hourly
+            WHERE day >= ? AND day < ?
+            GROUP BY weekday, hour
+        """, (str(start), str(end)))
+        for weekday, hour, total in rows:
+            grid[weekday][hour] = total
+    return grid
+
+
+# ==========================================
+# PERBANDINGAN PERIODE
+# ==========================================
+def period_summary(start, end):
+    """Ringkasan satu periode: {"sales_count", "revenue", "items_qty"}."""
+    with read_connection() as conn:
+        sales_count, revenue, items_qty = conn.execute("""
+            SELECT COALESCE(SUM(sales_count), 0), COALESCE(SUM(revenue), 0), COALESCE(SUM(items_qty), 0)
+            FROM sales_daily
+            WHERE day >= ? AND day < ?
+        """, (str(start), str(end))).fetchone()
+    return {"sales_count": sales_count, "revenue": revenue, "items_qty": items_qty}
+
+
+def percent_change(current, previous):
+    """Perubahan dalam persen, None jika periode pembanding kosong."""
+    if not previous:
+        return None
+    return (current - previous) / previous * 100
+
+
+def compare_periods(start, end):
+    """Bandingkan periode dengan periode sebelumnya dan periode yang sama tahun lalu.
+
+    Rentang yang tepat satu/beberapa bulan kalender dibandingkan dengan bulan
+    kalender sebelumnya (Maret vs Februari, bukan 31 hari sebelum 1 Maret);
+    rentang lain dengan jumlah hari yang sama tepat sebelumnya.
+
+    Mengembalikan {"current", "previous", "year_ago": ringkasan + "start"/"end",
+    "vs_previous", "vs_year_ago": {metrik: persen}}.
+    """
+    start, end = _to_date(start), _to_date(end)
+    months = whole_months(start, end)
+    previous_start = shift_months(start, -months) if months else start - (end - start)
+    ranges = {
+        "current": (start, end),
+        "previous": (previous_start, start),
+        "year_ago": (shift_years(start, -1), shift_years(end, -1)),
+    }
+    result = {}
+    for name, (range_start, range_end) in ranges.items():
+        summary = period_summary(range_start.isoformat(), range_end.isoformat())
+        summary.update(start=range_start.isoformat(), end=range_end.isoformat())
+        result[name] = summary
+    for name, other in (("vs_previous", "previous"), ("vs_year_ago", "year_ago")):
+        result[name] = {
+            key: percent_change(result["current"][key], result[other][key]) for key in HEATMAP_VALUES
+        }
+    return result
+
+
+# ==========================================
+# KLASIFIKASI ABC
+# ==========================================
+def abc_classification(start, end, a_share=0.8, b_share=0.95):
+    """Kelas ABC produk menurut porsi kumulatif pendapatan.
+
+    Kelas A = produk teratas sampai ``a_share`` pendapatan, B sampai ``b_share``,
+    sisanya C. Mengembalikan [(product_id, nama, revenue, porsi_kumulatif, kelas)].
+    """
+    with read_connection() as conn:
+        return conn.execute("""
+            WITH totals AS (
+                SELECT product_id, SUM(revenue) AS revenue
+                FROM sales_product_daily
+                WHERE day >= ? AND day < ?
+                GROUP BY product_id
+                HAVING SUM(revenue) > 0
+            ),
+            ranked AS (
+                SELECT product_id, revenue,
+                    SUM(revenue) OVER (ORDER BY revenue DESC, product_id
+                                       ROWS UNBOUNDED PRECEDING) / SUM(revenue) OVER () AS cumulative,
+                    -- porsi kumulatif sebelum produk ini: produk yang melewati batas tetap masuk kelas atas
+                    COALESCE(SUM(revenue) OVER (ORDER BY revenue DESC, product_id
+                                                ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0)
+                        / SUM(revenue) OVER () AS before
+                FROM totals
+            )
+            SELECT r.product_id, COALESCE(p.name, '(produk dihapus)'), r.revenue, r.cumulative,
+                CASE WHEN r.before < ? THEN 'A' WHEN r.before < ? THEN 'B' ELSE 'C' END
+            FROM ranked r
+            LEFT JOIN products p ON p.id = r.product_id
+            ORDER BY r.revenue DESC, r.product_id
+        """, (str(start), str(end), a_share, b_share)).fetchall()
+
+
+def abc_summary(rows):
+    """{kelas: (jumlah produk, total revenue)} dari hasil ``abc_classification``."""
+    summary = {"A": [0, 0], "B": [0, 0], "C": [0, 0]}
+    for _, _, revenue, _, grade in rows:
+        summary[grade][0] += 1
+        summary[grade][1] += revenue
+    return {grade: tuple(values) for grade, values in summary.items()}
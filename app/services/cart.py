@@ -0,0 +1,76 @@
+# --- app/services/cart.py ---
+# Keranjang belanja kasir: lookup per produk O(1) dan total yang dijaga bertahap.
+
+
+class CartLine:
+    __slots__ = ("product_id", "name", "price", "qty")
+
+    def __init__(self, product_id, name, price, qty):
+        self.product_id = product_id
+        self.name = name
+        self.price = price
+        self.qty = qty
+
+    @property
+    def total(self):
+        return self.price * self.qty
+
+
+class Cart:
+    """Baris keranjang disimpan urut sesuai waktu ditambahkan, diindeks per id produk."""
+
+    def __init__(self):
+        self._lines = []        # CartLine, urut sesuai tampilan
+        self._row_by_id = {}    # id produk -> index baris
+        self.total = 0
+        self.total_qty = 0
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines)
+
+    def line_at(self, row):
+        return self._lines[row]
+
+    def row_of(self, product_id):
+        return self._row_by_id.get(product_id)
+
+    def qty_of(self, product_id):
+        row = self._row_by_id.get(product_id)
+        return 0 if row is None else self._lines[row].qty
+
+    def add(self, product_id, name, price, qty):
+        """Tambah qty produk. Mengembalikan (row, baris_baru)."""
+        row = self._row_by_id.get(product_id)
+        if row is None:
+            row = len(self._lines)
+            self._lines.append(CartLine(product_id, name, price, qty))
+            self._row_by_id[product_id] = row
+            is_new = True
+        else:
+            self._lines[row].qty += qty
+            is_new = False
+        self.total += price * qty
+        self.total_qty += qty
+        return row, is_new
+
+    def remove_at(self, row):
+        line = self._lines.pop(row)
+        del self._row_by_id[line.product_id]
+        for i in range(row, len(self._lines)):
+            self._row_by_id[self._lines[i].product_id] = i
+        self.total -= line.total
+        self.total_qty -= line.qty
+        return line
+
+    def clear(self):
+        self._lines = []
+        self._row_by_id = {}
+        self.total = 0
+        self.total_qty = 0
+
+    def sale_items(self):
+        """Item untuk ``save_sale``: list of (product_id, qty, price)."""
+        return [(line.product_id, line.qty, line.price) for line in self._lines]
@@ -0,0 +1,259 @@
+# --- app/services/catalog.py ---
+# Katalog produk PDF berhalaman: header tabel di setiap halaman, nomor halaman, dan total.
+#
+# Tata letak dibuat tetap (jumlah baris per halaman selalu sama) sehingga nomor
+# halaman bisa dihitung di awal. Karena itu katalog besar bisa dipecah menjadi
+# beberapa bagian (per rentang halaman) yang dirender terpisah, bila perlu paralel
+# di proses worker, lalu digabung dengan pypdf (opsional).
+#
+# Pemecahan juga penting tanpa paralel: fpdf 1.7 menyusun output dengan
+# penggabungan string berulang sehingga waktunya naik kuadratik terhadap
+# jumlah halaman dalam satu dokumen.
+
+import os
+import sqlite3
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from app.config import get_int_setting
+from app.database.db import read_connection, stream_query, get_manager, FETCH_BATCH
+from app.services.formatting import format_rupiah
+
+try:
+    import pypdf
+except ImportError:  # tanpa pypdf: katalog selalu dirender sebagai satu dokumen
+    pypdf = None
+
+# Ukuran (mm) untuk A4 portrait
+ROW_HEIGHT = 8
+HEADER_HEIGHT = 46           # judul + waktu cetak + header kolom
+FOOTER_HEIGHT = 15
+PAGE_HEIGHT = 297
+TOP_MARGIN = 10
+ROWS_PER_PAGE = (PAGE_HEIGHT - TOP_MARGIN - HEADER_HEIGHT - FOOTER_HEIGHT) // ROW_HEIGHT
+TOTAL_ROWS = 2               # baris ringkasan total di halaman terakhir
+
+COLUMNS = [("No", 15, "C"), ("Nama Produk", 95, "L"), ("Harga", 45, "R"), ("Stok", 35, "C")]
+NAME_MAX_CHARS = 48
+
+SPLIT_MIN_ROWS = 5000        # di bawah ini cukup satu dokumen
+PARALLEL_MIN_ROWS = 20000    # di bawah ini, overhead proses worker tidak sebanding
+PAGES_PER_PART = 100
+
+
+def page_count(row_count):
+    return max(1, -(-(row_count + TOTAL_ROWS) // ROWS_PER_PAGE))
+
+
+def _latin1(text):
+    # fpdf 1.7 hanya mendukung latin-1 untuk font bawaan
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def _make_pdf_class():
+    from fpdf import FPDF
+
+    class CatalogPDF(FPDF):
+        def __init__(self, printed_at, total_pages, first_page_no=1):
+            super().__init__("P", "mm", "A4")
+            self.printed_at = printed_at
+            self.total_pages = total_pages
+            self.first_page_no = first_page_no
+            self.set_auto_page_break(False)
+            self.set_margins(10, TOP_MARGIN, 10)
+
+        def header(self):
+            self.set_font("Arial", "B", 16)
+            self.cell(0, 10, "Daftar Produk", ln=True, align="C")
+            self.set_font("Arial", "", 11)
+            self.cell(0, 8, f"Dicetak pada: {self.printed_at:%Y-%m-%d} pukul {self.printed_at:%H:%M:%S}",
+                      ln=True, align="C")
+            self.ln(8)
+            self.set_font("Arial", "B", 12)
+            for title, width, _ in COLUMNS:
+                self.cell(width, 10, title, 1, align="C")
+            self.ln()
+            self.set_font("Arial", "", 11)
+
+        def footer(self):
+            self.set_y(-FOOTER_HEIGHT)
+            self.set_font("Arial", "I", 9)
+            page = self.first_page_no + self.page_no() - 1
+            self.cell(0, 10, f"Halaman {page} dari {self.total_pages}", align="C")
+
+        def product_row(self, number, name, price, stock):
+            if len(name) > NAME_MAX_CHARS:
+                name = name[:NAME_MAX_CHARS - 3] + "..."
+            values = (str(number), _latin1(name), format_rupiah(price), str(stock))
+            for (_, width, align), value in zip(COLUMNS, values):
+                self.cell(width, ROW_HEIGHT, value, 1, align=align)
+            self.ln()
+
+        def totals(self, summary):
+            count, stock, value = summary
+            self.set_font("Arial", "B", 11)
+            self.cell(110, ROW_HEIGHT, f"Total: {count} produk", 1)
+            self.cell(80, ROW_HEIGHT, f"Total stok: {stock}", 1, align="R")
+            self.ln()
+            self.cell(110, ROW_HEIGHT, "Nilai persediaan (harga x stok)", 1)
+            self.cell(80, ROW_HEIGHT, format_rupiah(value), 1, align="R")
+            self.ln()
+
+    return CatalogPDF
+
+
+def _render_rows(pdf, batches, first_number, summary, progress=None):
+    """Tulis baris ke ``pdf``; halaman baru setiap ROWS_PER_PAGE baris."""
+    on_page = 0
+    number = first_number
+    pdf.add_page()
+    for rows in batches:
+        for _, name, price, stock in rows:
+            if on_page == ROWS_PER_PAGE:
+                pdf.add_page()
+                on_page = 0
+            pdf.product_row(number, name, price, stock)
+            number += 1
+            on_page += 1
+        if progress:
+            progress(number - first_number)
+    if summary is not None:
+        if on_page + TOTAL_ROWS > ROWS_PER_PAGE:
+            pdf.add_page()
+        pdf.totals(summary)
+
+
+def catalog_summary():
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(stock), 0), COALESCE(SUM(price * stock), 0) FROM products"
+        ).fetchone()
+
+
+# ==========================================
+# RENDER PER BAGIAN (bisa di proses worker)
+# ==========================================
+def _render_part(db_path, after_id, limit, first_number, total_pages, printed_at, summary, part_path):
+    """Render satu rentang halaman ke file PDF sementara.
+
+    Bisa dijalankan di proses worker yang tidak berbagi ConnectionManager,
+    jadi memakai koneksi read-only sendiri.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute(
+            "SELECT id, name, price, stock FROM products WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)
+        )
+
+        def batches():
+            while True:
+                rows = cursor.fetchmany(FETCH_BATCH)
+                if not rows:
+                    return
+                yield rows
+
+        first_page_no = (first_number - 1) // ROWS_PER_PAGE + 1
+        pdf = _make_pdf_class()(printed_at, total_pages, first_page_no)
+        _render_rows(pdf, batches(), first_number, summary)
+        pdf.output(part_path, "F")
+    finally:
+        conn.close()
+    return part_path
+
+
+def _part_boundaries(part_rows):
+    """id terakhir sebelum setiap bagian (keyset), mis. [0, id_ke_5400, id_ke_10800, ...]."""
+    with read_connection() as conn:
+        ids = conn.execute("""
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY id) AS rn FROM products
+            ) WHERE rn % ? = 0
+        """, (part_rows,)).fetchall()
+    return [0] + [row[0] for row in ids]
+
+
+def _render_in_parts(file_path, printed_at, summary, workers, task=None):
+    total_rows = summary[0]
+    total_pages = page_count(total_rows)
+    part_rows = ROWS_PER_PAGE * PAGES_PER_PART
+    starts = _part_boundaries(part_rows)
+    starts = [after for i, after in enumerate(starts) if i * part_rows < total_rows]
+    db_path = str(get_manager().db_path)
+
+    tmp_dir = tempfile.mkdtemp(prefix="katalog_")
+    parts = [os.path.join(tmp_dir, f"part_{i:04d}.pdf") for i in range(len(starts))]
+    jobs = [
+        (db_path, after, part_rows, i * part_rows + 1, total_pages,
+         printed_at, summary if i == len(starts) - 1 else None, parts[i])
+        for i, after in enumerate(starts)
+    ]
+
+    def progress(done):
+        if task is not None:
+            task.report_progress(done, len(jobs) + 1)
+            task.check_cancelled()
+
+    try:
+        if workers > 1 and total_rows >= PARALLEL_MIN_ROWS:
+            # spawn: aman dipakai dari aplikasi Qt yang punya banyak thread
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [pool.submit(_render_part, *job) for job in jobs]
+                try:
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        future.result()
+                        progress(done)
+                except BaseException:
+                    pool.shutdown(cancel_futures=True)
+                    raise
+        else:
+            for done, job in enumerate(jobs, start=1):
+                _render_part(*job)
+                progress(done)
+
+        writer = pypdf.PdfWriter()
+        for part in parts:
+            writer.append(part)
+        with open(file_path, "wb") as f:
+            writer.write(f)
+    finally:
+        for part in parts:
+            if os.path.exists(part):
+                os.remove(part)
+        os.rmdir(tmp_dir)
+    return total_rows
+
+
+def export_catalog_pdf(file_path, printed_at=None, task=None, workers=None):
+    """Katalog produk PDF berhalaman. Mengembalikan jumlah produk.
+
+    ``workers`` = jumlah proses render (None: dari ``[export] pdf_workers``,
+    0 = otomatis sesuai CPU). Katalog kecil atau tanpa pypdf dirender sebagai
+    satu dokumen di proses ini sambil membaca produk per batch.
+    """
+    printed_at = printed_at or datetime.now()
+    summary = catalog_summary()
+    total_rows = summary[0]
+
+    if workers is None:
+        workers = get_int_setting("export", "pdf_workers", 0) or min(os.cpu_count() or 1, 4)
+    if pypdf is not None and total_rows >= SPLIT_MIN_ROWS:
+        return _render_in_parts(file_path, printed_at, summary, workers, task)
+
+    pdf = _make_pdf_class()(printed_at, page_count(total_rows))
+
+    def progress(done):
+        if task is not None:
+            task.report_progress(done, total_rows)
+            task.check_cancelled()
+
+    batches = stream_query("SELECT id, name, price, stock FROM products ORDER BY id")
+    try:
+        _render_rows(pdf, batches, 1, summary, progress)
+    finally:
+        batches.close()
+    pdf.output(file_path, "F")
+    return total_rows
@@ -0,0 +1,97 @@
+# --- app/services/exports.py ---
+# Export data ke file (CSV / PDF). Dijalankan di thread worker, bukan di thread UI.
+
+import csv
+import os
+
+from app.database.db import read_connection, stream_query
+from app.services.formatting import format_rupiah, format_tanggal
+from app.services.reports import fetch_report_totals, stream_report_rows
+
+
+# ==========================================
+# STREAMING CSV
+# ==========================================
+def write_csv_stream(file_path, header, batches, format_row, total=0, task=None, footer=None):
+    """Tulis CSV batch demi batch; memori tetap kecil berapapun jumlah barisnya.
+
+    ``batches`` = generator list baris (mis. ``stream_query``); ``footer()`` (opsional) dipanggil
+    setelah semua baris tertulis dan mengembalikan baris penutup. File ditulis
+    ke ``<file>.part`` lalu di-rename, sehingga export yang gagal atau dibatalkan
+    tidak meninggalkan file setengah jadi. Mengembalikan jumlah baris data.
+    """
+    part_path = f"{file_path}.part"
+    count = 0
+    try:
+        with open(part_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for rows in batches:
+                writer.writerows(map(format_row, rows))
+                count += len(rows)
+                if task is not None:
+                    task.report_progress(count, total)
+                    task.check_cancelled()
+            if footer is not None:
+                writer.writerows(footer())
+    except BaseException:
+        batches.close()
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, file_path)
+    return count
+
+
+# ==========================================
+# PRODUK -> CSV
+# ==========================================
+def _product_csv_row(row):
+    name, price, stock, barcode = row
+    return [name, f"{int(price):,}".replace(",", "."), stock, barcode or ""]  # format Indonesia
+
+
+def export_products_csv(file_path, task=None):
+    with read_connection() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    batches = stream_query("SELECT name, price, stock, barcode FROM products ORDER BY id")
+    return write_csv_stream(
+        file_path, ["Nama Produk", "Harga (Rp)", "Stok", "Barcode"],
+        batches, _product_csv_row, total, task
+    )
+
+
+# ==========================================
+# PRODUK -> PDF
+# ==========================================
+def export_products_pdf(file_path, printed_at=None, task=None):
+    """Katalog produk PDF (berhalaman, bisa dirender paralel). Lihat ``app.services.catalog``."""
+    from app.services.catalog import export_catalog_pdf
+
+    return export_catalog_pdf(file_path, printed_at, task=task)
+
+
+# ==========================================
+# LAPORAN BULANAN -> CSV
+# ==========================================
+def export_report_csv(file_path, year, month, task=None):
+    """Tulis laporan satu bulan ke CSV. Mengembalikan jumlah baris (0 = tidak ada file).
+
+    Dibaca langsung dari database, bukan dari cache laporan: export satu bulan
+    penuh tidak mengusir halaman yang sedang dipakai tabel dan chart.
+    """
+    total, total_sales, total_qty = fetch_report_totals.uncached(year, month)
+    if not total:
+        return 0
+
+    def format_row(row):
+        return [format_tanggal(row[1]), row[2], format_rupiah(row[3]), row[4], format_rupiah(row[5])]
+
+    def footer():
+        return [[], ["", "TOTAL", "", total_qty, format_rupiah(total_sales)]]
+
+    return write_csv_stream(
+        file_path, ["Tanggal Pembelian", "Produk", "Harga", "Jumlah", "Subtotal"],
+        stream_report_rows(year, month), format_row, total, task, footer
+    )
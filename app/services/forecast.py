@@ -0,0 +1,201 @@
+# --- app/services/forecast.py ---
+# Perkiraan habisnya stok dan daftar saran restock untuk seluruh katalog sekaligus.
+#
+# Riwayat penjualan harian per produk (tabel rollup sales_product_daily) diambil
+# dengan satu query lalu diolah sebagai array NumPy. Permintaan per hari dihitung
+# dengan rata-rata bergerak (sma) atau exponential smoothing (ewma) tanpa loop per
+# produk: setiap baris riwayat diberi bobot sesuai umurnya lalu dijumlahkan per
+# produk dengan np.bincount, jadi tidak perlu membuat matriks produk x hari.
+#
+# Yang dibaca hanya riwayat yang masih berpengaruh: ``window`` hari untuk sma,
+# dan untuk ewma sampai bobot hari terlama di bawah EWMA_TOLERANCE (alpha 0.1 ->
+# 66 hari). Sisa bobot yang terpotong dinormalkan lagi, jadi hasilnya hampir
+# sama dengan ewma atas seluruh riwayat, dan yang dikirim dari SQLite ke Python
+# jauh lebih sedikit. Batas atasnya ``history_days``.
+#
+#   [forecast]
+#   method = ewma             ; ewma | sma
+#   window = 28               ; sma: jumlah hari terakhir yang dirata-rata
+#   alpha = 0.1               ; ewma: bobot hari terbaru (0..1)
+#   history_days = 730        ; riwayat yang dibaca
+#   lead_time_days = 7        ; lama barang datang setelah dipesan
+#   target_days = 30          ; stok yang ingin tersedia setelah restock (hari)
+
+import math
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.config import get_setting, get_int_setting
+from app.database.db import read_connection
+
+FORECAST_METHODS = ("ewma", "sma")
+EWMA_TOLERANCE = 1e-3   # bobot relatif hari terlama yang masih dibaca
+
+
+def forecast_settings():
+    """Pengaturan forecast dari pos.ini / environment."""
+    return {
+        "method": get_setting("forecast", "method", "ewma").strip().lower(),
+        "window": get_int_setting("forecast", "window", 28),
+        "alpha": float(get_setting("forecast", "alpha", "0.1")),
+        "history_days": get_int_setting("forecast", "history_days", 730),
+        "lead_time_days": get_int_setting("forecast", "lead_time_days", 7),
+        "target_days": get_int_setting("forecast", "target_days", 30),
+    }
+
+
+def history_days_needed(settings):
+    """Jumlah hari riwayat yang perlu dibaca untuk metode & parameter di ``settings``."""
+    if settings["method"] == "sma":
+        days = settings["window"]
+    else:
+        alpha = min(max(settings["alpha"], 1e-6), 1.0)
+        days = 1 if alpha >= 1 else math.ceil(math.log(EWMA_TOLERANCE) / math.log(1.0 - alpha))
+    return max(1, min(days, settings["history_days"]))
+
+
+# ==========================================
+# DATA (satu query produk + satu query riwayat)
+# ==========================================
+class SalesHistory:
+    """Riwayat penjualan dalam bentuk array.
+
+    ``product_ids``/``names``/``stock``/``age_days`` sejajar (satu elemen per produk,
+    urut id; ``age_days`` = umur produk sejak dibuat);
+    ``rows_product``/``rows_day``/``rows_qty`` sejajar (satu elemen per baris
+    rollup), dengan ``rows_day`` = hari ke-0..days-1 dan hari terakhir = ``today``.
+    """
+
+    def __init__(self, product_ids, names, stock, age_days, rows_product, rows_day, rows_qty, days, today):
+        self.product_ids = product_ids
+        self.names = names
+        self.stock = stock
+        self.age_days = age_days
+        self.rows_product = rows_product
+        self.rows_day = rows_day
+        self.rows_qty = rows_qty
+        self.days = days
+        self.today = today
+
+    def __len__(self):
+        return len(self.product_ids)
+
+
+def load_sales_history(history_days=730, today=None):
+    today = today or date.today()
+    first_day = today - timedelta(days=history_days - 1)
+
+    with read_connection() as conn:
+        products = conn.execute("""
+            SELECT id, name, stock, CAST(julianday(?) - julianday(substr(created_at, 1, 10)) AS INTEGER) + 1
+            FROM products ORDER BY id
+        """, (today.isoformat(),)).fetchall()
+        # Selisih hari dihitung di SQLite, jadi Python hanya menerima angka
+        rows = conn.execute("""
+            SELECT product_id, CAST(julianday(day) - julianday(?) AS INTEGER), qty
+            FROM sales_product_daily
+            WHERE day >= ? AND day <= ?
+        """, (first_day.isoformat(), first_day.isoformat(), today.isoformat())).fetchall()
+
+    product_ids = np.fromiter((p[0] for p in products), dtype=np.int64, count=len(products))
+    names = [p[1] for p in products]
+    stock = np.fromiter((p[2] or 0 for p in products), dtype=np.float64, count=len(products))
+    # created_at kosong/rusak: anggap produk sudah ada sepanjang riwayat
+    age_days = np.fromiter((p[3] if p[3] is not None else history_days for p in products),
+                           dtype=np.int64, count=len(products))
+
+    data = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    rows_pid = data[:, 0].astype(np.int64)
+    # Posisi produk di product_ids; baris milik produk yang sudah dihapus dibuang
+    index = np.searchsorted(product_ids, rows_pid)
+    index = np.minimum(index, max(len(product_ids) - 1, 0))
+    known = (product_ids[index] == rows_pid) if len(product_ids) else np.zeros(len(rows_pid), bool)
+
+    return SalesHistory(
+        product_ids, names, stock, age_days,
+        index[known], data[known, 1].astype(np.int64), data[known, 2],
+        history_days, today,
+    )
+
+
+# ==========================================
+# PERHITUNGAN (vektor untuk seluruh katalog)
+# ==========================================
+def moving_average_demand(history, window=28):
+    """Rata-rata terjual per hari selama ``window`` hari terakhir."""
+    window = max(1, min(window, history.days))
+    recent = history.rows_day >= history.days - window
+    totals = np.bincount(history.rows_product[recent], weights=history.rows_qty[recent],
+                         minlength=len(history))
+    return totals / window
+
+
+def ewma_demand(history, alpha=0.1):
+    """Exponential smoothing harian, dihitung langsung sebagai jumlah berbobot.
+
+    level_T = sum(alpha * (1 - alpha) ** (T - 1 - t) * qty_t); hari tanpa penjualan
+    bernilai 0. Hasil dibagi ``1 - (1 - alpha) ** hari_teramati`` (hari_teramati =
+    umur produk, paling lama sepanjang riwayat yang dibaca) supaya produk baru
+    dan riwayat yang dipotong tidak terhitung terlalu rendah.
+    """
+    n = len(history)
+    if not len(history.rows_qty):
+        return np.zeros(n)
+    decay = 1.0 - alpha
+    age = history.days - 1 - history.rows_day
+    weights = alpha * np.power(decay, age) * history.rows_qty
+    level = np.bincount(history.rows_product, weights=weights, minlength=n)
+
+    first_sale = np.full(n, history.days, dtype=np.int64)
+    np.minimum.at(first_sale, history.rows_product, history.rows_day)
+    observed = np.clip(np.maximum(history.age_days, history.days - first_sale), 1, history.days)
+    correction = 1.0 - np.power(decay, observed)
+    return np.divide(level, correction, out=np.zeros(n), where=correction > 0)
+
+
+def forecast_demand(history, method="ewma", window=28, alpha=0.1):
+    if method == "sma":
+        return moving_average_demand(history, window)
+    if method == "ewma":
+        return ewma_demand(history, alpha)
+    raise ValueError(f"Metode forecast tidak dikenal: {method!r} (pilih {', '.join(FORECAST_METHODS)})")
+
+
+def days_of_cover(stock, demand):
+    """Berapa hari stok cukup dengan permintaan saat ini (inf jika tidak ada permintaan)."""
+    return np.divide(stock, demand, out=np.full(len(stock), np.inf), where=demand > 0)
+
+
+# ==========================================
+# DAFTAR RESTOCK
+# ==========================================
+def reorder_list(history=None, settings=None, limit=None):
+    """Produk yang perlu dipesan ulang, urut dari yang paling cepat habis.
+
+    Mengembalikan [(product_id, nama, stok, permintaan/hari, hari_tersisa,
+    perkiraan_tanggal_habis, saran_jumlah_pesan)]. Produk masuk daftar jika
+    stoknya habis sebelum barang pesanan baru tiba (``lead_time_days``).
+    """
+    settings = {**forecast_settings(), **(settings or {})}
+    history = history or load_sales_history(history_days_needed(settings))
+    demand = forecast_demand(history, settings["method"], settings["window"], settings["alpha"])
+    cover = days_of_cover(history.stock, demand)
+
+    lead_time = settings["lead_time_days"]
+    needed = demand * (lead_time + settings["target_days"]) - history.stock
+    selected = np.flatnonzero((cover <= lead_time) & (demand > 0))
+    selected = selected[np.argsort(cover[selected], kind="stable")]
+    if limit is not None:
+        selected = selected[:limit]
+
+    result = []
+    for i in selected:
+        days_left = float(cover[i])
+        result.append((
+            int(history.product_ids[i]), history.names[i], int(history.stock[i]),
+            float(demand[i]), days_left,
+            history.today + timedelta(days=math.floor(days_left)),
+            max(1, math.ceil(needed[i])),
+        ))
+    return result
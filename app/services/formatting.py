@@ -0,0 +1,32 @@
+# --- app/services/formatting.py ---
+# Format tampilan yang dipakai bersama oleh layar dan proses export.
+
+from datetime import datetime
+
+BULAN_INDONESIA = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember"
+]
+
+
+def format_rupiah(amount):
+    """Format angka menjadi Rp 12.000 tanpa desimal"""
+    return f"Rp {int(amount):,}".replace(",", ".")
+
+
+def format_tanggal(tanggal_str):
+    """'2025-10-05 14:30:00' -> '5 Oktober 2025 14:30'"""
+    # Jalur cepat untuk format standar database (tanpa strptime, dipakai per baris saat export)
+    if len(tanggal_str) == 19 and tanggal_str[4] == "-" and tanggal_str[7] == "-" and tanggal_str[10] == " ":
+        month = tanggal_str[5:7]
+        if month.isdigit() and 1 <= int(month) <= 12 and tanggal_str[8:10].isdigit():
+            return f"{int(tanggal_str[8:10])} {BULAN_INDONESIA[int(month) - 1]} {tanggal_str[:4]} {tanggal_str[11:16]}"
+    try:
+        dt = datetime.strptime(tanggal_str, "%Y-%m-%d %H:%M:%S")
+        return f"{dt.day} {BULAN_INDONESIA[dt.month - 1]} {dt.year} {dt.strftime('%H:%M')}"
+    except ValueError:
+        try:
+            dt = datetime.strptime(tanggal_str, "%Y-%m-%d")
+            return f"{dt.day} {BULAN_INDONESIA[dt.month - 1]} {dt.year}"
+        except ValueError:
+            return tanggal_str  # fallback
@@ -0,0 +1,223 @@
+# --- app/services/imports.py ---
+# Import produk dari file CSV/TSV (format sama dengan hasil Export CSV).
+#
+# File dibaca baris per baris (tidak dimuat utuh ke memori), divalidasi, lalu
+# disimpan per batch: satu transaksi + executemany untuk setiap BATCH_SIZE baris.
+# Produk dicocokkan lewat barcode/SKU; baris tanpa barcode dicocokkan lewat nama.
+
+import csv
+import os
+import re
+
+from app.database.db import transaction, mark_changed
+
+BATCH_SIZE = 1000
+MAX_ERRORS = 1000       # pesan error yang disimpan; sisanya hanya dihitung
+SQL_IN_CHUNK = 500      # batas parameter per query "IN (...)"
+
+# Nama kolom yang dikenali -> field produk
+COLUMN_ALIASES = {
+    "nama produk": "name", "nama": "name", "name": "name",
+    "harga (rp)": "price", "harga": "price", "price": "price",
+    "stok": "stock", "stock": "stock",
+    "barcode": "barcode", "sku": "barcode", "barcode/sku": "barcode",
+}
+
+
+def _is_grouped(text, separator):
+    """True jika ``text`` berupa angka dengan pemisah ribuan ``separator`` yang rapi (1.234.567)."""
+    return re.fullmatch(rf"\d{{1,3}}(\{separator}\d{{3}})+", text) is not None
+
+
+def parse_price(value):
+    """Harga dari CSV -> float; format yang tidak jelas dilempar sebagai ValueError.
+
+    Format Indonesia: '12.000' -> 12000, '1.234,5' -> 1234.5, '12,50' -> 12.5.
+    Selain itu pemisah desimal ditentukan dari posisi dan jumlah digitnya:
+    '12.50' -> 12.5, '1,234.56' -> 1234.56, '1,234,567' -> 1234567.
+    '1,234' (ribuan atau desimal?) dan pengelompokan yang tidak rapi ditolak.
+    """
+    text = value.replace("Rp", "").replace("\xa0", "").replace(" ", "").strip()
+    sign = 1
+    if text.startswith("-"):
+        sign, text = -1, text[1:]
+    if not re.fullmatch(r"[\d.,]+", text) or not text[0].isdigit() or not text[-1].isdigit():
+        raise ValueError("bukan angka")
+
+    last = max(text.rfind("."), text.rfind(","))
+    if last < 0:
+        return sign * float(text)
+    mark, integer, fraction = text[last], text[:last], text[last + 1:]
+    other = "," if mark == "." else "."
+
+    if mark in integer:
+        # Pemisah yang sama muncul berkali-kali: hanya sah sebagai pemisah ribuan
+        if _is_grouped(text, mark):
+            return sign * float(text.replace(mark, ""))
+        raise ValueError("pemisah ribuan tidak rapi")
+    if other in integer:
+        # Dua jenis pemisah: yang terakhir desimal, yang lain ribuan
+        if _is_grouped(integer, other):
+            return sign * float(integer.replace(other, "") + "." + fraction)
+        raise ValueError("pemisah ribuan tidak rapi")
+    if len(fraction) != 3:
+        return sign * float(f"{integer}.{fraction}")   # '12,50' / '12.50'
+    if mark == "." and _is_grouped(text, "."):
+        return sign * float(integer + fraction)          # '12.000' (format Indonesia)
+    raise ValueError("ambigu: pemisah ribuan atau desimal?")
+
+
+def parse_stock(value):
+    """'1.200' atau '1200' -> 1200 (stok harus bilangan bulat)."""
+    text = value.strip()
+    if not text:
+        return 0
+    if "." in text:
+        if not _is_grouped(text, "."):
+            raise ValueError("stok harus bilangan bulat")
+        text = text.replace(".", "")
+    return int(text)
+
+
+def detect_delimiter(file_path, sample):
+    if file_path.lower().endswith(".tsv"):
+        return "\t"
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+    except csv.Error:
+        return ","
+
+
+def validate_row(data):
+    """Kembalikan (name, price, stock, barcode) atau lempar ValueError dengan alasan."""
+    name = data.get("name", "")
+    if not name:
+        raise ValueError("nama kosong")
+    try:
+        price = parse_price(data.get("price", ""))
+    except ValueError as e:
+        raise ValueError(f"harga tidak valid: {data.get('price', '')!r} ({e})") from None
+    if price < 0:
+        raise ValueError("harga tidak boleh negatif")
+    try:
+        stock = parse_stock(data.get("stock") or "0")
+    except ValueError:
+        raise ValueError(f"stok tidak valid: {data.get('stock')!r}") from None
+    if stock < 0:
+        raise ValueError("stok tidak boleh negatif")
+    return name, price, stock, data.get("barcode") or None
+
+
+def _chunks(values, size=SQL_IN_CHUNK):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _existing_ids(conn, column, keys, collate=""):
+    """Peta key -> id produk untuk key yang sudah ada di database."""
+    found = {}
+    for chunk in _chunks(keys):
+        marks = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT {column}, id FROM products WHERE {column} {collate} IN ({marks})", chunk
+        )
+        for key, product_id in rows:
+            found[key.lower() if collate else key] = product_id
+    return found
+
+
+def _write_batch(batch):
+    """Simpan satu batch. ``batch``: dict key -> (name, price, stock, barcode). Return (inserted, updated)."""
+    by_barcode = {key[1]: row for key, row in batch.items() if key[0] == "barcode"}
+    by_name = {key[1]: row for key, row in batch.items() if key[0] == "name"}
+
+    with transaction(immediate=True) as conn:
+        barcode_ids = _existing_ids(conn, "barcode", by_barcode)
+        name_ids = _existing_ids(conn, "name", [row[0] for row in by_name.values()], "COLLATE NOCASE")
+
+        updates, inserts = [], []
+        for barcode, (name, price, stock, _) in by_barcode.items():
+            if barcode in barcode_ids:
+                updates.append((name, price, stock, barcode_ids[barcode]))
+            else:
+                inserts.append((name, price, stock, barcode))
+        for key, (name, price, stock, _) in by_name.items():
+            if key in name_ids:
+                updates.append((name, price, stock, name_ids[key]))
+            else:
+                inserts.append((name, price, stock, None))
+
+        conn.executemany("UPDATE products SET name = ?, price = ?, stock = ? WHERE id = ?", updates)
+        conn.executemany(
+            "INSERT INTO products (name, price, stock, barcode) VALUES (?, ?, ?, ?)", inserts
+        )
+    mark_changed("products")
+    return len(inserts), len(updates)
+
+
+def import_products_csv(file_path, task=None, batch_size=BATCH_SIZE):
+    """Tambah/perbarui produk dari CSV/TSV secara streaming.
+
+    Baris yang tidak valid dilewati dan dicatat sebagai ``"Baris N: alasan"``.
+    Jika dibatalkan, batch yang sudah tersimpan tetap dipertahankan.
+    """
+    result = {"inserted": 0, "updated": 0, "errors": [], "error_count": 0, "rows": 0}
+    total_bytes = os.path.getsize(file_path) or 1
+    read_chars = 0
+
+    def add_error(line_no, message):
+        result["error_count"] += 1
+        if len(result["errors"]) < MAX_ERRORS:
+            result["errors"].append(f"Baris {line_no}: {message}")
+
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        delimiter = detect_delimiter(file_path, f.read(4096))
+        f.seek(0)
+
+        def counted_lines():
+            nonlocal read_chars
+            for line in f:
+                read_chars += len(line)
+                yield line
+
+        reader = csv.reader(counted_lines(), delimiter=delimiter)
+        header = [COLUMN_ALIASES.get(h.strip().lower()) for h in next(reader, [])]
+        if "name" not in header or "price" not in header:
+            raise ValueError("Kolom 'Nama Produk' dan 'Harga' wajib ada di baris pertama.")
+
+        def flush(batch):
+            inserted, updated = _write_batch(batch)
+            result["inserted"] += inserted
+            result["updated"] += updated
+            batch.clear()
+            if task is not None:
+                task.report_progress(min(read_chars, total_bytes), total_bytes)
+                task.check_cancelled()
+
+        # Baris berikutnya dengan key yang sama menimpa baris sebelumnya (dalam satu batch)
+        batch = {}
+        for row in reader:
+            line_no = reader.line_num
+            if not any(cell.strip() for cell in row):
+                continue
+            result["rows"] += 1
+            if len(row) > len(header):
+                add_error(line_no, f"jumlah kolom {len(row)}, seharusnya {len(header)}")
+                continue
+            data = {field: value.strip() for field, value in zip(header, row) if field}
+            try:
+                product = validate_row(data)
+            except ValueError as e:
+                add_error(line_no, e)
+                continue
+
+            key = ("barcode", product[3]) if product[3] else ("name", product[0].lower())
+            batch[key] = product
+            if len(batch) >= batch_size:
+                flush(batch)
+
+        if batch:
+            flush(batch)
+
+    return result
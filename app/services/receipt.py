@@ -0,0 +1,231 @@
+# --- app/services/receipt.py ---
+# Cetak struk transaksi (dipanggil dari thread worker setelah transaksi tersimpan).
+# Backend dipilih lewat konfigurasi [receipt] backend = pdf | text | escpos.
+
+import os
+import socket
+import textwrap
+from pathlib import Path
+from datetime import datetime
+
+from app.config import get_setting, get_int_setting
+from app.database.db import (
+    claim_due_receipt_jobs, requeue_receipt_job, get_receipt_data, mark_receipt_done, mark_receipt_failed
+)
+
+SHOP_NAME = "FRESH SHOPMART"
+SHOP_ADDRESS = "JL. BUKIT KEMBANG, KEL. KEMBANG, KEC. A, KOTA KANGEAN 13139"
+FOOTER_LINES = [
+    "Terima kasih telah berbelanja di toko kami!",
+    "Layanan Pelanggan: 0324324 | freshshop@gmail.com",
+]
+
+
+def default_receipt_folder():
+    folder = get_setting("receipt", "folder")
+    return Path(folder) if folder else Path(os.path.expanduser("~")) / "Downloads"
+
+
+def receipt_filename(sale_id, printed_at, ext):
+    return f"transaksi_{printed_at.strftime('%Y%m%d%H%M%S')}_{sale_id}.{ext}"
+
+
+# ==========================================
+# BACKEND PDF (kertas letter, reportlab)
+# ==========================================
+
+
+def save_receipt_pdf(sale_id, items, amount_paid, change, printed_at=None, folder=None):
+    """Tulis struk ke folder Downloads. ``items`` berisi tuple (name, price, qty, total)."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    printed_at = printed_at or datetime.now()
+    folder = Path(folder) if folder else default_receipt_folder()
+    pdf_filename = folder / receipt_filename(sale_id, printed_at, "pdf")
+    pdf = canvas.Canvas(str(pdf_filename), pagesize=letter)
+
+    pdf.setFont("Helvetica-Bold", 16)
+    pdf.drawString(100, 750, SHOP_NAME)
+    pdf.setFont("Helvetica", 12)
+    pdf.drawString(100, 735, SHOP_ADDRESS)
+    pdf.line(100, 730, 500, 730)
+
+    pdf.drawString(100, 715, f"Date: {printed_at.strftime('%Y-%m-%d %H:%M:%S')}")
+    pdf.drawString(100, 700, f"Transaction No: {sale_id}")
+
+    pdf.line(100, 695, 500, 695)
+
+    y_position = 680
+    total_amount = 0
+    for name, price, qty, total in items:
+        pdf.drawString(100, y_position, f"{name} - {qty} x Rp{price:,.0f}")
+        y_position -= 15
+        pdf.drawString(100, y_position, f"Rp {total:,.0f}")
+        y_position -= 20
+        total_amount += total
+
+    pdf.line(100, y_position, 500, y_position)
+
+    # Detail pembayaran
+    y_position -= 20
+    pdf.drawString(100, y_position, f"Total: Rp {total_amount:,.0f}")
+    pdf.drawString(100, y_position-15, f"Tunai: Rp {amount_paid:,.0f}")
+    pdf.drawString(100, y_position-30, f"Kembalian: Rp {change:,.0f}")
+
+    pdf.line(100, y_position-35, 500, y_position-35)
+
+    # Pesan Terima Kasih
+    pdf.drawString(100, y_position-50, FOOTER_LINES[0])
+    pdf.drawString(100, y_position-65, FOOTER_LINES[1])
+
+    pdf.save()
+    return pdf_filename
+
+
+# ==========================================
+# BACKEND TEKS / ESC-POS (printer thermal 58/80mm)
+# ==========================================
+def _money(amount):
+    return f"Rp {amount:,.0f}"
+
+
+def _pair(left, right, width):
+    """Teks kiri dan kanan dalam satu baris selebar ``width`` karakter."""
+    space = width - len(left) - len(right)
+    if space < 1:
+        return [left[:width], right.rjust(width)]
+    return [left + " " * space + right]
+
+
+def render_receipt_lines(sale_id, items, amount_paid, change, printed_at=None, width=32):
+    """Susun struk sebagai list baris teks lebar tetap (tanpa kode printer)."""
+    printed_at = printed_at or datetime.now()
+    rule = "-" * width
+    lines = [SHOP_NAME.center(width)]
+    lines += [line.center(width) for line in textwrap.wrap(SHOP_ADDRESS, width)]
+    lines.append(rule)
+    lines.append(f"Date: {printed_at.strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append(f"Transaction No: {sale_id}")
+    lines.append(rule)
+
+    total_amount = 0
+    for name, price, qty, total in items:
+        lines += textwrap.wrap(name, width) or [""]
+        lines += _pair(f"  {qty} x {price:,.0f}", _money(total), width)
+        total_amount += total
+
+    lines.append(rule)
+    lines += _pair("Total", _money(total_amount), width)
+    lines += _pair("Tunai", _money(amount_paid), width)
+    lines += _pair("Kembalian", _money(change), width)
+    lines.append(rule)
+    for footer in FOOTER_LINES:
+        lines += [line.center(width) for line in textwrap.wrap(footer, width)]
+    return lines
+
+
+# Perintah ESC/POS yang dipakai
+ESC_INIT = b"\x1b@"
+ESC_ALIGN_CENTER = b"\x1ba\x01"
+ESC_ALIGN_LEFT = b"\x1ba\x00"
+ESC_BOLD_ON = b"\x1bE\x01"
+ESC_BOLD_OFF = b"\x1bE\x00"
+ESC_FEED = b"\x1bd\x04"        # maju 4 baris sebelum potong
+GS_CUT = b"\x1dV\x01"          # potong sebagian
+
+
+def render_receipt_escpos(sale_id, items, amount_paid, change, printed_at=None, width=32):
+    """Struk sebagai byte stream ESC/POS (nama toko tebal, lalu potong kertas)."""
+    lines = render_receipt_lines(sale_id, items, amount_paid, change, printed_at, width)
+    body = "\n".join(line.rstrip() for line in lines[1:]) + "\n"
+    return b"".join([
+        ESC_INIT,
+        ESC_ALIGN_CENTER, ESC_BOLD_ON, SHOP_NAME.encode("ascii", "replace"), b"\n", ESC_BOLD_OFF,
+        ESC_ALIGN_LEFT, body.encode("cp437", "replace"),
+        ESC_FEED, GS_CUT,
+    ])
+
+
+def write_to_target(data, target):
+    """Kirim byte ke ``tcp://host:port`` (printer jaringan) atau tulis ke path device/file."""
+    if target.startswith("tcp://"):
+        host, _, port = target[len("tcp://"):].partition(":")
+        with socket.create_connection((host, int(port or 9100)), timeout=5) as sock:
+            sock.sendall(data)
+        return target
+    with open(target, "ab") as f:
+        f.write(data)
+    return target
+
+
+def save_receipt_text(sale_id, items, amount_paid, change, printed_at=None, folder=None):
+    """Tulis struk teks lebar tetap (.txt) ke folder struk."""
+    printed_at = printed_at or datetime.now()
+    folder = Path(folder) if folder else default_receipt_folder()
+    width = get_int_setting("receipt", "width", 32)
+    path = folder / receipt_filename(sale_id, printed_at, "txt")
+    lines = render_receipt_lines(sale_id, items, amount_paid, change, printed_at, width)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def send_receipt_escpos(sale_id, items, amount_paid, change, printed_at=None, folder=None):
+    """Kirim struk ESC/POS ke printer; tanpa ``target`` ditulis sebagai file .bin di folder struk."""
+    printed_at = printed_at or datetime.now()
+    width = get_int_setting("receipt", "width", 32)
+    data = render_receipt_escpos(sale_id, items, amount_paid, change, printed_at, width)
+    target = get_setting("receipt", "target")
+    if not target:
+        folder = Path(folder) if folder else default_receipt_folder()
+        target = str(folder / receipt_filename(sale_id, printed_at, "bin"))
+    return write_to_target(data, target)
+
+
+RECEIPT_BACKENDS = {
+    "pdf": save_receipt_pdf,
+    "text": save_receipt_text,
+    "escpos": send_receipt_escpos,
+}
+
+
+def get_receipt_backend(name=None):
+    """Fungsi cetak struk sesuai konfigurasi (``[receipt] backend``)."""
+    name = (name or get_setting("receipt", "backend", "pdf")).strip().lower()
+    try:
+        return RECEIPT_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend struk tidak dikenal: {name}") from None
+
+
+def print_due_receipts(task=None, folder=None):
+    """Proses antrian ``receipt_jobs`` lane ini: klaim lalu cetak setiap job yang jatuh tempo.
+
+    Job yang gagal tidak menghentikan antrian; job tersebut dijadwalkan ulang.
+    Mengembalikan list ``(sale_id, path_atau_None, error_atau_None)``.
+    """
+    backend = get_receipt_backend()
+    results = []
+    while True:
+        jobs = claim_due_receipt_jobs()
+        if not jobs:
+            return results
+        for index, (job_id, sale_id, amount_paid, change, attempts) in enumerate(jobs):
+            if task is not None and task.is_cancelled:
+                # Job yang sudah diklaim tapi belum dicetak dikembalikan ke antrian
+                for job in jobs[index:]:
+                    requeue_receipt_job(job[0])
+                return results
+            try:
+                data = get_receipt_data(sale_id)
+                if data is None:
+                    raise LookupError(f"Transaksi #{sale_id} tidak ditemukan")
+                sale_date, items = data
+                printed_at = datetime.strptime(sale_date, "%Y-%m-%d %H:%M:%S")
+                path = backend(sale_id, items, amount_paid, change, printed_at, folder)
+            except Exception as e:
+                mark_receipt_failed(job_id, attempts, e)
+                results.append((sale_id, None, e))
+            else:
+                mark_receipt_done(job_id, path)
+                results.append((sale_id, path, None))
@@ -0,0 +1,225 @@
+# --- app/services/report_cache.py ---
+# Cache hasil query laporan, dengan key (jenis query, tahun, bulan, argumen lain)
+# per file database: cache yang sama tidak pernah memberi hasil database lain.
+#
+# Bulan yang sudah lewat tidak berubah lagi, jadi hasilnya disimpan permanen
+# (dibatasi LRU di memori). Bulan berjalan (dan sesudahnya) dihapus dari cache
+# setiap ada penjualan/perubahan produk yang di-commit (lihat db.mark_changed).
+#
+# Opsional, hasil bulan yang sudah lewat juga disimpan ke file SQLite terpisah
+# agar tetap ada setelah aplikasi ditutup:
+#
+#   [report]
+#   cache_entries = 128       ; jumlah hasil query yang disimpan di memori
+#   cache_file =              ; mis. report_cache.db (relatif ke folder project); kosong = hanya di memori
+#
+# Cache hanya untuk tampilan interaktif (tabel, chart, analitik); export CSV
+# membaca langsung dari database agar tidak mengusir isi LRU.
+#
+# Catatan: nama produk di bulan lama ikut tersimpan di cache. Setelah produk
+# diganti nama, panggil ``clear_report_cache()`` (atau mulai ulang aplikasi)
+# jika laporan bulan lama harus memakai nama baru.
+
+import inspect
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+from app.config import CONFIG_PATH, get_setting, get_int_setting
+from app.database.db import add_change_listener, get_manager
+
+
+def is_closed_period(year, month, today=None):
+    """True jika bulan ``month``/``year`` sudah lewat (datanya tidak akan bertambah)."""
+    today = today or datetime.now()
+    return (year, month) < (today.year, today.month)
+
+
+CACHE_FILE_FORMAT = 2      # PRAGMA user_version file cache; naikkan jika format value berubah
+
+
+class ReportCache:
+    """Cache LRU thread-safe; query laporan dijalankan di thread worker."""
+
+    def __init__(self, max_entries=128, path=None, database=None):
+        self.max_entries = max_entries
+        self.path = path
+        # database() -> nama file database aktif; bagian dari setiap key (memori & file)
+        self.database = database or (lambda: "")
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0      # naik setiap invalidasi bulan berjalan
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            with self._connect() as conn:
+                if conn.execute("PRAGMA user_version").fetchone()[0] != CACHE_FILE_FORMAT:
+                    # File cache format lama (tanpa nama database / tanpa penanda tuple): dibuang
+                    conn.execute("DROP TABLE IF EXISTS report_cache")
+                    conn.execute(f"PRAGMA user_version = {CACHE_FILE_FORMAT}")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS report_cache (
+                        db TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        value TEXT,
+                        PRIMARY KEY (db, key)
+                    )
+                """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """Kembalikan (ada, nilai)."""
+        database = self.database()
+        with self._lock:
+            if (database, key) in self._entries:
+                self._entries.move_to_end((database, key))
+                self.hits += 1
+                return True, self._entries[database, key]
+        if self.path and is_closed_period(key[1], key[2]):
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value FROM report_cache WHERE db = ? AND key = ?", (database, json.dumps(key))
+                ).fetchone()
+            if row:
+                value = _from_json(json.loads(row[0]))
+                self._remember((database, key), value)
+                with self._lock:
+                    self.hits += 1
+                return True, value
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, key, value, generation=None):
+        """Simpan hasil query. ``generation`` = nilai ``self.generation`` saat query dimulai:
+        hasil bulan berjalan dibuang jika ada perubahan data selama query berjalan."""
+        database = self.database()
+        closed = is_closed_period(key[1], key[2])
+        if not self._remember((database, key), value, None if closed else generation):
+            return
+        if self.path and closed:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO report_cache (db, key, value) VALUES (?, ?, ?)",
+                    (database, json.dumps(key), json.dumps(_to_json(value)))
+                )
+
+    def _remember(self, entry, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[entry] = value
+            self._entries.move_to_end(entry)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate_open_periods(self, today=None):
+        """Hapus hasil bulan berjalan/sesudahnya (hanya ada di memori, tidak pernah disimpan ke file)."""
+        with self._lock:
+            self.generation += 1
+            for entry in [e for e in self._entries if not is_closed_period(e[1][1], e[1][2], today)]:
+                del self._entries[entry]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM report_cache")
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _to_json(value):
+    """Hasil query -> bentuk JSON yang tetap membedakan tuple, list dan dict (rekursif)."""
+    if isinstance(value, tuple):
+        return {"tuple": [_to_json(item) for item in value]}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        # key dict bisa berupa angka/tuple, jadi disimpan sebagai pasangan
+        return {"dict": [[_to_json(k), _to_json(v)] for k, v in value.items()]}
+    return value
+
+
+def _from_json(value):
+    """Kebalikan ``_to_json``: hasil dari file cache sama persis dengan hasil dari memori."""
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    if isinstance(value, dict):
+        if "tuple" in value:
+            return tuple(_from_json(item) for item in value["tuple"])
+        return {_from_json(k): _from_json(v) for k, v in value["dict"]}
+    return value
+
+
+# ==========================================
+# CACHE GLOBAL
+# ==========================================
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            path = get_setting("report", "cache_file", "").strip()
+            _cache = ReportCache(
+                max_entries=get_int_setting("report", "cache_entries", 128),
+                path=str(CONFIG_PATH.parent / path) if path else None,
+                database=lambda: str(get_manager().db_path.resolve()),
+            )
+            add_change_listener(_on_data_changed)
+        return _cache
+
+
+def _on_data_changed(kinds):
+    if "sales" in kinds or "products" in kinds:
+        _cache.invalidate_open_periods()
+
+
+def clear_report_cache():
+    get_report_cache().clear()
+
+
+def cached_report(kind):
+    """Decorator untuk query laporan ``func(year, month, ...)``; hasilnya di-cache per periode.
+
+    Argumen dinormalisasi dengan signature ``func`` (keyword dan default ikut
+    diisi), jadi ``f(2025, 1)``, ``f(2025, 1, limit=500)`` dan ``f(year=2025, month=1)``
+    memakai key yang sama.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (kind, *bound.arguments.values())
+            cache = get_report_cache()
+            found, value = cache.get(key)
+            if found:
+                return value
+            generation = cache.generation
+            value = func(*bound.args, **bound.kwargs)
+            cache.put(key, value, generation)
+            return value
+        wrapper.uncached = func
+        return wrapper
+    return decorator
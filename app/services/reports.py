@@ -0,0 +1,85 @@
+# --- app/services/reports.py ---
+# Query laporan penjualan bulanan untuk ReportWindow.
+#
+# Baris laporan diambil per halaman dengan keyset pagination pada
+# (sale_date, id item) sehingga setiap halaman memakai index range scan,
+# bukan OFFSET yang makin lambat di bulan yang ramai. Total dihitung
+# terpisah dengan agregat SQL.
+#
+# Query tabel, chart dan analitik di-cache per periode (lihat report_cache).
+# Export CSV memakai stream_report_rows yang membaca langsung dari database.
+
+from app.database.db import read_connection, month_range, stream_query
+from app.services.report_cache import cached_report
+from app.services.analytics import top_products, compare_periods, hourly_heatmap, abc_classification
+
+REPORT_PAGE_SIZE = 500
+
+REPORT_ROWS_SQL = """
+    SELECT si.id, s.sale_date, p.name, si.price, si.qty, (si.price * si.qty) AS subtotal
+    FROM sales s
+    JOIN sales_items si ON s.id = si.sale_id
+    JOIN products p ON si.product_id = p.id
+    WHERE s.sale_date >= ? AND s.sale_date < ?
+"""
+
+
+@cached_report("page")
+def fetch_report_page(year, month, after=None, limit=REPORT_PAGE_SIZE):
+    """Satu halaman laporan: [(item_id, sale_date, name, price, qty, subtotal)].
+
+    ``after`` = (sale_date, item_id) baris terakhir halaman sebelumnya, None untuk halaman pertama.
+    """
+    start, end = month_range(year, month)
+    after_date, after_id = after or (start, 0)
+    with read_connection() as conn:
+        return conn.execute(REPORT_ROWS_SQL + """
+              AND (s.sale_date, si.id) > (?, ?)
+            ORDER BY s.sale_date, si.id
+            LIMIT ?
+        """, (after_date, end, after_date, after_id, limit)).fetchall()
+
+
+@cached_report("totals")
+def fetch_report_totals(year, month):
+    """(jumlah baris, total penjualan, total barang) untuk satu bulan."""
+    with read_connection() as conn:
+        return conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(si.price * si.qty), 0), COALESCE(SUM(si.qty), 0)
+            FROM sales s
+            JOIN sales_items si ON s.id = si.sale_id
+            JOIN products p ON si.product_id = p.id
+            WHERE s.sale_date >= ? AND s.sale_date < ?
+        """, month_range(year, month)).fetchone()
+
+
+@cached_report("daily_qty")
+def fetch_daily_qty(year, month):
+    """[(tanggal, jumlah barang terjual)] per hari dalam satu bulan."""
+    with read_connection() as conn:
+        return conn.execute("""
+            SELECT DATE(s.sale_date) as tgl, SUM(si.qty) as total_qty
+            FROM sales s
+            JOIN sales_items si ON s.id = si.sale_id
+            WHERE s.sale_date >= ? AND s.sale_date < ?
+            GROUP BY tgl
+            ORDER BY tgl ASC
+        """, month_range(year, month)).fetchall()
+
+
+def stream_report_rows(year, month):
+    """Semua baris laporan satu bulan per batch ``fetchmany``, tanpa cache (untuk export)."""
+    return stream_query(REPORT_ROWS_SQL + " ORDER BY s.sale_date, si.id", month_range(year, month))
+
+
+@cached_report("analytics")
+def fetch_month_analytics(year, month, top_limit=10):
+    """Ringkasan analitik satu bulan untuk dialog Analitik di ReportWindow."""
+    start, end = month_range(year, month)
+    return {
+        "top_revenue": top_products(start, end, top_limit, by="revenue"),
+        "top_qty": top_products(start, end, top_limit, by="qty"),
+        "comparison": compare_periods(start, end),
+        "heatmap": hourly_heatmap(start, end, "sales_count"),
+        "abc": abc_classification(start, end),
+    }
@@ -0,0 +1,141 @@
+# --- app/startup.py ---
+# Laporan waktu startup: durasi tiap fase init dan import modul yang paling lambat.
+#
+# Aktifkan dengan env POS_STARTUP_REPORT=1 atau ``[startup] report = 1`` di pos.ini;
+# ``budget_ms`` memberi peringatan jika startup lebih lama dari batas tersebut.
+
+import sys
+import time
+import threading
+from contextlib import contextmanager
+
+from app.config import get_bool_setting, get_int_setting
+
+
+class _TimedLoader:
+    """Membungkus loader asli dan mencatat waktu ``exec_module`` satu modul."""
+
+    def __init__(self, loader, timer):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = self._timer.stack()
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            # (total termasuk sub-import, waktu modul itu sendiri)
+            self._timer.imports[module.__name__] = (elapsed, elapsed - children)
+
+
+class ImportTimer:
+    """Meta path finder yang mencatat waktu import setiap modul setelah dipasang."""
+
+    def __init__(self):
+        self.imports = {}
+        self._local = threading.local()   # import bisa terjadi di thread worker juga
+
+    def stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self)
+                    return spec
+            return None
+        finally:
+            self._local.busy = False
+
+
+class StartupTimer:
+    """Mencatat fase startup (``with timer.phase("init_db"): ...``) dan mencetak ringkasan."""
+
+    def __init__(self, enabled=True, budget_ms=0, top_imports=15, stream=None):
+        self.enabled = enabled
+        self.budget_ms = budget_ms
+        self.top_imports = top_imports
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self.phases = []
+        self.import_timer = ImportTimer() if enabled else None
+        if self.import_timer:
+            self.import_timer.install()
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            enabled=get_bool_setting("startup", "report", False),
+            budget_ms=get_int_setting("startup", "budget_ms", 0),
+        )
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def finish(self):
+        """Tutup pencatatan (dipanggil saat event loop pertama berjalan) dan cetak laporan."""
+        total = self.total_ms()
+        if not self.enabled:
+            # Laporan lengkap dimatikan, tapi pelanggaran budget tetap terlihat
+            if self.budget_ms and total > self.budget_ms:
+                self.stream.write(f"PERINGATAN: startup {total:.0f} ms melebihi budget {self.budget_ms} ms\n")
+            return total
+        self.import_timer.uninstall()
+        self.stream.write(self.report(total))
+        self.stream.flush()
+        return total
+
+    def report(self, total_ms=None):
+        total_ms = total_ms if total_ms is not None else self.total_ms()
+        lines = ["", "=== Startup POS ==="]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<28} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'TOTAL (sampai window tampil)':<28} {total_ms:8.1f} ms")
+
+        imports = sorted(self.import_timer.imports.items(), key=lambda item: item[1][1], reverse=True)
+        if imports:
+            lines.append(f"  Import paling lambat (waktu sendiri / kumulatif), {len(imports)} modul:")
+            for name, (cumulative, own) in imports[:self.top_imports]:
+                lines.append(f"    {own * 1000:7.1f} ms / {cumulative * 1000:7.1f} ms  {name}")
+
+        if self.budget_ms and total_ms > self.budget_ms:
+            lines.append(f"  PERINGATAN: startup {total_ms:.0f} ms melebihi budget {self.budget_ms} ms")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,258 @@
+import math
+
+from PyQt6.QtWidgets import QWidget, QToolTip, QSizePolicy
+from PyQt6.QtGui import QPainter, QPixmap, QColor, QPen, QFont, QFontMetrics, QPainterPath
+from PyQt6.QtCore import Qt, QRectF, QPointF
+
+
+def nice_ticks(max_value, count=5):
+    """Batas atas sumbu Y dan jarak antar garis bantu yang 'bulat' (1, 2, 2.5, 5 x 10^n)."""
+    if max_value <= 0:
+        return 1, 1
+    raw_step = max_value / count
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    for factor in (1, 2, 2.5, 5, 10):
+        step = factor * magnitude
+        if step >= raw_step:
+            break
+    return step * math.ceil(max_value / step), step
+
+
+def short_number(value):
+    """12500000 -> '12,5 jt' untuk label sumbu."""
+    for limit, suffix in ((1e9, " M"), (1e6, " jt"), (1e3, " rb")):
+        if abs(value) >= limit:
+            return f"{value / limit:.1f}".rstrip("0").rstrip(".").replace(".", ",") + suffix
+    return f"{value:,.0f}".replace(",", ".")
+
+
+class ChartWidget(QWidget):
+    """Dasar chart ringan yang digambar dengan QPainter dari data biasa (labels, values).
+
+    Hasil gambar disimpan sebagai QPixmap dan hanya digambar ulang jika data,
+    ukuran, atau skala layar berubah. Hover menampilkan tooltip nilai titik terdekat.
+    """
+
+    MARGIN_LEFT = 64
+    MARGIN_RIGHT = 16
+    MARGIN_TOP = 36
+    MARGIN_BOTTOM = 40
+
+    def __init__(self, title="", color="#8b5cf6", parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.color = QColor(color)
+        self.labels = []
+        self.values = []
+        self.value_format = short_number      # label di atas titik / sumbu
+        self.tooltip_format = lambda label, value: f"{label}\n{short_number(value)}"
+        self.x_title = ""
+        self.y_title = ""
+        self._pixmap = None
+        self._pixmap_key = None
+        self.setMouseTracking(True)
+        self.setMinimumHeight(200)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+    # ---------- data ----------
+    def set_data(self, labels, values):
+        labels, values = list(labels), [float(v or 0) for v in values]
+        if labels == self.labels and values == self.values:
+            return  # data sama: pixmap lama tetap dipakai
+        self.labels, self.values = labels, values
+        self._pixmap = None
+        self.update()
+
+    def set_title(self, title):
+        if title != self.title:
+            self.title = title
+            self._pixmap = None
+            self.update()
+
+    # ---------- geometri ----------
+    def plot_rect(self):
+        return QRectF(
+            self.MARGIN_LEFT, self.MARGIN_TOP,
+            max(1, self.width() - self.MARGIN_LEFT - self.MARGIN_RIGHT),
+            max(1, self.height() - self.MARGIN_TOP - self.MARGIN_BOTTOM),
+        )
+
+    def y_max(self):
+        return nice_ticks(max(self.values, default=0))
+
+    def y_pos(self, value, rect, top):
+        return rect.bottom() - (value / top) * rect.height()
+
+    # ---------- gambar ----------
+    def paintEvent(self, event):
+        ratio = self.devicePixelRatioF()
+        key = (self.width(), self.height(), ratio)
+        if self._pixmap is None or self._pixmap_key != key:
+            self._pixmap = self.render_pixmap(ratio)
+            self._pixmap_key = key
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        painter.end()
+
+    def render_pixmap(self, ratio):
+        pixmap = QPixmap(max(1, round(self.width() * ratio)), max(1, round(self.height() * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.white)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.draw_frame(painter)
+        if self.values:
+            self.draw_series(painter, self.plot_rect())
+        painter.end()
+        return pixmap
+
+    def draw_frame(self, painter):
+        rect = self.plot_rect()
+        font = QFont(self.font())
+
+        if self.title:
+            font.setBold(True)
+            font.setPointSize(11)
+            painter.setFont(font)
+            painter.setPen(QColor("#111827"))
+            painter.drawText(QRectF(0, 4, self.width(), self.MARGIN_TOP - 8),
+                             Qt.AlignmentFlag.AlignCenter, self.title)
+
+        font.setBold(False)
+        font.setPointSize(8)
+        painter.setFont(font)
+        top, step = self.y_max()
+        grid_pen = QPen(QColor("#e5e7eb"), 1, Qt.PenStyle.DashLine)
+        ticks = int(round(top / step))
+        for i in range(ticks + 1):
+            value = i * step
+            y = self.y_pos(value, rect, top)
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+            painter.setPen(QColor("#4b5563"))
+            painter.drawText(QRectF(0, y - 8, self.MARGIN_LEFT - 6, 16),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                             short_number(value))
+
+        painter.setPen(QPen(QColor("#9ca3af"), 1))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+
+        if self.x_title:
+            painter.setPen(QColor("#4b5563"))
+            painter.drawText(QRectF(rect.left(), self.height() - 16, rect.width(), 14),
+                             Qt.AlignmentFlag.AlignCenter, self.x_title)
+        if self.y_title:
+            painter.save()
+            painter.translate(10, rect.center().y())
+            painter.rotate(-90)
+            painter.drawText(QRectF(-rect.height() / 2, -8, rect.height(), 16),
+                             Qt.AlignmentFlag.AlignCenter, self.y_title)
+            painter.restore()
+
+    def draw_x_labels(self, painter, rect, centers):
+        """Label sumbu X; sebagian dilewati bila terlalu rapat."""
+        metrics = QFontMetrics(painter.font())
+        widest = max((metrics.horizontalAdvance(str(label)) for label in self.labels), default=0) + 8
+        slot = rect.width() / max(1, len(self.labels))
+        every = max(1, math.ceil(widest / slot))
+        painter.setPen(QColor("#374151"))
+        for i, (label, x) in enumerate(zip(self.labels, centers)):
+            if i % every:
+                continue
+            painter.drawText(QRectF(x - widest / 2, rect.bottom() + 4, widest, 16),
+                             Qt.AlignmentFlag.AlignCenter, str(label))
+
+    def draw_series(self, painter, rect):
+        raise NotImplementedError
+
+    def point_at(self, pos):
+        """Index data terdekat dengan posisi mouse, atau None."""
+        raise NotImplementedError
+
+    # ---------- tooltip ----------
+    def mouseMoveEvent(self, event):
+        index = self.point_at(event.position()) if self.values else None
+        if index is None:
+            QToolTip.hideText()
+            return
+        QToolTip.showText(
+            event.globalPosition().toPoint(),
+            self.tooltip_format(self.labels[index], self.values[index]), self
+        )
+
+
+class BarChart(ChartWidget):
+    BAR_WIDTH = 0.55  # proporsi lebar slot
+
+    def bar_rects(self, rect):
+        top, _ = self.y_max()
+        slot = rect.width() / len(self.values)
+        width = slot * self.BAR_WIDTH
+        rects = []
+        for i, value in enumerate(self.values):
+            x = rect.left() + slot * i + (slot - width) / 2
+            y = self.y_pos(value, rect, top)
+            rects.append(QRectF(x, y, width, rect.bottom() - y))
+        return rects
+
+    def draw_series(self, painter, rect):
+        bars = self.bar_rects(rect)
+        painter.setPen(QPen(self.color.darker(115), 1))
+        painter.setBrush(self.color)
+        for bar in bars:
+            painter.drawRect(bar)
+
+        font = QFont(painter.font())
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("#1f2937"))
+        for bar, value in zip(bars, self.values):
+            if value > 0:
+                painter.drawText(QRectF(bar.left() - 30, bar.top() - 18, bar.width() + 60, 16),
+                                 Qt.AlignmentFlag.AlignCenter, self.value_format(value))
+
+        font.setBold(False)
+        painter.setFont(font)
+        self.draw_x_labels(painter, rect, [bar.center().x() for bar in bars])
+
+    def point_at(self, pos):
+        for i, bar in enumerate(self.bar_rects(self.plot_rect())):
+            if bar.left() <= pos.x() <= bar.right() and bar.top() - 4 <= pos.y() <= bar.bottom():
+                return i
+        return None
+
+
+class LineChart(ChartWidget):
+    POINT_RADIUS = 3.5
+
+    def __init__(self, title="", color="#0d9488", parent=None):
+        super().__init__(title, color, parent)
+
+    def points(self, rect):
+        top, _ = self.y_max()
+        count = len(self.values)
+        slot = rect.width() / count
+        return [
+            QPointF(rect.left() + slot * (i + 0.5), self.y_pos(value, rect, top))
+            for i, value in enumerate(self.values)
+        ]
+
+    def draw_series(self, painter, rect):
+        points = self.points(rect)
+        path = QPainterPath(points[0])
+        for point in points[1:]:
+            path.lineTo(point)
+        painter.setPen(QPen(self.color, 2))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawPath(path)
+
+        painter.setBrush(self.color)
+        for point in points:
+            painter.drawEllipse(point, self.POINT_RADIUS, self.POINT_RADIUS)
+
+        self.draw_x_labels(painter, rect, [point.x() for point in points])
+
+    def point_at(self, pos):
+        points = self.points(self.plot_rect())
+        nearest = min(range(len(points)), key=lambda i: abs(points[i].x() - pos.x()))
+        return nearest if abs(points[nearest].y() - pos.y()) <= 20 else None
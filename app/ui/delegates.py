@@ -0,0 +1,55 @@
+from PyQt6.QtWidgets import QStyledItemDelegate
+from PyQt6.QtGui import QColor, QPainter, QFont
+from PyQt6.QtCore import Qt, QRectF, QEvent, pyqtSignal
+
+
+class ActionButtonsDelegate(QStyledItemDelegate):
+    """Menggambar tombol aksi (Edit/Hapus/...) di satu kolom tanpa membuat widget per baris.
+
+    ``buttons`` berisi tuple ``(label, warna)``. Signal ``clicked(row, index_tombol)``
+    dipancarkan saat salah satu tombol diklik.
+    """
+
+    clicked = pyqtSignal(int, int)
+
+    def __init__(self, buttons, parent=None, button_width=80, button_height=32, spacing=8, font_size=10):
+        super().__init__(parent)
+        self.buttons = [(label, QColor(color)) for label, color in buttons]
+        self.button_width = button_width
+        self.button_height = button_height
+        self.spacing = spacing
+        self.font = QFont()
+        self.font.setBold(True)
+        self.font.setPointSize(font_size)
+
+    def button_rects(self, cell_rect):
+        count = len(self.buttons)
+        width = min(self.button_width, (cell_rect.width() - (count - 1) * self.spacing) / count)
+        total_width = count * width + (count - 1) * self.spacing
+        x = cell_rect.x() + (cell_rect.width() - total_width) / 2
+        y = cell_rect.y() + (cell_rect.height() - self.button_height) / 2
+        return [
+            QRectF(x + i * (width + self.spacing), y, width, self.button_height)
+            for i in range(count)
+        ]
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setFont(self.font)
+        for rect, (label, color) in zip(self.button_rects(option.rect), self.buttons):
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(color)
+            painter.drawRoundedRect(rect, 4, 4)
+            painter.setPen(QColor("white"))
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, label)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            pos = event.position()
+            for i, rect in enumerate(self.button_rects(option.rect)):
+                if rect.contains(pos):
+                    self.clicked.emit(index.row(), i)
+                    return True
+        return False
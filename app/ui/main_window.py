@@ -1,15 +1,24 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFrame,
-    QScrollArea, QSizePolicy
+    QScrollArea, QSizePolicy, QStackedWidget
 )
 from PyQt6.QtCore import Qt, QTimer
 from datetime import datetime
 import sys
+import time
 
-from app.ui.product_window import ProductWindow
-from app.ui.sales_window import SalesWindow
-from app.ui.report_window import ReportWindow
-from app.database.db import get_dashboard_stats
+from app.database.db import get_dashboard_stats, get_last_3_months_revenue, data_versions
+from app.database.profiling import query_count
+from app.perflog import profiling_enabled, get_perf_logger
+from app.ui.tasks import TaskRunner
+from app.ui.spooler import ReceiptSpooler
+from app.ui.charts import BarChart
+
+CHART_DELAY_MS = 50
+
+
+def format_rupiah_label(value):
+    return f"Rp {int(value):,}".replace(",", ".")
 
 
 class MainWindow(QMainWindow):
@@ -23,16 +32,116 @@ class MainWindow(QMainWindow):
                 font-family: 'Segoe UI';
             }
         """)
-        self.timer = None
+        self.dashboard_tasks = TaskRunner(self)
+        # Spooler struk hidup selama aplikasi berjalan (tidak ikut ditutup bersama layar kasir)
+        self.receipt_spooler = ReceiptSpooler(self)
+        self.receipt_spooler.start()
+
+        # 🕒 Jam dashboard: hanya berjalan saat dashboard tampil
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_clock)
+        # Data chart dimuat sedikit setelah dashboard tampil; dihentikan jika dashboard ditinggalkan
+        self.chart_timer = QTimer(self)
+        self.chart_timer.setSingleShot(True)
+        self.chart_timer.setInterval(CHART_DELAY_MS)
+        self.chart_timer.timeout.connect(self.load_revenue_chart)
+
+        # Semua layar disimpan di satu QStackedWidget; dibuat saat pertama dibuka lalu dipakai ulang
+        self.stack = QStackedWidget()
+        self.setCentralWidget(self.stack)
+        self.screens = {}            # nama -> widget layar
+        self.screen_refresh = {}     # nama -> (jenis data yang dipakai, fungsi refresh)
+        self.seen_versions = {}      # nama -> versi data saat layar terakhir ditinggalkan
+        # Bagian dashboard yang belum selesai dimuat ("stats"/"chart"); tugasnya dibatalkan
+        # saat dashboard ditinggalkan, jadi dimuat ulang saat dashboard dibuka lagi
+        self.dashboard_pending = set()
+        # Log waktu navigasi per layar ([profiling] enabled = 1)
+        self.perf_log = get_perf_logger() if profiling_enabled() else None
+
         self.show_dashboard()
 
+    # ==========================================================
+    # 🧭 Pergantian layar (QStackedWidget)
+    # ==========================================================
+    def switch_screen(self, name, factory, depends_on=None, refresh=None):
+        """Tampilkan layar ``name``; buat dengan ``factory()`` jika belum pernah dibuka.
+
+        Layar yang sudah ada hanya di-refresh jika data yang dipakainya
+        (``depends_on``, default ``screen.DEPENDS_ON``) berubah sejak layar itu
+        terakhir ditinggalkan; refresh memanggil ``screen.refresh_data(changed)``.
+        """
+        started = time.perf_counter()
+        queries_before = query_count()
+        action = "tampil"
+        current = self.stack.currentWidget()
+        for key, screen in self.screens.items():
+            if screen is current and key != name:
+                self.seen_versions[key] = data_versions()
+                if key == "dashboard":
+                    self.timer.stop()
+                    self.chart_timer.stop()
+                    self.dashboard_tasks.cancel_all()
+
+        screen = self.screens.get(name)
+        if screen is None:
+            action = "buat"
+            screen = factory()
+            self.screens[name] = screen
+            if depends_on is None:
+                depends_on = getattr(screen, "DEPENDS_ON", ())
+            self.screen_refresh[name] = (set(depends_on), refresh or getattr(screen, "refresh_data", None))
+            self.stack.addWidget(screen)
+        elif name in self.seen_versions:
+            seen, now = self.seen_versions.pop(name), data_versions()
+            changed = {kind for kind, version in now.items() if seen.get(kind) != version}
+            depends, refresh = self.screen_refresh[name]
+            if refresh and changed & depends:
+                action = "refresh"
+                refresh(changed)
+        if name == "dashboard" and action == "tampil" and self.dashboard_pending:
+            action = "refresh"
+            self.resume_dashboard()
+
+        self.stack.setCurrentWidget(screen)
+        if self.perf_log:
+            tasks = self.dashboard_tasks if name == "dashboard" else getattr(screen, "tasks", None)
+            self.log_navigation(name, action, started, queries_before, tasks)
+        return screen
+
+    def log_navigation(self, name, action, started, queries_before, tasks=None):
+        """Tulis waktu sampai layar tampil, dan sampai query awalnya selesai jika masih berjalan."""
+        shown_ms = (time.perf_counter() - started) * 1000
+        if tasks is None or not tasks.is_busy:
+            self.perf_log.info(
+                f"SCREEN {name} ({action}): tampil {shown_ms:.1f} ms, "
+                f"{query_count() - queries_before} query"
+            )
+            return
+
+        def loaded(busy):
+            if busy:
+                return
+            tasks.busy_changed.disconnect(loaded)
+            self.perf_log.info(
+                f"SCREEN {name} ({action}): tampil {shown_ms:.1f} ms, "
+                f"data {(time.perf_counter() - started) * 1000:.1f} ms, "
+                f"{query_count() - queries_before} query"
+            )
+
+        tasks.busy_changed.connect(loaded)
+
     # ==========================================================
     # 🏠 DASHBOARD
     # ==========================================================
     def show_dashboard(self):
-        if self.timer:
-            self.timer.stop()
+        self.switch_screen(
+            "dashboard", self.build_dashboard,
+            depends_on=("products", "sales"), refresh=lambda _: self.refresh_dashboard()
+        )
+        self.timer.start(1000)
+        self.update_clock()
 
+    def build_dashboard(self):
         # --- Scroll Area utama agar bisa di-scroll ---
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
@@ -52,12 +161,6 @@ class MainWindow(QMainWindow):
         header_layout.addWidget(self.clock_label, alignment=Qt.AlignmentFlag.AlignRight)
         layout.addLayout(header_layout)
 
-        # 🕒 Waktu real-time
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_clock)
-        self.timer.start(1000)
-        self.update_clock()
-
                 # 🧭 Menu Navigasi
         menu_layout = QHBoxLayout()
         menu_layout.setSpacing(15)
@@ -89,18 +192,34 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(menu_layout)
 
-        # 📈 Chart Pendapatan 3 Bulan Terakhir
-        self.show_recent_revenue_chart(layout)
+        # 📈 Chart Pendapatan 3 Bulan Terakhir (widget dibuat sekali, dipakai ulang saat refresh)
+        chart_container = QWidget()
+        self.chart_layout = QVBoxLayout(chart_container)
+        self.chart_layout.setContentsMargins(0, 0, 0, 0)
+        self.chart_empty_label = QLabel("📉 Belum ada data pendapatan 3 bulan terakhir.")
+        self.chart_empty_label.setStyleSheet("color: #6b7280; font-size: 13px; margin-top: 10px;")
+        self.chart_empty_label.hide()
+        self.chart_layout.addWidget(self.chart_empty_label)
+
+        self.revenue_chart = BarChart("Pendapatan 3 Bulan Terakhir", color="#8b5cf6")
+        self.revenue_chart.y_title = "Total Pendapatan (Rp)"
+        self.revenue_chart.value_format = format_rupiah_label
+        self.revenue_chart.tooltip_format = lambda month, total: f"{month}\n{format_rupiah_label(total)}"
+        self.revenue_chart.setFixedHeight(260)
+        self.revenue_chart.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.revenue_chart.hide()
+        self.chart_layout.addWidget(self.revenue_chart)
+        layout.addWidget(chart_container)
 
         # 📊 Statistik Ringkas
         self.stats_layout = QHBoxLayout()
-        self.update_stats_cards()
+        self.build_stats_cards()
         layout.addLayout(self.stats_layout)
 
         # 🔁 Tombol Refresh
         btn_refresh = QPushButton("🔄 Refresh Data")
         btn_refresh.setFixedHeight(38)
-        btn_refresh.clicked.connect(self.update_stats_cards)
+        btn_refresh.clicked.connect(self.refresh_dashboard)
         btn_refresh.setStyleSheet("""
             QPushButton {
                 background-color: #10b981;
@@ -128,72 +247,39 @@ class MainWindow(QMainWindow):
 
         # Set layout ke scroll area
         scroll_area.setWidget(scroll_area_widget)
-        self.setCentralWidget(scroll_area)
 
-    # ==========================================================
-    # 📊 Chart Pendapatan 3 Bulan Terakhir
-    # ==========================================================
-    def show_recent_revenue_chart(self, layout):
-        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-        from matplotlib.figure import Figure
-        from app.database.db import get_last_3_months_revenue
-
-        data = get_last_3_months_revenue()
-        if not data:
-            chart_label = QLabel("📉 Belum ada data pendapatan 3 bulan terakhir.")
-            chart_label.setStyleSheet("color: #6b7280; font-size: 13px; margin-top: 10px;")
-            layout.addWidget(chart_label)
-            return
-
-        months = [m for m, _ in data]
-        totals = [t for _, t in data]
-
-        fig = Figure(figsize=(8, 3.5), tight_layout=True)
-        ax = fig.add_subplot(111)
-
-        purple = "#8b5cf6"
-        purple_dark = "#7c3aed"
-
-        bars = ax.bar(months, totals, color=purple, edgecolor=purple_dark, width=0.55)
-
-        for bar in bars:
-            height = bar.get_height()
-            if height > 0:
-                ax.text(
-                    bar.get_x() + bar.get_width() / 2,
-                    height + (height * 0.05),
-                    f"Rp {int(height):,}".replace(",", "."),
-                    ha="center",
-                    va="bottom",
-                    fontsize=9,
-                    color="#1f2937",
-                    fontweight="bold"
-                )
-
-        # Title chart
-        ax.set_title("Pendapatan 3 Bulan Terakhir", fontsize=12, fontweight="bold", pad=12)
-
-        ax.set_ylabel("Total Pendapatan (Rp)", fontsize=10, color='#4b5563')
-        ax.tick_params(axis="x", labelsize=10, pad=6)
-        ax.grid(axis="y", linestyle="--", alpha=0.35)
-
-        # Bersihin border biar clean modern
-        for spine in ["top", "right"]:
-            ax.spines[spine].set_visible(False)
-
-        canvas = FigureCanvas(fig)
-
-        # ✅ PERBAIKI HEIGHT CANVAS BIAR GA GEPENG
-        canvas.setMinimumHeight(260)
-        canvas.setMaximumHeight(260)
+        # Statistik dimuat segera; data chart menyusul setelah window tampil
+        self.update_stats_cards()
+        self.dashboard_pending.add("chart")     # tertunda CHART_DELAY_MS
+        self.chart_timer.start()
+        return scroll_area
 
-        # Biar dia expand horizontal, tapi fix tinggi
-        canvas.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
-        canvas.updateGeometry()
+    def refresh_dashboard(self):
+        """Muat ulang statistik & chart (dipanggil jika data penjualan/produk berubah)."""
+        self.update_stats_cards()
+        self.load_revenue_chart()
 
-        layout.addWidget(canvas)
+    def resume_dashboard(self):
+        """Muat ulang bagian dashboard yang dibatalkan/gagal sebelum selesai."""
+        if "stats" in self.dashboard_pending:
+            self.update_stats_cards()
+        if "chart" in self.dashboard_pending:
+            self.load_revenue_chart()
 
+    def load_revenue_chart(self):
+        self.dashboard_pending.add("chart")
+        self.dashboard_tasks.submit(get_last_3_months_revenue, on_result=self.render_revenue_chart)
 
+    # ==========================================================
+    # 📊 Chart Pendapatan 3 Bulan Terakhir
+    # ==========================================================
+    def render_revenue_chart(self, data):
+        self.dashboard_pending.discard("chart")
+        # Widget chart yang sama diberi data baru; gambar ulang hanya jika datanya berubah
+        self.chart_empty_label.setVisible(not data)
+        self.revenue_chart.setVisible(bool(data))
+        if data:
+            self.revenue_chart.set_data([m for m, _ in data], [t for _, t in data])
 
     # ==========================================================
     # 🕒 Update waktu real-time
@@ -208,21 +294,13 @@ class MainWindow(QMainWindow):
     # 📈 Statistik Dashboard
     # ==========================================================
     def update_stats_cards(self):
-        from PyQt6.QtWidgets import QVBoxLayout
-        stats = get_dashboard_stats()
-
-        for i in reversed(range(self.stats_layout.count())):
-            widget = self.stats_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        stat_cards = [
-            ("📦 Jumlah Produk", str(stats["products"])),
-            ("💰 Jumlah Transaksi Hari Ini", str(stats["sales_today"])),
-            ("💵 Pendapatan Hari Ini", f"Rp {int(stats['revenue_today']):,}".replace(",", ".")),
-        ]
+        self.dashboard_pending.add("stats")
+        self.dashboard_tasks.submit(get_dashboard_stats, on_result=self.render_stats_cards)
 
-        for label, value in stat_cards:
+    def build_stats_cards(self):
+        # Kartu dibuat sekali; refresh hanya mengganti teks nilainya
+        self.stat_value_labels = []
+        for label in ("📦 Jumlah Produk", "💰 Jumlah Transaksi Hari Ini", "💵 Pendapatan Hari Ini", "⚠️ Stok Menipis"):
             card = QFrame()
             card.setStyleSheet("""
                 QFrame {
@@ -238,30 +316,53 @@ class MainWindow(QMainWindow):
             vbox = QVBoxLayout()
             l1 = QLabel(label)
             l1.setStyleSheet("color: #6b7280; font-weight: 600;")
-            l2 = QLabel(value)
+            l2 = QLabel("-")
             l2.setStyleSheet("font-size: 20px; font-weight: bold; color: #2563eb;")
             vbox.addWidget(l1)
             vbox.addWidget(l2)
             card.setLayout(vbox)
             self.stats_layout.addWidget(card)
+            self.stat_value_labels.append(l2)
+
+    def render_stats_cards(self, stats):
+        self.dashboard_pending.discard("stats")
+        values = [
+            str(stats["products"]),
+            str(stats["sales_today"]),
+            f"Rp {int(stats['revenue_today']):,}".replace(",", "."),
+            str(stats["low_stock"]),
+        ]
+        for label, value in zip(self.stat_value_labels, values):
+            label.setText(value)
+
+        # Kartu stok menipis: merah jika ada, nama produk teratas di tooltip
+        low_label = self.stat_value_labels[3]
+        color = "#dc2626" if stats["low_stock"] else "#2563eb"
+        low_label.setStyleSheet(f"font-size: 20px; font-weight: bold; color: {color};")
+        items = stats["low_stock_items"]
+        tooltip = "\n".join(f"{name}: stok {stock} (batas {level})" for _, name, stock, level in items)
+        if stats["low_stock"] > len(items):
+            tooltip += f"\n... dan {stats['low_stock'] - len(items)} produk lain"
+        low_label.parentWidget().setToolTip(tooltip)
 
     # ==========================================================
     # 🚀 Navigasi antar halaman
     # ==========================================================
+    # Modul layar di-import saat pertama kali dibuka agar startup tidak ikut memuatnya
     def open_products(self):
-        if self.timer:
-            self.timer.stop()
-        self.product_window = ProductWindow(self)
-        self.setCentralWidget(self.product_window)
+        def create():
+            from app.ui.product_window import ProductWindow
+            return ProductWindow(self)
+        self.product_window = self.switch_screen("products", create)
 
     def open_sales(self):
-        if self.timer:
-            self.timer.stop()
-        self.sales_window = SalesWindow(self)
-        self.setCentralWidget(self.sales_window)
+        def create():
+            from app.ui.sales_window import SalesWindow
+            return SalesWindow(self)
+        self.sales_window = self.switch_screen("sales", create)
 
     def open_reports(self):
-        if self.timer:
-            self.timer.stop()
-        self.report_window = ReportWindow(self)
-        self.setCentralWidget(self.report_window)
+        def create():
+            from app.ui.report_window import ReportWindow
+            return ReportWindow(self)
+        self.report_window = self.switch_screen("reports", create)
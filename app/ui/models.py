@@ -0,0 +1,375 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+
+from app.database.db import read_connection, search_products, matches_search
+from app.services.formatting import format_rupiah, format_tanggal
+from app.services.reports import fetch_report_page, REPORT_PAGE_SIZE
+
+
+# ==========================================
+# QUERY PRODUK (dijalankan di thread worker)
+# ==========================================
+def fetch_product_page(after_id, limit):
+    """Ambil satu halaman produk dengan keyset pagination (id > after_id)."""
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT id, name, price, stock, barcode, reorder_level FROM products WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)
+        ).fetchall()
+
+
+def fetch_product(product_id):
+    with read_connection() as conn:
+        return conn.execute(
+            "SELECT id, name, price, stock, barcode, reorder_level FROM products WHERE id = ?", (product_id,)
+        ).fetchone()
+
+
+# ==========================================
+# MODEL TABEL PRODUK
+# ==========================================
+LOW_STOCK_COLOR = QColor("#c0392b")   # stok <= batas restock
+
+
+class ProductTableModel(QAbstractTableModel):
+    """Model produk yang dimuat bertahap (fetchMore) saat tabel di-scroll.
+
+    Hanya baris yang sudah diambil yang disimpan; perubahan satu produk
+    (tambah/edit/hapus) memperbarui satu baris saja, bukan seluruh tabel.
+    Saat ada kata kunci, isi model diganti hasil pencarian FTS (dibatasi LIMIT).
+    """
+
+    HEADERS = ["No", "Barcode", "Nama", "Harga", "Stok", "Aksi"]
+    ACTION_COLUMN = 5
+    BATCH_SIZE = 200
+
+    def __init__(self, tasks, parent=None):
+        super().__init__(parent)
+        self.tasks = tasks
+        self._rows = []          # list of [id, name, price, stock, barcode, reorder_level]
+        self._row_by_id = {}     # id produk -> index baris
+        self._search = ""
+        self._exhausted = False
+        self._fetching = False
+        self._failed = False     # fetch gagal: berhenti memuat otomatis sampai reload()
+        self._generation = 0     # naik setiap reload, agar hasil fetch lama diabaikan
+
+    # ---------- API Qt ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        product_id, name, price, stock, barcode, reorder_level = self._rows[index.row()]
+        col = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return str(index.row() + 1)
+            if col == 1:
+                return barcode or "-"
+            if col == 2:
+                return name
+            if col == 3:
+                return format_rupiah(price)
+            if col == 4:
+                return str(stock)
+            return None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role == Qt.ItemDataRole.ForegroundRole and col == 4 and stock <= reorder_level:
+            return LOW_STOCK_COLOR
+        if role == Qt.ItemDataRole.UserRole:
+            return product_id
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._fetching and not self._failed
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._fetching = True
+        generation = self._generation
+        if self._search:
+            # hasil pencarian diambil sekali (sudah dibatasi LIMIT)
+            job = (search_products, self._search)
+        else:
+            after_id = self._rows[-1][0] if self._rows else 0
+            job = (fetch_product_page, after_id, self.BATCH_SIZE)
+        self.tasks.submit(
+            *job,
+            on_result=lambda rows: self._append_page(rows, generation),
+            on_error=lambda e: self._fetch_failed(e, generation),
+            cancellable=False
+        )
+
+    # ---------- API untuk ProductWindow ----------
+    def reload(self, search=None):
+        if search is not None:
+            self._search = search
+        self.beginResetModel()
+        self._generation += 1
+        self._rows = []
+        self._row_by_id = {}
+        self._exhausted = False
+        self._fetching = False
+        self._failed = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def product_at(self, row):
+        """Kembalikan (id, name, price, stock, barcode, reorder_level) untuk baris tertentu."""
+        return tuple(self._rows[row])
+
+    def product_added(self, product_id):
+        # Produk baru punya id terbesar: kalau semua halaman sudah dimuat, tambahkan di akhir;
+        # kalau belum, produk akan ikut terambil saat tabel di-scroll.
+        if self._exhausted:
+            self.tasks.submit(fetch_product, product_id, on_result=self._insert_product, cancellable=False)
+
+    def product_changed(self, product_id):
+        if product_id in self._row_by_id:
+            self.tasks.submit(fetch_product, product_id, on_result=self._update_product, cancellable=False)
+
+    def product_removed(self, product_id):
+        row = self._row_by_id.get(product_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        del self._row_by_id[product_id]
+        for i in range(row, len(self._rows)):
+            self._row_by_id[self._rows[i][0]] = i
+        self.endRemoveRows()
+        # kolom "No" di bawah baris yang dihapus ikut bergeser
+        if row < len(self._rows):
+            self.dataChanged.emit(self.index(row, 0), self.index(len(self._rows) - 1, 0))
+
+    # ---------- callback hasil query ----------
+    def _append_page(self, rows, generation):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        if self._search or len(rows) < self.BATCH_SIZE:
+            self._exhausted = True
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        for i, row in enumerate(rows):
+            self._rows.append(list(row))
+            self._row_by_id[row[0]] = start + i
+        self.endInsertRows()
+
+    def _fetch_failed(self, error, generation):
+        if generation != self._generation:
+            return
+        # Tanpa ini view langsung memanggil fetchMore lagi dan query yang gagal diulang terus
+        self._fetching = False
+        self._failed = True
+        self.tasks.show_error(error, "Gagal memuat produk")
+
+    def _insert_product(self, product):
+        if product is None or product[0] in self._row_by_id:
+            return
+        if self._search and not matches_search(product[1], self._search):
+            return
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append(list(product))
+        self._row_by_id[product[0]] = row
+        self.endInsertRows()
+
+    def _update_product(self, product):
+        if product is None:
+            return
+        row = self._row_by_id.get(product[0])
+        if row is None:
+            return
+        self._rows[row] = list(product)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+
+# ==========================================
+# MODEL TABEL KERANJANG (TRANSAKSI)
+# ==========================================
+class CartTableModel(QAbstractTableModel):
+    """Menampilkan ``Cart``; setiap perubahan hanya memberi sinyal untuk baris yang terkena."""
+
+    HEADERS = ["#", "Produk", "Harga", "Jumlah", "Total", "Aksi"]
+    ACTION_COLUMN = 5
+
+    def __init__(self, cart, parent=None):
+        super().__init__(parent)
+        self.cart = cart
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.cart)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        line = self.cart.line_at(index.row())
+        col = index.column()
+        if col == 0:
+            return str(index.row() + 1)
+        if col == 1:
+            return line.name
+        if col == 2:
+            return f"Rp {line.price:,.0f}"
+        if col == 3:
+            return str(line.qty)
+        if col == 4:
+            return f"Rp {line.total:,.0f}"
+        return None
+
+    def add_product(self, product_id, name, price, qty):
+        row = self.cart.row_of(product_id)
+        if row is None:
+            row = len(self.cart)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.cart.add(product_id, name, price, qty)
+            self.endInsertRows()
+        else:
+            self.cart.add(product_id, name, price, qty)
+            self.dataChanged.emit(self.index(row, 3), self.index(row, 4))
+        return row
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        line = self.cart.remove_at(row)
+        self.endRemoveRows()
+        # nomor urut baris di bawahnya ikut bergeser
+        if row < len(self.cart):
+            self.dataChanged.emit(self.index(row, 0), self.index(len(self.cart) - 1, 0))
+        return line
+
+    def clear(self):
+        self.beginResetModel()
+        self.cart.clear()
+        self.endResetModel()
+
+
+# ==========================================
+# MODEL TABEL LAPORAN BULANAN
+# ==========================================
+class ReportTableModel(QAbstractTableModel):
+    """Baris laporan satu bulan, dimuat per halaman (keyset pada sale_date, id) saat di-scroll.
+
+    Teks tanggal/rupiah diformat saat baris ditampilkan, jadi bulan dengan
+    ratusan ribu item tidak perlu dibuatkan item tabel untuk setiap selnya.
+    """
+
+    HEADERS = ["Tanggal Pembelian", "Produk", "Harga", "Jumlah", "Subtotal"]
+    BATCH_SIZE = REPORT_PAGE_SIZE
+
+    def __init__(self, tasks, parent=None):
+        super().__init__(parent)
+        self.tasks = tasks
+        self._rows = []          # list of (item_id, sale_date, name, price, qty, subtotal)
+        self._period = None      # (tahun, bulan)
+        self._exhausted = True
+        self._fetching = False
+        self._failed = False     # fetch gagal: berhenti memuat otomatis sampai load()
+        self._generation = 0
+
+    # ---------- API Qt ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            _, sale_date, name, price, qty, subtotal = self._rows[index.row()]
+            col = index.column()
+            if col == 0:
+                return format_tanggal(sale_date)
+            if col == 1:
+                return name
+            if col == 2:
+                return format_rupiah(price)
+            if col == 3:
+                return str(qty)
+            if col == 4:
+                return format_rupiah(subtotal)
+            return None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._fetching and not self._failed
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._fetching = True
+        generation = self._generation
+        after = (self._rows[-1][1], self._rows[-1][0]) if self._rows else None
+        self.tasks.submit(
+            fetch_report_page, *self._period, after, self.BATCH_SIZE,
+            on_result=lambda rows: self._append_page(rows, generation),
+            on_error=lambda e: self._fetch_failed(e, generation),
+            cancellable=False
+        )
+
+    # ---------- API untuk ReportWindow ----------
+    def load(self, year, month):
+        """Kosongkan tabel lalu muat halaman pertama bulan ``month``/``year``."""
+        self.beginResetModel()
+        self._generation += 1
+        self._period = (year, month)
+        self._rows = []
+        self._exhausted = False
+        self._fetching = False
+        self._failed = False
+        self.endResetModel()
+        self.fetchMore()
+
+    # ---------- callback hasil query ----------
+    def _append_page(self, rows, generation):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        if len(rows) < self.BATCH_SIZE:
+            self._exhausted = True
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def _fetch_failed(self, error, generation):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        self._failed = True
+        self.tasks.show_error(error, "Gagal memuat laporan")
@@ -1,16 +1,28 @@
+import sqlite3
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHBoxLayout, QDialog,
-    QLineEdit, QFormLayout, QMessageBox, QHeaderView
+    QTableView, QHBoxLayout, QDialog,
+    QLineEdit, QFormLayout, QMessageBox, QHeaderView, QTableWidget, QTableWidgetItem
 )
-from PyQt6.QtCore import Qt
-from app.database.db import get_connection
+from PyQt6.QtCore import Qt, QTimer
+from app.database.db import create_product, edit_product, remove_product
+from app.services.exports import export_products_csv, export_products_pdf
+from app.services.imports import import_products_csv
+from app.ui.delegates import ActionButtonsDelegate
+from app.ui.models import ProductTableModel
+from app.ui.tasks import TaskRunner, BusyIndicator
+
+REORDER_LIMIT = 500
+
 
 class ProductWindow(QWidget):
+    # Data yang ditampilkan layar ini (lihat MainWindow.switch_screen)
+    DEPENDS_ON = ("products",)
+
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
-        self.product_ids = []  # menyimpan id asli dari database
+        self.tasks = TaskRunner(self)
 
         # Layout utama
         layout = QVBoxLayout()
@@ -34,6 +46,16 @@ class ProductWindow(QWidget):
         export_layout = QHBoxLayout()
         export_layout.addStretch()  # supaya tombol rata kanan
 
+        btn_import_csv = QPushButton("📥 Import CSV")
+        btn_import_csv.setStyleSheet("""
+            background-color: #16a085;
+            color: white;
+            padding: 8px 14px;
+            font-weight: bold;
+            border-radius: 6px;
+        """)
+        btn_import_csv.clicked.connect(self.import_from_csv)
+
         btn_export_csv = QPushButton("📄 Export CSV")
         btn_export_csv.setStyleSheet("""
             background-color: #f39c12;
@@ -54,10 +76,25 @@ class ProductWindow(QWidget):
         """)
         btn_export_pdf.clicked.connect(self.export_to_pdf)
 
+        btn_reorder = QPushButton("📦 Saran Restock")
+        btn_reorder.setStyleSheet("""
+            background-color: #d35400;
+            color: white;
+            padding: 8px 14px;
+            font-weight: bold;
+            border-radius: 6px;
+        """)
+        btn_reorder.clicked.connect(self.show_reorder_list)
+
+        export_layout.addWidget(btn_reorder)
+        export_layout.addWidget(btn_import_csv)
         export_layout.addWidget(btn_export_csv)
         export_layout.addWidget(btn_export_pdf)
         layout.addLayout(export_layout)
 
+        # Indikator proses background (load / export)
+        layout.addWidget(BusyIndicator(self.tasks))
+
         # Pencarian Produk Real-time
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
@@ -65,30 +102,37 @@ class ProductWindow(QWidget):
         self.search_input.setStyleSheet("padding: 8px; font-size: 16px;")
         search_layout.addWidget(self.search_input)
         layout.addLayout(search_layout)
-        self.search_input.textChanged.connect(self.search_product)
 
-        # Tabel Produk
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["No", "Nama", "Harga", "Stok", "Aksi"])
+        # Debounce: cari setelah user berhenti mengetik sebentar, bukan tiap tombol
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.search_product)
+        self.search_input.textChanged.connect(self.search_timer.start)
+
+        # Tabel Produk (model dimuat bertahap, hanya baris terlihat yang digambar)
+        self.model = ProductTableModel(self.tasks, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(50)
         self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 font-size: 17px;
                 border: 1px solid #34495e;
                 border-radius: 10px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
-            QTableWidget::item:alternate {
+            QTableView::item:alternate {
                 background-color: #ecf0f1; 
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #2980b9;
                 color: white;
             }
@@ -101,6 +145,13 @@ class ProductWindow(QWidget):
                 border: 1px solid #2c3e50;
             }
         """)
+
+        # Tombol Edit & Hapus digambar oleh satu delegate untuk semua baris
+        self.action_delegate = ActionButtonsDelegate(
+            [("Edit", "#2980b9"), ("Hapus", "#e74c3c")], self.table
+        )
+        self.action_delegate.clicked.connect(self.handle_action)
+        self.table.setItemDelegateForColumn(ProductTableModel.ACTION_COLUMN, self.action_delegate)
         layout.addWidget(self.table)
 
         header = self.table.horizontalHeader()
@@ -109,6 +160,7 @@ class ProductWindow(QWidget):
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
 
         # Tombol tambah & kembali
         button_layout = QHBoxLayout()
@@ -129,69 +181,23 @@ class ProductWindow(QWidget):
     # LOAD DATA PRODUK
     # ==========================================
     def load_products(self):
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, price, stock FROM products")
-        rows = cursor.fetchall()
-        conn.close()
-
-        self.product_ids = []
-        self.table.setRowCount(len(rows))
-
-        for i, row in enumerate(rows):
-            product_id, name, price, stock = row
-            self.product_ids.append(product_id)
-
-            self.table.setRowHeight(i, 50)
-
-            # No urut manual
-            no_item = QTableWidgetItem(str(i + 1))
-            no_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(i, 0, no_item)
-
-            # Nama
-            item_name = QTableWidgetItem(name)
-            item_name.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(i, 1, item_name)
-
-            # Harga
-            price_str = f"Rp {int(price):,}".replace(",", ".")
-            item_price = QTableWidgetItem(price_str)
-            item_price.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(i, 2, item_price)
-
-            # Stok
-            item_stock = QTableWidgetItem(str(stock))
-            item_stock.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(i, 3, item_stock)
-
-            # Aksi
-            btn_edit = QPushButton("Edit")
-            btn_edit.setStyleSheet("background-color: #2980b9; color: white; padding: 8px 16px; font-weight: bold; font-size: 14px;")
-            btn_edit.clicked.connect(lambda checked, r=i: self.open_edit_product(r))
-
-            btn_delete = QPushButton("Hapus")
-            btn_delete.setStyleSheet("background-color: #e74c3c; color: white; padding: 8px 16px; font-weight: bold; font-size: 14px;")
-            btn_delete.clicked.connect(lambda checked, r=i: self.delete_product(r))
-
-            action_layout = QHBoxLayout()
-            action_layout.addWidget(btn_edit)
-            action_layout.addWidget(btn_delete)
-            action_layout.setContentsMargins(0,0,0,0)
-            action_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            action_widget = QWidget()
-            action_widget.setLayout(action_layout)
-            action_widget.setStyleSheet("background-color: transparent;")
-            self.table.setCellWidget(i, 4, action_widget)
+        self.model.reload()
+
+    def refresh_data(self, changed):
+        # Produk berubah saat layar tersembunyi (mis. stok berkurang karena transaksi)
+        self.model.reload()
+
+    def handle_action(self, row, button):
+        if button == 0:
+            self.open_edit_product(row)
+        else:
+            self.delete_product(row)
 
     # ==========================================
     # PENCARIAN REAL-TIME
     # ==========================================
     def search_product(self):
-        query = self.search_input.text().lower()
-        for i in range(self.table.rowCount()):
-            item = self.table.item(i, 1)  # Nama Produk
-            self.table.setRowHidden(i, query not in item.text().lower())
+        self.model.reload(search=self.search_input.text().strip())
 
     # ==========================================
     # TAMBAH PRODUK
@@ -220,6 +226,14 @@ class ProductWindow(QWidget):
         input_stock.setPlaceholderText("exc: 10")
         input_stock.setStyleSheet("padding: 5px; font-size: 16px; border: 1px solid #bdc3c7; border-radius: 6px;")
 
+        input_barcode = QLineEdit()
+        input_barcode.setPlaceholderText("scan / ketik barcode (opsional)")
+        input_barcode.setStyleSheet("padding: 5px; font-size: 16px; border: 1px solid #bdc3c7; border-radius: 6px;")
+
+        input_reorder = QLineEdit()
+        input_reorder.setPlaceholderText("stok minimum, exc: 5 (opsional)")
+        input_reorder.setStyleSheet("padding: 5px; font-size: 16px; border: 1px solid #bdc3c7; border-radius: 6px;")
+
         label_name = QLabel("Nama Produk:")
         label_name.setStyleSheet("font-weight: bold; font-size: 16px;")
         form_layout.addRow(label_name, input_name)
@@ -232,6 +246,14 @@ class ProductWindow(QWidget):
         label_stock.setStyleSheet("font-weight: bold; font-size: 16px;")
         form_layout.addRow(label_stock, input_stock)
 
+        label_barcode = QLabel("Barcode/SKU:")
+        label_barcode.setStyleSheet("font-weight: bold; font-size: 16px;")
+        form_layout.addRow(label_barcode, input_barcode)
+
+        label_reorder = QLabel("Batas Restock:")
+        label_reorder.setStyleSheet("font-weight: bold; font-size: 16px;")
+        form_layout.addRow(label_reorder, input_reorder)
+
         # Tombol simpan dan batal dengan style modern
         btn_save = QPushButton("Simpan")
         btn_save.setStyleSheet("""
@@ -242,7 +264,7 @@ class ProductWindow(QWidget):
             font-weight: bold;
             border-radius: 5px;
         """)
-        btn_save.clicked.connect(lambda: self.save_product(dialog, input_name.text(), input_price.text(), input_stock.text()))
+        btn_save.clicked.connect(lambda: self.save_product(dialog, input_name.text(), input_price.text(), input_stock.text(), input_barcode.text(), input_reorder.text()))
 
         btn_cancel = QPushButton("Batal")
         btn_cancel.setStyleSheet("""
@@ -269,63 +291,64 @@ class ProductWindow(QWidget):
         dialog.exec()
 
 
-    def save_product(self, dialog, name, price, stock):
+    def save_product(self, dialog, name, price, stock, barcode="", reorder_level=""):
         if not name or not price:
             QMessageBox.warning(self, "Error", "Nama dan harga tidak boleh kosong!")
             return
         try:
             price = float(price)
             stock = int(stock)
+            reorder_level = int(reorder_level or 0)
         except ValueError:
-            QMessageBox.warning(self, "Error", "Harga dan stok harus berupa angka!")
+            QMessageBox.warning(self, "Error", "Harga, stok dan batas restock harus berupa angka!")
             return
 
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO products (name, price, stock) VALUES (?, ?, ?)", (name, price, stock))
-        conn.commit()
-        conn.close()
-
-        msg = QMessageBox(self)
-        msg.setWindowTitle("✅ Sukses")
-        msg.setText(f"Produk <b>{name}</b> berhasil ditambahkan!")
-        msg.setIcon(QMessageBox.Icon.Information)
-        msg.setStyleSheet("""
-            QMessageBox {
-                background-color: #f9f9f9;
-                border-radius: 10px;
-                padding: 15px;
-            }
-            QMessageBox QLabel {
-                color: #2c3e50;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            QMessageBox QPushButton {
-                background-color: #27ae60;
-                color: white;
-                font-weight: bold;
-                padding: 8px 16px;
-                border-radius: 6px;
-                min-width: 80px;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: #2ecc71;
-            }
-        """)
-        msg.exec()
+        def on_saved(_):
+            msg = QMessageBox(self)
+            msg.setWindowTitle("✅ Sukses")
+            msg.setText(f"Produk <b>{name}</b> berhasil ditambahkan!")
+            msg.setIcon(QMessageBox.Icon.Information)
+            msg.setStyleSheet("""
+                QMessageBox {
+                    background-color: #f9f9f9;
+                    border-radius: 10px;
+                    padding: 15px;
+                }
+                QMessageBox QLabel {
+                    color: #2c3e50;
+                    font-size: 16px;
+                    font-weight: bold;
+                }
+                QMessageBox QPushButton {
+                    background-color: #27ae60;
+                    color: white;
+                    font-weight: bold;
+                    padding: 8px 16px;
+                    border-radius: 6px;
+                    min-width: 80px;
+                }
+                QMessageBox QPushButton:hover {
+                    background-color: #2ecc71;
+                }
+            """)
+            msg.exec()
 
-        dialog.accept()
-        self.load_products()
+            dialog.accept()
+
+        def on_created(product_id):
+            self.model.product_added(product_id)
+            on_saved(product_id)
+
+        self.tasks.submit(
+            create_product, name, price, stock, barcode.strip(), reorder_level,
+            on_result=on_created, on_error=self.show_save_error
+        )
 
     # ==========================================
     # EDIT PRODUK
     # ==========================================
     def open_edit_product(self, row_index):
-        product_id = self.product_ids[row_index]
-        old_name = self.table.item(row_index, 1).text()
-        old_price = self.table.item(row_index, 2).text()
-        old_stock = self.table.item(row_index, 3).text()
+        product_id, old_name, old_price, old_stock, old_barcode, old_reorder = self.model.product_at(row_index)
 
         dialog = QDialog(self)
         dialog.setWindowTitle("Edit Produk")
@@ -340,13 +363,18 @@ class ProductWindow(QWidget):
         input_name = QLineEdit(old_name)
         input_name.setStyleSheet("padding: 8px; font-size: 16px; border: 1px solid #bdc3c7; border-radius: 6px;")
 
-        old_price_clean = old_price.replace("Rp ", "").replace(".", "").strip()
-        input_price = QLineEdit(old_price_clean)
+        input_price = QLineEdit(str(int(old_price)))
         input_price.setStyleSheet("padding: 8px; font-size: 16px; border: 1px solid #bdc3c7; border-radius: 6px;")
 
-        input_stock = QLineEdit(old_stock)
+        input_stock = QLineEdit(str(old_stock))
         input_stock.setStyleSheet("padding: 8px; font-size: 16px; border: 1px solid #bdc3c7; border-radius: 6px;")
 
+        input_barcode = QLineEdit(old_barcode or "")
+        input_barcode.setStyleSheet("padding: 8px; font-size: 16px; border: 1px solid #bdc3c7; border-radius: 6px;")
+
+        input_reorder = QLineEdit(str(old_reorder))
+        input_reorder.setStyleSheet("padding: 8px; font-size: 16px; border: 1px solid #bdc3c7; border-radius: 6px;")
+
         label_name = QLabel("Nama Produk:")
         label_name.setStyleSheet("font-weight: bold; font-size: 16px;")
         form_layout.addRow(label_name, input_name)
@@ -359,6 +387,14 @@ class ProductWindow(QWidget):
         label_stock.setStyleSheet("font-weight: bold; font-size: 16px;")
         form_layout.addRow(label_stock, input_stock)
 
+        label_barcode = QLabel("Barcode/SKU:")
+        label_barcode.setStyleSheet("font-weight: bold; font-size: 16px;")
+        form_layout.addRow(label_barcode, input_barcode)
+
+        label_reorder = QLabel("Batas Restock:")
+        label_reorder.setStyleSheet("font-weight: bold; font-size: 16px;")
+        form_layout.addRow(label_reorder, input_reorder)
+
         btn_update = QPushButton("💾 Simpan Perubahan")
         btn_update.setStyleSheet("""
             background-color: #2980b9;
@@ -368,7 +404,7 @@ class ProductWindow(QWidget):
             font-weight: bold;
             border-radius: 8px;
         """)
-        btn_update.clicked.connect(lambda: self.update_product(dialog, product_id, input_name.text(), input_price.text(), input_stock.text()))
+        btn_update.clicked.connect(lambda: self.update_product(dialog, product_id, input_name.text(), input_price.text(), input_stock.text(), input_barcode.text(), input_reorder.text()))
 
         btn_cancel = QPushButton("❌ Batal")
         btn_cancel.setStyleSheet("""
@@ -394,62 +430,68 @@ class ProductWindow(QWidget):
         dialog.exec()
 
 
-    def update_product(self, dialog, product_id, name, price, stock):
+    def update_product(self, dialog, product_id, name, price, stock, barcode="", reorder_level=""):
         if not name or not price:
             QMessageBox.warning(self, "Error", "Nama dan harga tidak boleh kosong!")
             return
         try:
             price = float(price.replace("Rp", "").replace(".", "").strip())
             stock = int(stock)
+            reorder_level = int(reorder_level or 0)
         except ValueError:
-            QMessageBox.warning(self, "Error", "Harga dan stok harus berupa angka!")
+            QMessageBox.warning(self, "Error", "Harga, stok dan batas restock harus berupa angka!")
             return
 
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE products SET name=?, price=?, stock=? WHERE id=?", (name, price, stock, product_id))
-        conn.commit()
-        conn.close()
-
-        msg = QMessageBox(self)
-        msg.setWindowTitle("✅ Sukses")
-        msg.setText(f"Produk <b>{name}</b> berhasil diperbarui!")
-        msg.setIcon(QMessageBox.Icon.Information)
-        msg.setStyleSheet("""
-            QMessageBox {
-                background-color: #f9f9f9;
-                border-radius: 10px;
-                padding: 15px;
-            }
-            QMessageBox QLabel {
-                color: #2c3e50;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            QMessageBox QPushButton {
-                background-color: #27ae60;
-                color: white;
-                font-weight: bold;
-                padding: 8px 16px;
-                border-radius: 6px;
-                min-width: 80px;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: #2ecc71;
-            }
-        """)
-        msg.exec()
+        def on_saved(_):
+            msg = QMessageBox(self)
+            msg.setWindowTitle("✅ Sukses")
+            msg.setText(f"Produk <b>{name}</b> berhasil diperbarui!")
+            msg.setIcon(QMessageBox.Icon.Information)
+            msg.setStyleSheet("""
+                QMessageBox {
+                    background-color: #f9f9f9;
+                    border-radius: 10px;
+                    padding: 15px;
+                }
+                QMessageBox QLabel {
+                    color: #2c3e50;
+                    font-size: 16px;
+                    font-weight: bold;
+                }
+                QMessageBox QPushButton {
+                    background-color: #27ae60;
+                    color: white;
+                    font-weight: bold;
+                    padding: 8px 16px;
+                    border-radius: 6px;
+                    min-width: 80px;
+                }
+                QMessageBox QPushButton:hover {
+                    background-color: #2ecc71;
+                }
+            """)
+            msg.exec()
 
-        dialog.accept()
-        self.load_products()
+            dialog.accept()
+            self.model.product_changed(product_id)
+
+        self.tasks.submit(
+            edit_product, product_id, name, price, stock, barcode.strip(), reorder_level,
+            on_result=on_saved, on_error=self.show_save_error
+        )
+
+    def show_save_error(self, error):
+        if isinstance(error, sqlite3.IntegrityError):
+            QMessageBox.warning(self, "Error", "Barcode sudah dipakai produk lain!")
+        else:
+            QMessageBox.critical(self, "Error", f"Gagal menyimpan produk:\n{error}")
 
 
     # ==========================================
     # HAPUS PRODUK
     # ==========================================
     def delete_product(self, row_index):
-        product_id = self.product_ids[row_index]
-        product_name = self.table.item(row_index, 1).text()
+        product_id, product_name = self.model.product_at(row_index)[:2]
 
         # === Konfirmasi hapus dengan style modern ===
         confirm_box = QMessageBox(self)
@@ -498,49 +540,80 @@ class ProductWindow(QWidget):
 
         # === Jika user klik "Ya" ===
         if confirm == QMessageBox.StandardButton.Yes:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM products WHERE id=?", (product_id,))
-            conn.commit()
-            conn.close()
-
-            # === Pesan sukses dengan style sama ===
-            success_box = QMessageBox(self)
-            success_box.setWindowTitle("✅ Sukses")
-            success_box.setText(f"Produk <b>{product_name}</b> telah dihapus.")
-            success_box.setIcon(QMessageBox.Icon.Information)
-            success_box.setStyleSheet("""
-                QMessageBox {
-                    background-color: #f9f9f9;
-                    border-radius: 10px;
-                    padding: 15px;
-                }
-                QMessageBox QLabel {
-                    color: #2c3e50;
-                    font-size: 16px;
-                    font-weight: bold;
-                }
-                QMessageBox QPushButton {
-                    background-color: #27ae60;
-                    color: white;
-                    font-weight: bold;
-                    padding: 8px 16px;
-                    border-radius: 6px;
-                    min-width: 80px;
-                }
-                QMessageBox QPushButton:hover {
-                    background-color: #2ecc71;
-                }
-            """)
-            success_box.exec()
+            def on_deleted(_):
+                # === Pesan sukses dengan style sama ===
+                success_box = QMessageBox(self)
+                success_box.setWindowTitle("✅ Sukses")
+                success_box.setText(f"Produk <b>{product_name}</b> telah dihapus.")
+                success_box.setIcon(QMessageBox.Icon.Information)
+                success_box.setStyleSheet("""
+                    QMessageBox {
+                        background-color: #f9f9f9;
+                        border-radius: 10px;
+                        padding: 15px;
+                    }
+                    QMessageBox QLabel {
+                        color: #2c3e50;
+                        font-size: 16px;
+                        font-weight: bold;
+                    }
+                    QMessageBox QPushButton {
+                        background-color: #27ae60;
+                        color: white;
+                        font-weight: bold;
+                        padding: 8px 16px;
+                        border-radius: 6px;
+                        min-width: 80px;
+                    }
+                    QMessageBox QPushButton:hover {
+                        background-color: #2ecc71;
+                    }
+                """)
+                success_box.exec()
+
+                self.model.product_removed(product_id)
+
+            self.tasks.submit(remove_product, product_id, on_result=on_deleted)
 
-            self.load_products()
+    # ==========================================
+    # IMPORT DARI CSV
+    # ==========================================
+    def import_from_csv(self):
+        from PyQt6.QtWidgets import QFileDialog
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import Produk dari CSV", "", "CSV/TSV Files (*.csv *.tsv *.txt)"
+        )
+        if not file_path:
+            return
+
+        # Tabel cukup dimuat ulang sekali setelah import selesai (atau dibatalkan)
+        def on_imported(result):
+            self.model.reload()
+            message = f"{result['inserted']} produk ditambahkan, {result['updated']} produk diperbarui."
+            if result["error_count"]:
+                message += f"\n\n{result['error_count']} baris gagal:\n" + "\n".join(result["errors"][:10])
+                if result["error_count"] > 10:
+                    message += "\n..."
+            QMessageBox.information(self, "Import Selesai", message)
+
+        def on_failed(error):
+            self.model.reload()
+            QMessageBox.critical(self, "Error", f"Gagal import CSV:\n{str(error)}")
+
+        self.tasks.submit(
+            import_products_csv, file_path,
+            on_result=on_imported,
+            on_error=on_failed,
+            on_cancelled=self.model.reload,
+            with_task=True,
+            long_running=True
+        )
 
     # ==========================================
     # EXPORT TO CSV DENGAN TANGGAL HARI INI
     # ==========================================
     def export_to_csv(self):
-        import csv
         from datetime import datetime
         from PyQt6.QtWidgets import QFileDialog, QMessageBox
 
@@ -555,25 +628,15 @@ class ProductWindow(QWidget):
         if not file_path:
             return
 
-        # Ambil data dari database
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, price, stock FROM products")
-        rows = cursor.fetchall()
-        conn.close()
-
-        # Simpan ke CSV
-        try:
-            with open(file_path, "w", newline="", encoding="utf-8") as file:
-                writer = csv.writer(file)
-                writer.writerow(["Nama Produk", "Harga (Rp)", "Stok"])
-                for name, price, stock in rows:
-                    price_str = f"{int(price):,}".replace(",", ".")  # format Indonesia
-                    writer.writerow([name, price_str, stock])
-
-            QMessageBox.information(self, "Sukses", f"Data produk berhasil diexport ke:\n{file_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Gagal export CSV:\n{str(e)}")
+        # Tulis CSV di background
+        self.tasks.submit(
+            export_products_csv, file_path,
+            on_result=lambda _: QMessageBox.information(self, "Sukses", f"Data produk berhasil diexport ke:\n{file_path}"),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Gagal export CSV:\n{str(e)}"),
+            on_cancelled=lambda: QMessageBox.information(self, "Dibatalkan", "Export CSV dibatalkan."),
+            with_task=True,
+            long_running=True
+        )
 
 
     # ==========================================
@@ -583,14 +646,12 @@ class ProductWindow(QWidget):
     # EXPORT TO PDF DENGAN NAMA FILE & WAKTU CETAK
     # ==========================================
     def export_to_pdf(self):
-        from fpdf import FPDF
         from datetime import datetime
         from PyQt6.QtWidgets import QFileDialog, QMessageBox
 
         # Ambil tanggal & waktu sekarang
         now = datetime.now()
         today_str = now.strftime("%Y-%m-%d")
-        time_str = now.strftime("%H:%M:%S")
         default_filename = f"daftar_product_{today_str}.pdf"
 
         # Pilih lokasi file dengan nama default
@@ -600,46 +661,57 @@ class ProductWindow(QWidget):
         if not file_path:
             return
 
-        # Ambil data dari database
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, price, stock FROM products")
-        rows = cursor.fetchall()
-        conn.close()
-
-        # Buat file PDF
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, "Daftar Produk", ln=True, align="C")
-        pdf.ln(5)
-
-        # Tambahkan waktu cetak di bawah judul
-        pdf.set_font("Arial", "", 11)
-        pdf.cell(0, 8, f"Dicetak pada: {today_str} pukul {time_str}", ln=True, align="C")
-        pdf.ln(8)
-
-        # Header tabel
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(80, 10, "Nama Produk", 1, align="C")
-        pdf.cell(40, 10, "Harga", 1, align="C")
-        pdf.cell(30, 10, "Stok", 1, align="C")
-        pdf.ln()
-
-        # Isi tabel
-        pdf.set_font("Arial", "", 12)
-        for name, price, stock in rows:
-            pdf.cell(80, 10, name, 1)
-            pdf.cell(40, 10, f"Rp {int(price):,}".replace(",", "."), 1, align="R")
-            pdf.cell(30, 10, str(stock), 1, align="C")
-            pdf.ln()
-
-        # Simpan PDF
-        pdf.output(file_path)
-
-        QMessageBox.information(self, "Sukses", f"Data produk berhasil diexport ke:\n{file_path}")
+        # Buat file PDF di background
+        self.tasks.submit(
+            export_products_pdf, file_path, now,
+            on_result=lambda _: QMessageBox.information(self, "Sukses", f"Data produk berhasil diexport ke:\n{file_path}"),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Gagal export PDF:\n{str(e)}"),
+            on_cancelled=lambda: QMessageBox.information(self, "Dibatalkan", "Export PDF dibatalkan."),
+            with_task=True,
+            long_running=True
+        )
+
+
 
+    # ==========================================
+    # SARAN RESTOCK (forecast stok habis)
+    # ==========================================
+    def show_reorder_list(self):
+        # NumPy cukup berat: modul forecast baru di-import saat fitur ini dipakai
+        from app.services.forecast import reorder_list
+
+        self.tasks.submit(
+            reorder_list, limit=REORDER_LIMIT,
+            on_result=self.open_reorder_dialog,
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Gagal menghitung saran restock:\n{str(e)}")
+        )
+
+    def open_reorder_dialog(self, rows):
+        if not rows:
+            QMessageBox.information(self, "Stok Aman", "Tidak ada produk yang diperkirakan habis dalam waktu dekat.")
+            return
 
+        table = QTableWidget(len(rows), 6)
+        table.setHorizontalHeaderLabels(
+            ["Produk", "Stok", "Terjual/Hari", "Habis Dalam", "Perkiraan Habis", "Saran Pesan"]
+        )
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        for i, (_, name, stock, demand, days_left, empty_on, suggested) in enumerate(rows):
+            values = [name, stock, f"{demand:.1f}", f"{days_left:.0f} hari",
+                      empty_on.strftime("%d-%m-%Y"), suggested]
+            for j, value in enumerate(values):
+                table.setItem(i, j, QTableWidgetItem(str(value)))
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Saran Restock ({len(rows)} produk)")
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Produk yang diperkirakan habis sebelum pesanan baru datang:"))
+        layout.addWidget(table)
+        dialog.setLayout(layout)
+        dialog.resize(800, 450)
+        dialog.exec()
 
     # ==========================================
     # KEMBALI KE MENU UTAMA
@@ -1,20 +1,27 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QDialog,
-    QPushButton, QHBoxLayout, QComboBox, QFileDialog, QMessageBox, QHeaderView
+    QWidget, QVBoxLayout, QLabel, QTableView, QDialog, QTableWidget, QTableWidgetItem,
+    QPushButton, QHBoxLayout, QComboBox, QFileDialog, QMessageBox, QHeaderView, QTabWidget
 )
-from app.database.db import get_connection
-import csv
-from datetime import datetime
-import mplcursors
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-
+from PyQt6.QtGui import QColor
+from app.services.exports import export_report_csv
+from app.services.reports import fetch_report_totals, fetch_daily_qty, fetch_month_analytics
+from app.services.analytics import WEEKDAYS, abc_summary
+from app.services.formatting import format_rupiah, format_tanggal
+from app.ui.tasks import TaskRunner, BusyIndicator
+from app.ui.charts import LineChart
+from app.ui.models import ReportTableModel
+from datetime import date, datetime, timedelta
 
 
 class ReportWindow(QWidget):
+    # Data yang ditampilkan layar ini (lihat MainWindow.switch_screen)
+    DEPENDS_ON = ("sales", "products")
+
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
+        self.tasks = TaskRunner(self)
+        self.totals_task = None
         layout = QVBoxLayout()
 
         # Judul
@@ -73,11 +80,13 @@ class ReportWindow(QWidget):
         # Tombol
         btn_load = QPushButton("Tampilkan Laporan")
         btn_chart = QPushButton("📈 Tampilkan Chart")
+        btn_analytics = QPushButton("📊 Analitik")
         btn_export = QPushButton("Export ke CSV")
         btn_back = QPushButton("⬅️ Kembali ke Menu")
 
         btn_load.clicked.connect(self.load_report)
         btn_chart.clicked.connect(self.show_chart)   
+        btn_analytics.clicked.connect(self.show_analytics)
         btn_export.clicked.connect(self.export_csv)
         btn_back.clicked.connect(self.go_back)
 
@@ -85,6 +94,7 @@ class ReportWindow(QWidget):
         btn_style = {
             "load": {"bg": "#3498db", "hover": "#2980b9", "pressed": "#1d4ed8"},
             "chart": {"bg": "#8e44ad", "hover": "#9b59b6", "pressed": "#7d3c98"},
+            "analytics": {"bg": "#16a085", "hover": "#1abc9c", "pressed": "#138d75"},
             "export": {"bg": "#27ae60", "hover": "#2ecc71", "pressed": "#27ae60"},
             "back": {"bg": "#e74c3c", "hover": "#c0392b", "pressed": "#e74c3c"}
         }
@@ -109,38 +119,43 @@ class ReportWindow(QWidget):
 
         set_button_style(btn_load, btn_style["load"])
         set_button_style(btn_chart, btn_style["chart"])
+        set_button_style(btn_analytics, btn_style["analytics"])
         set_button_style(btn_export, btn_style["export"])
         set_button_style(btn_back, btn_style["back"])
 
         hbox_btn = QHBoxLayout()
         hbox_btn.addWidget(btn_load)
         hbox_btn.addWidget(btn_chart)
+        hbox_btn.addWidget(btn_analytics)
         hbox_btn.addWidget(btn_export)
         hbox_btn.addWidget(btn_back)
         layout.addLayout(hbox_btn)
+        layout.addWidget(BusyIndicator(self.tasks))
 
         # ================== Tabel laporan ==================
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Tanggal Pembelian", "Produk", "Harga", "Jumlah", "Subtotal"])
+        # Model memuat baris per halaman saat tabel di-scroll; tinggi baris seragam
+        # (tanpa resizeRowsToContents yang mengukur setiap baris)
+        self.model = ReportTableModel(self.tasks, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.verticalHeader().setVisible(False)
-        self.table.setWordWrap(True)
+        self.table.verticalHeader().setDefaultSectionSize(36)
+        self.table.setWordWrap(False)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #ddd;
                 font-size: 14px;
             }
-            QTableWidget QHeaderView::section {
+            QTableView QHeaderView::section {
                 background-color: #34495e;
                 color: white;
                 padding: 10px;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
-                white-space: pre-wrap;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #f39c12;
                 color: white;
             }
@@ -180,74 +195,37 @@ class ReportWindow(QWidget):
 
     # ======================= UTIL: Format tanggal Indonesia =======================
     def format_tanggal(self, tanggal_str):
-        bulan_indonesia = [
-            "Januari", "Februari", "Maret", "April", "Mei", "Juni",
-            "Juli", "Agustus", "September", "Oktober", "November", "Desember"
-        ]
-        try:
-            dt = datetime.strptime(tanggal_str, "%Y-%m-%d %H:%M:%S")
-            return f"{dt.day} {bulan_indonesia[dt.month - 1]} {dt.year} {dt.strftime('%H:%M')}"
-        except ValueError:
-            try:
-                dt = datetime.strptime(tanggal_str, "%Y-%m-%d")
-                return f"{dt.day} {bulan_indonesia[dt.month - 1]} {dt.year}"
-            except ValueError:
-                return tanggal_str  # fallback
+        return format_tanggal(tanggal_str)
 
     # ======================= UTIL: Format Rupiah =======================
     def format_rupiah(self, amount):
         """Format angka menjadi Rp 12.000 tanpa desimal"""
-        return f"Rp {int(amount):,}".replace(",", ".")
+        return format_rupiah(amount)
 
     # ======================= LOAD REPORT =======================
+    def refresh_data(self, changed):
+        self.load_report()
+
     def load_report(self):
         month_index = self.cmb_month.currentIndex() + 1
         year = int(self.cmb_year.currentText())
 
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT s.sale_date, p.name, si.price, si.qty, (si.price * si.qty) AS subtotal
-            FROM sales s
-            JOIN sales_items si ON s.id = si.sale_id
-            JOIN products p ON si.product_id = p.id
-            WHERE strftime('%Y', s.sale_date) = ? AND strftime('%m', s.sale_date) = ?
-            ORDER BY s.sale_date ASC
-        """, (str(year), f"{month_index:02d}"))
-        rows = cursor.fetchall()
-        conn.close()
-
-        self.table.setRowCount(0)
         self.empty_label.setText("")
-        total_sales = 0
-        total_qty = 0
+        self.model.load(year, month_index)
 
-        if not rows:
-            self.empty_label.setText("📭 Belum ada transaksi pada bulan ini.")
-            self.total_label.setText("Total Penjualan: Rp0 | Total Barang Terjual: 0")
-            return
+        # Batalkan permintaan bulan sebelumnya agar hasil lama tidak menimpa label total
+        if self.totals_task:
+            self.totals_task.cancel()
+        self.totals_task = self.tasks.submit(
+            fetch_report_totals, year, month_index, on_result=self.show_totals
+        )
 
-        self.table.setRowCount(len(rows))
-        for i, row in enumerate(rows):
-            formatted_date = self.format_tanggal(row[0])
-            row_data = [
-                formatted_date,
-                row[1],
-                self.format_rupiah(row[2]),  # Harga
-                row[3],
-                self.format_rupiah(row[4])   # Subtotal
-            ]
-
-            for j, value in enumerate(row_data):
-                item = QTableWidgetItem(str(value))
-                item.setTextAlignment(1)  # kiri-atas
-                self.table.setItem(i, j, item)
-
-            total_sales += row[4]
-            total_qty += row[3]
-
-        self.table.resizeRowsToContents()
-        self.total_label.setText(f"Total Penjualan: {self.format_rupiah(total_sales)} | Total Barang Terjual: {total_qty}")
+    def show_totals(self, totals):
+        count, total_sales, total_qty = totals
+        self.empty_label.setText("" if count else "📭 Belum ada transaksi pada bulan ini.")
+        self.total_label.setText(
+            f"Total Penjualan: {self.format_rupiah(total_sales)} | Total Barang Terjual: {total_qty}"
+        )
 
     # ======================= EXPORT CSV =======================
     def export_csv(self):
@@ -264,88 +242,41 @@ class ReportWindow(QWidget):
         if not filename:
             return
 
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT s.sale_date, p.name, si.price, si.qty, (si.price * si.qty) AS subtotal
-            FROM sales s
-            JOIN sales_items si ON s.id = si.sale_id
-            JOIN products p ON si.product_id = p.id
-            WHERE strftime('%Y', s.sale_date) = ? AND strftime('%m', s.sale_date) = ?
-            ORDER BY s.sale_date ASC
-        """, (str(year), f"{month_index:02d}"))
-        rows = cursor.fetchall()
-        conn.close()
-
-        if not rows:
-            QMessageBox.information(self, "Tidak Ada Data", "Tidak ada transaksi untuk bulan ini, jadi tidak bisa diekspor.")
-            return
-
-        total_qty = 0
-        total_sales = 0
-        with open(filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Tanggal Pembelian", "Produk", "Harga", "Jumlah", "Subtotal"])
-            for row in rows:
-                formatted_date = self.format_tanggal(row[0])
-                row_data = [
-                    formatted_date,
-                    row[1],
-                    self.format_rupiah(row[2]),
-                    row[3],
-                    self.format_rupiah(row[4])
-                ]
-                writer.writerow(row_data)
-                total_sales += row[4]
-                total_qty += row[3]
-
-            writer.writerow([])
-            writer.writerow(["", "TOTAL", "", total_qty, self.format_rupiah(total_sales)])
-
-        QMessageBox.information(self, "Berhasil", f"Laporan disimpan ke:\n{filename}")
+        def on_exported(count):
+            if not count:
+                QMessageBox.information(self, "Tidak Ada Data", "Tidak ada transaksi untuk bulan ini, jadi tidak bisa diekspor.")
+                return
+            QMessageBox.information(self, "Berhasil", f"Laporan disimpan ke:\n{filename}")
+
+        self.tasks.submit(
+            export_report_csv, filename, year, month_index,
+            on_result=on_exported,
+            on_cancelled=lambda: QMessageBox.information(self, "Dibatalkan", "Export laporan dibatalkan."),
+            with_task=True,
+            long_running=True
+        )
 
     def show_chart(self):
         month_index = self.cmb_month.currentIndex() + 1
         year = int(self.cmb_year.currentText())
 
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT DATE(s.sale_date) as tgl, SUM(si.qty) as total_qty
-            FROM sales s
-            JOIN sales_items si ON s.id = si.sale_id
-            WHERE strftime('%Y', s.sale_date) = ? AND strftime('%m', s.sale_date) = ?
-            GROUP BY DATE(s.sale_date)
-            ORDER BY DATE(s.sale_date) ASC
-        """, (str(year), f"{month_index:02d}"))
-        rows = cursor.fetchall()
-        conn.close()
+        self.tasks.submit(
+            fetch_daily_qty, year, month_index,
+            on_result=lambda rows: self.open_chart_dialog(rows, year)
+        )
 
+    def open_chart_dialog(self, rows, year):
         if not rows:
             QMessageBox.information(self, "Chart Kosong", "Belum ada transaksi di bulan ini.")
             return
 
-        dates = [row[0] for row in rows]
-        totals = [row[1] for row in rows]
-
-        fig = Figure(figsize=(8, 4))
-        ax = fig.add_subplot(111)
-        line, = ax.plot(dates, totals, marker='o', linestyle='-', color='teal')
-        ax.set_title(f"Total Barang Terjual per Tanggal ({self.cmb_month.currentText()} {year})")
-        ax.set_xlabel("Tanggal")
-        ax.set_ylabel("Jumlah Barang Terjual")
-        ax.grid(True)
-        fig.autofmt_xdate(rotation=45)
-
-        # ===== Tambahkan hover tooltip =====
-        cursor = mplcursors.cursor(line, hover=True)
-        cursor.connect(
-            "add",
-            lambda sel: sel.annotation.set_text(
-                f"{dates[int(sel.index)]}\n{totals[int(sel.index)]} barang"
-            )
+        chart = LineChart(
+            f"Total Barang Terjual per Tanggal ({self.cmb_month.currentText()} {year})", color="teal"
         )
-
+        chart.x_title = "Tanggal"
+        chart.y_title = "Jumlah Barang Terjual"
+        chart.tooltip_format = lambda date, total: f"{date}\n{int(total)} barang"
+        chart.set_data([row[0] for row in rows], [row[1] for row in rows])
 
         # ===== MODAL DIALOG =====
         self.chart_dialog = QDialog(self)
@@ -353,14 +284,125 @@ class ReportWindow(QWidget):
         self.chart_dialog.setModal(True)
 
         layout = QVBoxLayout()
-        canvas = FigureCanvas(fig)
-        layout.addWidget(canvas)
+        layout.addWidget(chart)
 
         self.chart_dialog.setLayout(layout)
         self.chart_dialog.resize(800, 400)
         self.chart_dialog.exec()  # tampilkan modal
 
 
+    # ======================= ANALITIK =======================
+    def show_analytics(self):
+        month_index = self.cmb_month.currentIndex() + 1
+        year = int(self.cmb_year.currentText())
+        period = f"{self.cmb_month.currentText()} {year}"
+
+        self.tasks.submit(
+            fetch_month_analytics, year, month_index,
+            on_result=lambda data: self.open_analytics_dialog(data, period)
+        )
+
+    def open_analytics_dialog(self, data, period):
+        if not data["top_revenue"]:
+            QMessageBox.information(self, "Analitik Kosong", "Belum ada transaksi di bulan ini.")
+            return
+
+        tabs = QTabWidget()
+        tabs.addTab(self.build_top_products_tab(data), "🏆 Produk Terlaris")
+        tabs.addTab(self.build_comparison_tab(data["comparison"]), "📅 Perbandingan")
+        tabs.addTab(self.build_heatmap_tab(data["heatmap"]), "🕒 Jam Ramai")
+        tabs.addTab(self.build_abc_tab(data["abc"]), "🔤 Kelas ABC")
+
+        # ===== MODAL DIALOG =====
+        self.analytics_dialog = QDialog(self)
+        self.analytics_dialog.setWindowTitle(f"Analitik Penjualan - {period}")
+        self.analytics_dialog.setModal(True)
+
+        layout = QVBoxLayout()
+        layout.addWidget(tabs)
+
+        self.analytics_dialog.setLayout(layout)
+        self.analytics_dialog.resize(900, 500)
+        self.analytics_dialog.exec()
+
+    def make_table(self, headers, rows):
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                table.setItem(i, j, QTableWidgetItem(str(value)))
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def build_top_products_tab(self, data):
+        widget = QWidget()
+        layout = QHBoxLayout(widget)
+        for title, rows in (("Menurut Pendapatan", data["top_revenue"]), ("Menurut Jumlah", data["top_qty"])):
+            box = QVBoxLayout()
+            box.addWidget(QLabel(f"<b>{title}</b>"))
+            box.addWidget(self.make_table(
+                ["#", "Produk", "Terjual", "Pendapatan", "Porsi"],
+                [(rank, name, qty, self.format_rupiah(revenue), f"{(share or 0) * 100:.1f}%")
+                 for rank, _, name, qty, revenue, share in rows]
+            ))
+            layout.addLayout(box)
+        return widget
+
+    def build_comparison_tab(self, comparison):
+        def change(value):
+            return "-" if value is None else f"{value:+.1f}%"
+
+        def period(name):
+            # "end" eksklusif: tampilkan hari terakhir yang ikut dihitung
+            last_day = date.fromisoformat(comparison[name]["end"]) - timedelta(days=1)
+            return f"{format_tanggal(comparison[name]['start'])} - {format_tanggal(last_day.isoformat())}"
+
+        metrics = (("Transaksi", "sales_count", str), ("Pendapatan", "revenue", self.format_rupiah),
+                   ("Barang Terjual", "items_qty", str))
+        rows = [
+            (label, fmt(comparison["current"][key]),
+             fmt(comparison["previous"][key]), change(comparison["vs_previous"][key]),
+             fmt(comparison["year_ago"][key]), change(comparison["vs_year_ago"][key]))
+            for label, key, fmt in metrics
+        ]
+        return self.make_table(
+            ["", f"Periode Ini\n{period('current')}", f"Periode Sebelumnya\n{period('previous')}", "Perubahan",
+             f"Tahun Lalu\n{period('year_ago')}", "Perubahan (YoY)"], rows
+        )
+
+    def build_heatmap_tab(self, grid):
+        table = QTableWidget(len(WEEKDAYS), 24)
+        table.setHorizontalHeaderLabels([f"{hour:02d}" for hour in range(24)])
+        table.setVerticalHeaderLabels(WEEKDAYS)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        peak = max(max(row) for row in grid) or 1
+        for day, row in enumerate(grid):
+            for hour, count in enumerate(row):
+                item = QTableWidgetItem(str(count) if count else "")
+                item.setToolTip(f"{WEEKDAYS[day]} {hour:02d}:00 - {count} transaksi")
+                # semakin ramai semakin gelap
+                item.setBackground(QColor(22, 160, 133, int(20 + 235 * count / peak) if count else 0))
+                table.setItem(day, hour, item)
+        return table
+
+    def build_abc_tab(self, rows):
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        summary = abc_summary(rows)
+        layout.addWidget(QLabel(" | ".join(
+            f"Kelas {grade}: {count} produk ({self.format_rupiah(revenue)})"
+            for grade, (count, revenue) in summary.items()
+        )))
+        layout.addWidget(self.make_table(
+            ["Produk", "Pendapatan", "Kumulatif", "Kelas"],
+            [(name, self.format_rupiah(revenue), f"{cumulative * 100:.1f}%", grade)
+             for _, name, revenue, cumulative, grade in rows]
+        ))
+        return widget
+
     # ======================= KEMBALI KE MENU =======================
     def go_back(self):
         self.main_window.show_dashboard()
@@ -1,22 +1,40 @@
-import os
-from pathlib import Path
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QPushButton, QComboBox, QSpinBox,
-    QHBoxLayout, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, 
+    QWidget, QVBoxLayout, QLabel, QPushButton, QSpinBox,
+    QHBoxLayout, QMessageBox, QTableView, QHeaderView, 
     QCompleter, QInputDialog, QDialog, QLineEdit 
 )
-from PyQt6.QtCore import Qt
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from app.database.db import get_connection
-from datetime import datetime
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtCore import Qt, QTimer, QModelIndex
+from app.database.db import (
+    read_connection, save_sale, lookup_products, find_product_by_barcode, InsufficientStockError
+)
+from app.services.cart import Cart
+from app.ui.delegates import ActionButtonsDelegate
+from app.ui.models import CartTableModel
+from app.ui.tasks import TaskRunner, BusyIndicator
+
+LOOKUP_LIMIT = 20
+
+
+def fetch_stock(product_id):
+    """(stok, batas restock) satu produk, lewat primary key."""
+    with read_connection() as conn:
+        return conn.execute("SELECT stock, reorder_level FROM products WHERE id = ?", (product_id,)).fetchone()
 
 
 class SalesWindow(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
-        self.cart = []
+        self.cart = Cart()
+        self.cart_model = CartTableModel(self.cart, self)
+        self.tasks = TaskRunner(self)
+        self.spooler = main_window.receipt_spooler
+        self.spooler.printed.connect(self.on_receipt_printed)
+        self.spooler.failed.connect(self.on_receipt_failed)
+        self.spooler.worker_failed.connect(self.on_spooler_failed)
+        self.selected_product = None   # (id, name, price) yang dipilih dari completer
+        self.lookup_task = None
 
         # ================== GAYA GLOBAL ==================
         self.setStyleSheet(""" 
@@ -45,7 +63,7 @@ class SalesWindow(QWidget):
                 background-color: #1d4ed8;
             }
             
-            QTableWidget {
+            QTableView {
                 border: 1px solid #e5e7eb;
                 gridline-color: #e5e7eb;
                 font-size: 13px;
@@ -87,12 +105,32 @@ class SalesWindow(QWidget):
         """)
         layout.addWidget(label)
 
+        # Input scanner barcode (keyboard-wedge: scanner mengetik kode lalu Enter)
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("📷 Scan barcode di sini...")
+        self.scan_input.setStyleSheet("font-size: 16px; padding: 8px;")
+        self.scan_input.returnPressed.connect(self.scan_barcode)
+        card_layout.addWidget(self.scan_input)
+
         # Layout Horizontal untuk Produk dan Jumlah
         hbox_filter = QHBoxLayout()
 
-        # Dropdown Produk (ComboBox)
-        self.cmb_product = QComboBox()
-        self.load_products()
+        # Input Produk: completer diisi hasil query saat kasir mengetik (top-N saja)
+        self.product_input = QLineEdit()
+        self.product_input.setPlaceholderText("Ketik nama atau kode produk...")
+        self.completer_model = QStandardItemModel(self)
+        self.completer = QCompleter(self.completer_model, self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.completer.activated[QModelIndex].connect(self.select_product)
+        self.product_input.setCompleter(self.completer)
+
+        self.lookup_timer = QTimer(self)
+        self.lookup_timer.setSingleShot(True)
+        self.lookup_timer.setInterval(150)
+        self.lookup_timer.timeout.connect(self.lookup_product)
+        self.product_input.textEdited.connect(self.on_product_text_edited)
+        self.product_input.returnPressed.connect(self.add_transaction)
 
         # Jumlah (SpinBox untuk jumlah produk)
         self.spin_qty = QSpinBox()
@@ -101,7 +139,7 @@ class SalesWindow(QWidget):
         self.spin_qty.setToolTip("Masukkan jumlah pembelian")
 
         # Menambahkan widget produk dan jumlah ke layout horizontal
-        hbox_filter.addWidget(self.cmb_product)
+        hbox_filter.addWidget(self.product_input)
         hbox_filter.addWidget(self.spin_qty)
 
         # Tombol tambah (Add to transaction button)
@@ -113,74 +151,182 @@ class SalesWindow(QWidget):
         layout.addWidget(card)
 
         # ================== TABEL ==================
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["#","Produk", "Harga", "Jumlah", "Total", "Aksi"])
+        self.table = QTableView()
+        self.table.setModel(self.cart_model)
         self.table.setAlternatingRowColors(True)
         self.table.setStyleSheet("alternate-background-color: #f9fafb;")
 
         # Menyembunyikan nomor urut vertikal otomatis
         self.table.verticalHeader().setVisible(False)  # Menyembunyikan header vertikal
+        self.table.verticalHeader().setDefaultSectionSize(40)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
 
         header = self.table.horizontalHeader()
-        for col in range(6):
+        for col in range(self.cart_model.columnCount()):
             header.setSectionResizeMode(col, QHeaderView.ResizeMode.Stretch)
 
+        # Tombol hapus digambar delegate, bukan QPushButton per baris
+        self.remove_delegate = ActionButtonsDelegate(
+            [("Hapus", "#ef4444")], self.table, button_height=28
+        )
+        self.remove_delegate.clicked.connect(lambda row, _: self.cart_model.remove_row(row))
+        self.table.setItemDelegateForColumn(CartTableModel.ACTION_COLUMN, self.remove_delegate)
+
         layout.addWidget(self.table)
 
+        # Total keranjang dihitung bertahap oleh Cart, label cukup diperbarui saat model berubah
+        self.total_label = QLabel("Total: Rp 0")
+        self.total_label.setStyleSheet("font-size: 16px; font-weight: 700;")
+        self.total_label.setAlignment(Qt.AlignmentFlag.AlignRight)
+        for signal in (self.cart_model.rowsInserted, self.cart_model.rowsRemoved,
+                       self.cart_model.dataChanged, self.cart_model.modelReset):
+            signal.connect(self.update_total)
+        layout.addWidget(self.total_label)
+
         # ================== TOMBOL ==================
         btn_save_and_print = QPushButton("💾 Simpan & Cetak Transaksi")
+        btn_reprint = QPushButton("🧾 Cetak Ulang Struk")
         btn_back = QPushButton("⬅️ Kembali")
 
         btn_save_and_print.clicked.connect(self.save_and_print_transaction)
+        btn_reprint.clicked.connect(self.reprint_receipt)
         btn_back.clicked.connect(self.go_back)
 
         hbox = QHBoxLayout()
         hbox.addWidget(btn_save_and_print)
+        hbox.addWidget(btn_reprint)
         hbox.addWidget(btn_back)
         layout.addLayout(hbox)
 
+        # Status proses background (simpan transaksi / cetak struk)
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #16a34a; font-weight: 600;")
+        layout.addWidget(self.status_label)
+        layout.addWidget(BusyIndicator(self.tasks))
+
         self.setLayout(layout)
+        self.scan_input.setFocus()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.scan_input.setFocus()
+
+    def show_status(self, text, error=False):
+        color = "#dc2626" if error else "#16a34a"
+        self.status_label.setStyleSheet(f"color: {color}; font-weight: 600;")
+        self.status_label.setText(text)
+
+    # ================== STRUK ==================
+    def on_receipt_printed(self, sale_id, path):
+        self.show_status(f"Struk transaksi #{sale_id} berhasil dicetak! ({path})")
+
+    def on_receipt_failed(self, sale_id, error):
+        self.show_status(f"Struk transaksi #{sale_id} gagal dicetak, akan dicoba lagi: {error}", error=True)
+
+    def on_spooler_failed(self, error):
+        self.show_status(f"Antrian cetak struk gagal diproses, akan dicoba lagi: {error}", error=True)
 
-    def load_products(self):
-        # Memuat produk dari database
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, price FROM products")
-        self.products = cursor.fetchall()
-        conn.close()
+    def reprint_receipt(self):
+        sale_id, ok = QInputDialog.getInt(self, "Cetak Ulang Struk", "Nomor transaksi:", 1, 1)
+        if not ok:
+            return
 
-        self.cmb_product.clear()
-        self.cmb_product.setEditable(True)
+        def on_queued(job_id):
+            if job_id is None:
+                self.show_status(f"Transaksi #{sale_id} tidak ditemukan.", error=True)
+            else:
+                self.show_status(f"Struk transaksi #{sale_id} masuk antrian cetak...")
 
-        product_names = [f"{p[1]} - Rp{p[2]:,.0f}" for p in self.products]
-        for p in self.products:
-            self.cmb_product.addItem(f"{p[1]} - Rp{p[2]:,.0f}", userData=p)
+        self.spooler.reprint(sale_id, on_queued=on_queued)
 
-        completer = QCompleter(product_names)
-        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self.cmb_product.setCompleter(completer)
+    # ================== SCAN BARCODE ==================
+    def scan_barcode(self):
+        code = self.scan_input.text().strip()
+        self.scan_input.clear()
+        if not code:
+            return
+        self.tasks.submit(
+            find_product_by_barcode, code,
+            on_result=lambda product: self.on_barcode_found(code, product)
+        )
+
+    def on_barcode_found(self, code, product):
+        if product is None:
+            self.show_status(f"Barcode {code} tidak ditemukan.", error=True)
+            return
+        product_id, name, price, stock, _barcode, reorder_level = product
+        self.add_to_cart((product_id, name, price), 1, stock, reorder_level)
+        self.scan_input.setFocus()
+
+    # ================== PICKER PRODUK ==================
+    def on_product_text_edited(self, _text):
+        self.selected_product = None
+        self.lookup_timer.start()
+
+    def lookup_product(self):
+        text = self.product_input.text().strip()
+        if self.lookup_task:
+            self.lookup_task.cancel()
+        if not text:
+            self.completer_model.clear()
+            return
+        self.lookup_task = self.tasks.submit(
+            lookup_products, text, LOOKUP_LIMIT, on_result=self.show_lookup_results
+        )
+
+    def show_lookup_results(self, rows):
+        self.completer_model.clear()
+        for product_id, name, price, _stock, _barcode, _reorder in rows:
+            item = QStandardItem(f"{name} - Rp{price:,.0f}")
+            item.setData((product_id, name, price), Qt.ItemDataRole.UserRole)
+            self.completer_model.appendRow(item)
+        if rows and self.product_input.hasFocus():
+            self.completer.complete()
+
+    def select_product(self, index):
+        self.selected_product = index.data(Qt.ItemDataRole.UserRole)
+
+    def current_product(self):
+        """Produk terpilih; kalau belum memilih, pakai hasil yang teksnya persis sama."""
+        if self.selected_product:
+            return self.selected_product
+        text = self.product_input.text().strip()
+        for row in range(self.completer_model.rowCount()):
+            item = self.completer_model.item(row)
+            if item.text() == text:
+                return item.data(Qt.ItemDataRole.UserRole)
+        return None
 
     def add_transaction(self):
-        product = self.cmb_product.currentData()
+        product = self.current_product()
         if not product:
             QMessageBox.warning(self, "Error", "Silakan pilih produk dulu.")
             return
 
         qty = self.spin_qty.value()
-        
-        # Ambil stok dari database
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT stock FROM products WHERE id = ?", (product[0],))
-        stock = cursor.fetchone()[0]
-        conn.close()
 
+        # Ambil stok dari database, lanjutkan setelah hasilnya datang
+        self.tasks.submit(
+            fetch_stock, product[0],
+            on_result=lambda result: self.on_stock_fetched(product, qty, result)
+        )
+
+        # Kosongkan input agar produk berikutnya bisa langsung diketik
+        self.product_input.clear()
+        self.selected_product = None
+
+    def on_stock_fetched(self, product, qty, result):
+        if result is None:
+            # Produk dihapus setelah dipilih dari daftar: jangan masuk keranjang
+            self.selected_product = None
+            self.show_status(f"Produk {product[1]} tidak ditemukan (mungkin sudah dihapus).", error=True)
+            return
+        self.add_to_cart(product, qty, *result)
+
+    def add_to_cart(self, product, qty, stock, reorder_level=0):
         # Validasi stok
-        existing_qty_in_cart = 0
-        for item in self.cart:
-            if item[0] == product[0]:
-                existing_qty_in_cart = item[3]
+        existing_qty_in_cart = self.cart.qty_of(product[0])
 
         if qty + existing_qty_in_cart > stock:
             QMessageBox.warning(
@@ -190,53 +336,20 @@ class SalesWindow(QWidget):
             )
             return
 
-        total = product[2] * qty
-
-        # Tambahkan atau update di keranjang
-        product_exists = False
-        for i, (pid, name, price, existing_qty, _) in enumerate(self.cart):
-            if pid == product[0]:
-                self.cart[i] = (pid, name, price, existing_qty + qty, price * (existing_qty + qty))
-                product_exists = True
-                break
-
-        if not product_exists:
-            self.cart.append((product[0], product[1], product[2], qty, total))
-
-        self.update_table()
-
-    def update_table(self):
-        # Memperbarui tabel dengan produk yang telah ditambahkan
-        self.table.setRowCount(len(self.cart))
-        for i, (_, name, price, qty, total) in enumerate(self.cart):
-            self.table.setItem(i, 0, QTableWidgetItem(str(i + 1)))
-            self.table.setItem(i, 1, QTableWidgetItem(name))
-            self.table.setItem(i, 2, QTableWidgetItem(f"Rp {price:,.0f}"))
-            self.table.setItem(i, 3, QTableWidgetItem(str(qty)))
-            self.table.setItem(i, 4, QTableWidgetItem(f"Rp {total:,.0f}"))
-
-            btn_del = QPushButton("Hapus")
-            btn_del.setProperty("row_index", i)
-            btn_del.clicked.connect(self.handle_remove_by_button)
-            btn_del.setStyleSheet(""" 
-                QPushButton {
-                    background-color: #ef4444;
-                    color: white;
-                    padding: 5px;
-                    margin:2px 5px;
-                    border-radius: 6px;
-                }
-                QPushButton:hover { background-color: #dc2626; }
-            """)
-            self.table.setCellWidget(i, 5, btn_del)
-
-    def handle_remove_by_button(self):
-        # Menghapus produk dari keranjang transaksi
-        btn = self.sender()
-        row = btn.property("row_index")
-
-        del self.cart[row]
-        self.update_table()
+        # Tambahkan atau update di keranjang (hanya baris yang berubah yang digambar ulang)
+        row = self.cart_model.add_product(product[0], product[1], product[2], qty)
+        self.table.scrollTo(self.cart_model.index(row, 0))
+
+        # Peringatan kasir: sisa stok setelah transaksi ini sudah di bawah batas restock
+        remaining = stock - existing_qty_in_cart - qty
+        if remaining <= reorder_level:
+            self.show_status(
+                f"⚠️ Stok {product[1]} menipis: sisa {remaining} unit setelah transaksi ini "
+                f"(batas restock {reorder_level}).", error=True
+            )
+
+    def update_total(self, *_):
+        self.total_label.setText(f"Total: Rp {self.cart.total:,.0f}")
 
     def save_and_print_transaction(self):
         # Menyimpan dan mencetak transaksi
@@ -245,7 +358,7 @@ class SalesWindow(QWidget):
             return
 
         # Hitung total harga transaksi
-        total_all = sum(item[4] for item in self.cart)
+        total_all = self.cart.total
 
         # Tampilkan dialog untuk memasukkan jumlah uang yang dibayarkan
         payment_dialog = QDialog(self)
@@ -324,9 +437,10 @@ class SalesWindow(QWidget):
         label_products = QLabel("Produk yang Dibeli:", payment_dialog)
         layout.addWidget(label_products)
 
-        for item in self.cart:
-            name, price, qty, total = item[1], item[2], item[3], item[4]
-            product_label = QLabel(f"{name} - {qty} x Rp{price:,.0f} = Rp {total:,.0f}", payment_dialog)
+        for line in self.cart:
+            product_label = QLabel(
+                f"{line.name} - {line.qty} x Rp{line.price:,.0f} = Rp {line.total:,.0f}", payment_dialog
+            )
             layout.addWidget(product_label)
 
         # Menampilkan total harga
@@ -391,72 +505,37 @@ class SalesWindow(QWidget):
 
             # Hitung kembalian
             change = amount_paid - total_all
+
+            def on_saved(sale_id):
+                # Struk sudah masuk antrian bersama transaksi; spooler mencetaknya di background
+                self.show_status(f"Transaksi #{sale_id} tersimpan, struk sedang dicetak...")
+                self.spooler.wake()
+
+                # Clear keranjang dan langsung siap untuk pelanggan berikutnya
+                self.cart_model.clear()
+                payment_dialog.accept()
+                self.scan_input.setFocus()
+
+            def on_failed(error):
+                btn_save_and_print.setEnabled(True)
+                if isinstance(error, InsufficientStockError):
+                    # Stok sudah dipakai kasir lain: tandai baris yang gagal di keranjang
+                    row = self.cart.row_of(error.product_id)
+                    if row is not None:
+                        self.table.selectRow(row)
+                    QMessageBox.warning(
+                        payment_dialog, "Stok Tidak Cukup",
+                        f"Baris {error.line + 1}: {error}\nTransaksi dibatalkan, kurangi jumlah lalu coba lagi."
+                    )
+                    return
+                QMessageBox.critical(payment_dialog, "Error", f"Transaksi gagal disimpan:\n{error}")
+
             # Simpan transaksi ke database
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            sale_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute("INSERT INTO sales (sale_date, total) VALUES (?, ?)", (sale_date, total_all))
-            sale_id = cursor.lastrowid
-
-            for pid, _, price, qty, _ in self.cart:
-                cursor.execute(
-                    "INSERT INTO sales_items (sale_id, product_id, qty, price) VALUES (?, ?, ?, ?)",
-                    (sale_id, pid, qty, price)
-                )
-                cursor.execute("UPDATE products SET stock = stock - ? WHERE id = ?", (qty, pid))
-
-            conn.commit()
-            conn.close()
-
-            # Simpan PDF ke folder Downloads
-            downloads_folder = Path(os.path.expanduser("~")) / "Downloads"
-            pdf_filename = downloads_folder / f"transaksi_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
-            pdf = canvas.Canvas(str(pdf_filename), pagesize=letter)
-
-            pdf.setFont("Helvetica-Bold", 16)
-            pdf.drawString(100, 750, "FRESH SHOPMART")
-            pdf.setFont("Helvetica", 12)
-            pdf.drawString(100, 735, "JL. BUKIT KEMBANG, KEL. KEMBANG, KEC. A, KOTA KANGEAN 13139")
-            pdf.line(100, 730, 500, 730)
-
-            pdf.drawString(100, 715, f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            pdf.drawString(100, 700, f"Transaction No: {sale_id}")
-
-            pdf.line(100, 695, 500, 695)
-
-            y_position = 680
-            total_amount = 0
-            for item in self.cart:
-                name, price, qty, total = item[1], item[2], item[3], item[4]
-                pdf.drawString(100, y_position, f"{name} - {qty} x Rp{price:,.0f}")
-                y_position -= 15
-                pdf.drawString(100, y_position, f"Rp {total:,.0f}")
-                y_position -= 20
-                total_amount += total
-
-            pdf.line(100, y_position, 500, y_position)
-
-            # Detail pembayaran
-            y_position -= 20
-            pdf.drawString(100, y_position, f"Total: Rp {total_amount:,.0f}")
-            pdf.drawString(100, y_position-15, f"Tunai: Rp {amount_paid:,.0f}")
-            pdf.drawString(100, y_position-30, f"Kembalian: Rp {change:,.0f}")
-
-            pdf.line(100, y_position-35, 500, y_position-35)
-
-            # Pesan Terima Kasih
-            pdf.drawString(100, y_position-50, "Terima kasih telah berbelanja di toko kami!")
-            pdf.drawString(100, y_position-65, "Layanan Pelanggan: 0324324 | freshshop@gmail.com")
-
-            pdf.save()
-
-            QMessageBox.information(self, "Sukses", f"Transaksi berhasil disimpan dan dicetak! ({pdf_filename})")
-
-            # Clear keranjang dan update tabel
-            self.cart.clear()
-            self.update_table()
-            payment_dialog.accept()
+            btn_save_and_print.setEnabled(False)
+            self.tasks.submit(
+                save_sale, self.cart.sale_items(), payment=(amount_paid, change),
+                on_result=on_saved, on_error=on_failed, cancellable=False
+            )
 
         btn_save_and_print.clicked.connect(on_save_and_print)
         btn_cancel.clicked.connect(payment_dialog.reject)
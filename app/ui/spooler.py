@@ -0,0 +1,91 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from app.database.db import (
+    count_pending_receipts, enqueue_reprint, requeue_interrupted_receipts, RECEIPT_RETRY_SECONDS
+)
+from app.perflog import log_error
+from app.services.receipt import print_due_receipts
+from app.ui.tasks import TaskRunner
+
+
+class ReceiptSpooler(QObject):
+    """Mencetak struk dari antrian ``receipt_jobs`` di background.
+
+    Checkout cukup memasukkan job ke antrian lalu memanggil ``wake()``;
+    kasir bisa langsung melayani pelanggan berikutnya. Hanya satu worker
+    yang berjalan; job gagal dicoba lagi oleh timer.
+    """
+
+    printed = pyqtSignal(int, str)     # sale_id, path file
+    failed = pyqtSignal(int, str)      # sale_id, pesan error
+    worker_failed = pyqtSignal(str)    # antrian tidak bisa diproses (mis. database terkunci)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tasks = TaskRunner(self)
+        self._running = False
+        self._wake_again = False
+
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setInterval(RECEIPT_RETRY_SECONDS * 1000)
+        self.retry_timer.timeout.connect(self.wake)
+
+    def start(self):
+        """Cetak job yang tertinggal dari sesi sebelumnya (mis. aplikasi ditutup saat mencetak)."""
+        self.tasks.submit(
+            requeue_interrupted_receipts,
+            on_result=lambda _: self.wake(),
+            on_error=self._on_worker_error,
+            cancellable=False
+        )
+
+    def wake(self):
+        if self._running:
+            self._wake_again = True
+            return
+        self._running = True
+        self._wake_again = False
+        self.tasks.submit(
+            print_due_receipts,
+            on_result=self._on_batch_done,
+            on_error=self._on_worker_error,
+            cancellable=False
+        )
+
+    def reprint(self, sale_id, on_queued=None):
+        """Antrikan cetak ulang; ``on_queued(job_id)`` menerima None jika transaksi tidak ada."""
+        def queued(job_id):
+            if on_queued:
+                on_queued(job_id)
+            if job_id is not None:
+                self.wake()
+
+        self.tasks.submit(enqueue_reprint, sale_id, on_result=queued, cancellable=False)
+
+    # ---------- callback worker ----------
+    def _on_batch_done(self, results):
+        for sale_id, path, error in results:
+            if error is None:
+                self.printed.emit(sale_id, str(path))
+            else:
+                self.failed.emit(sale_id, str(error))
+        self._finish()
+
+    def _on_worker_error(self, error):
+        log_error("Spooler struk gagal", error)
+        self.worker_failed.emit(str(error))
+        self._finish()
+
+    def _finish(self):
+        self._running = False
+        if self._wake_again:
+            self.wake()
+            return
+        # Masih ada job (menunggu dicoba ulang)? hidupkan timer; kalau kosong, matikan
+        self.tasks.submit(count_pending_receipts, on_result=self._set_retry, cancellable=False)
+
+    def _set_retry(self, pending):
+        if pending and not self.retry_timer.isActive():
+            self.retry_timer.start()
+        elif not pending:
+            self.retry_timer.stop()
@@ -0,0 +1,200 @@
+import threading
+import traceback
+
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QProgressBar, QPushButton, QMessageBox
+from PyQt6.QtCore import QCoreApplication, QObject, QRunnable, QThreadPool, pyqtSignal
+
+from app.config import get_int_setting
+from app.perflog import log_error
+
+# Pool global dipakai tugas pendek (lookup kasir, simpan transaksi, query layar).
+# Export/import besar berjalan di pool sendiri (``long_running=True``) yang dibatasi
+# ``[export] threads``, jadi di PC kasir 1-2 core scan barcode tidak antre di belakang export.
+INTERACTIVE_MIN_THREADS = 2
+
+_long_pool = None
+
+
+def interactive_pool():
+    pool = QThreadPool.globalInstance()
+    if pool.maxThreadCount() < INTERACTIVE_MIN_THREADS:
+        pool.setMaxThreadCount(INTERACTIVE_MIN_THREADS)
+    return pool
+
+
+def long_task_pool():
+    """QThreadPool untuk export/import besar (dibuat sekali, ikut dihapus bersama QApplication)."""
+    global _long_pool
+    if _long_pool is None:
+        _long_pool = QThreadPool(QCoreApplication.instance())
+        _long_pool.setMaxThreadCount(max(1, get_int_setting("export", "threads", 1)))
+    return _long_pool
+
+
+class TaskCancelled(Exception):
+    """Dilempar oleh ``Task.check_cancelled()`` saat tugas dibatalkan."""
+
+
+class _TaskSignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(object)
+    progress = pyqtSignal(int, int)
+    cancelled = pyqtSignal()
+    done = pyqtSignal()
+
+
+class Task(QRunnable):
+    """Satu pekerjaan (query DB / export file) yang dijalankan di thread pool.
+
+    Fungsi yang dijalankan dengan ``with_task=True`` menerima argumen ``task``
+    untuk melaporkan progress dan mengecek pembatalan.
+    """
+
+    def __init__(self, fn, args, kwargs, with_task=False, cancellable=True):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.with_task = with_task
+        self.cancellable = cancellable
+        self.signals = _TaskSignals()
+        self._cancel_event = threading.Event()
+
+    # ---------- dipanggil dari thread UI ----------
+    def cancel(self):
+        self._cancel_event.set()
+
+    # ---------- dipanggil dari thread worker ----------
+    @property
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, done, total=0):
+        self.signals.progress.emit(int(done), int(total))
+
+    def run(self):
+        try:
+            if self.is_cancelled:
+                raise TaskCancelled()
+            if self.with_task:
+                result = self.fn(*self.args, task=self, **self.kwargs)
+            else:
+                result = self.fn(*self.args, **self.kwargs)
+            if self.is_cancelled:
+                raise TaskCancelled()
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            e.traceback_text = traceback.format_exc()
+            self.signals.error.emit(e)
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.done.emit()
+
+
+class TaskRunner(QObject):
+    """Mengirim pekerjaan ke QThreadPool; callback selalu dijalankan di thread UI."""
+
+    busy_changed = pyqtSignal(bool)
+    progress = pyqtSignal(int, int)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or interactive_pool()
+        self._tasks = set()
+
+    @property
+    def is_busy(self):
+        return bool(self._tasks)
+
+    def submit(self, fn, *args, on_result=None, on_error=None, on_progress=None,
+               on_cancelled=None, with_task=False, cancellable=True, long_running=False, **kwargs):
+        """Jalankan ``fn(*args, **kwargs)`` di background.
+
+        Tugas dengan ``cancellable=False`` (mis. menyimpan transaksi) tidak ikut
+        dibatalkan oleh ``cancel_all()``. ``long_running=True`` (export/import file)
+        memakai ``long_task_pool()``, bukan pool tugas pendek.
+        """
+        task = Task(fn, args, kwargs, with_task=with_task, cancellable=cancellable)
+        signals = task.signals
+
+        # Callback diabaikan jika tugas dibatalkan sebelum hasilnya sampai di thread UI
+        if on_result:
+            signals.result.connect(lambda result: task.is_cancelled or on_result(result))
+        on_error = on_error or self.show_error
+        signals.error.connect(lambda error: task.is_cancelled or on_error(error))
+        if on_progress:
+            signals.progress.connect(on_progress)
+        signals.progress.connect(self.progress)
+        if on_cancelled:
+            signals.cancelled.connect(on_cancelled)
+        signals.done.connect(lambda: self._finish(task))
+
+        self._tasks.add(task)
+        if len(self._tasks) == 1:
+            self.busy_changed.emit(True)
+        (long_task_pool() if long_running else self.pool).start(task)
+        return task
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            if task.cancellable:
+                task.cancel()
+
+    def _finish(self, task):
+        self._tasks.discard(task)
+        if not self._tasks:
+            self.busy_changed.emit(False)
+
+    def show_error(self, error, message="Terjadi kesalahan"):
+        """Callback error default: catat ke log lalu tampilkan ke pengguna."""
+        log_error(message, error)
+        parent = self.parent() if isinstance(self.parent(), QWidget) else None
+        QMessageBox.critical(parent, "Error", f"{message}:\n{error}")
+
+
+class BusyIndicator(QWidget):
+    """Progress bar + tombol batal yang tampil selama TaskRunner sedang bekerja."""
+
+    def __init__(self, runner, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+
+        self.bar = QProgressBar()
+        self.bar.setRange(0, 0)  # mode "sibuk" (animasi tanpa persen)
+        self.bar.setTextVisible(False)
+        self.bar.setFixedHeight(14)
+
+        self.btn_cancel = QPushButton("Batal")
+        self.btn_cancel.setStyleSheet("""
+            background-color: #ef4444;
+            color: white;
+            padding: 2px 10px;
+            border-radius: 4px;
+        """)
+        self.btn_cancel.clicked.connect(runner.cancel_all)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.bar)
+        layout.addWidget(self.btn_cancel)
+        self.setLayout(layout)
+
+        runner.busy_changed.connect(self.set_busy)
+        runner.progress.connect(self.set_progress)
+        self.setVisible(runner.is_busy)
+
+    def set_busy(self, busy):
+        self.bar.setRange(0, 0)
+        self.setVisible(busy)
+
+    def set_progress(self, done, total):
+        if total > 0:
+            self.bar.setRange(0, total)
+            self.bar.setValue(min(done, total))
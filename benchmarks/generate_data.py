@@ -0,0 +1,180 @@
+# --- benchmarks/generate_data.py ---
+# Membuat pos.db sintetis untuk benchmark: N produk dan M tahun penjualan.
+#
+# Hasilnya deterministik: seed, jumlah produk, jumlah tahun, transaksi per hari
+# dan tanggal akhir yang sama selalu menghasilkan isi database yang sama.
+# Schema dibuat oleh init_db() aplikasi, lalu tabel rollup diisi ulang dari
+# data mentah seperti pada database lama yang dimigrasi.
+#
+#   python -m benchmarks.generate_data out.db --products 5000 --years 2 --sales-per-day 200
+#   python -m benchmarks.generate_data out.db --size medium
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.database import db
+
+# Ukuran data yang dipakai run_benchmarks (bisa juga dipilih dengan --size)
+SIZES = {
+    "small": {"products": 500, "years": 1, "sales_per_day": 50},
+    "medium": {"products": 5000, "years": 2, "sales_per_day": 200},
+    "large": {"products": 50000, "years": 3, "sales_per_day": 600},
+}
+DEFAULT_SEED = 42
+INSERT_BATCH = 20000
+
+ITEMS = ["Beras", "Gula", "Minyak Goreng", "Kopi", "Teh", "Susu", "Mie Instan", "Biskuit",
+         "Sabun", "Sampo", "Pasta Gigi", "Deterjen", "Kecap", "Saus Sambal", "Air Mineral",
+         "Roti", "Telur", "Tepung", "Garam", "Sarden"]
+BRANDS = ["Sinar", "Mawar", "Rajawali", "Cap Jempol", "Melati", "Nusantara", "Sehat", "Prima",
+          "Segar", "Harum"]
+SIZES_LABEL = ["100g", "250g", "500g", "1kg", "1L", "2L", "Sachet", "Pouch", "Botol", "Dus"]
+
+# Bobot transaksi per jam (toko buka 07.00-21.59) dan per hari (Senin..Minggu)
+HOUR_WEIGHTS = {7: 2, 8: 4, 9: 5, 10: 6, 11: 7, 12: 8, 13: 6, 14: 5, 15: 5, 16: 6, 17: 8, 18: 9, 19: 8,
+                20: 6, 21: 3}
+WEEKDAY_FACTOR = [0.9, 0.85, 0.9, 0.95, 1.1, 1.3, 1.2]
+
+
+def product_rows(rng, count, created_at):
+    """(id, name, price, stock, created_at, barcode, reorder_level) untuk ``count`` produk."""
+    for pid in range(1, count + 1):
+        name = f"{rng.choice(ITEMS)} {rng.choice(BRANDS)} {rng.choice(SIZES_LABEL)} #{pid}"
+        price = rng.randint(2, 200) * 500.0
+        stock = rng.randint(0, 500)
+        reorder_level = rng.choice((0, 0, 5, 10, 20))
+        yield pid, name, price, stock, created_at, f"899{pid:010d}", reorder_level
+
+
+def sale_batches(rng, product_prices, first_day, last_day, sales_per_day):
+    """Batch (sales, sales_items) per hari, id diberikan berurutan mulai dari 1."""
+    hours = list(HOUR_WEIGHTS)
+    hour_weights = list(HOUR_WEIGHTS.values())
+    product_count = len(product_prices)
+    sale_id = item_id = 0
+    day = first_day
+    while day <= last_day:
+        count = round(sales_per_day * WEEKDAY_FACTOR[day.weekday()] * rng.uniform(0.7, 1.3))
+        sale_hours = sorted(rng.choices(hours, hour_weights, k=count))
+        sales, items = [], []
+        for hour in sale_hours:
+            sale_id += 1
+            sale_date = f"{day.isoformat()} {hour:02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+            total = 0.0
+            for _ in range(rng.randint(1, 5)):
+                # Penjualan condong ke produk id kecil: sebagian kecil produk = sebagian besar omzet
+                pid = int(product_count * rng.random() ** 3) + 1
+                qty = rng.randint(1, 3)
+                price = product_prices[pid - 1]
+                item_id += 1
+                items.append((item_id, sale_id, pid, qty, price))
+                total += qty * price
+            sales.append((sale_id, sale_date, total))
+        yield sales, items
+        day += timedelta(days=1)
+
+
+def generate(path, products=5000, years=1, sales_per_day=200, seed=DEFAULT_SEED, end_date=None,
+             progress=None):
+    """Tulis database baru di ``path``. Mengembalikan ringkasan (jumlah baris & durasi).
+
+    ``end_date`` = hari terakhir yang berisi penjualan (default hari ini, agar
+    dashboard dan laporan bulan berjalan ikut terisi).
+    """
+    path = Path(path)
+    if path.exists():
+        raise FileExistsError(f"{path} sudah ada")
+    end_date = end_date or date.today()
+    first_day = end_date - timedelta(days=365 * years - 1)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    previous_path = db.DB_PATH
+    db.close_connections()
+    db.DB_PATH = path
+    try:
+        db.init_db()
+        with db.transaction() as conn:
+            created_at = f"{(first_day - timedelta(days=30)).isoformat()} 08:00:00"
+            rows = list(product_rows(rng, products, created_at))
+            conn.executemany("""
+                INSERT INTO products (id, name, price, stock, created_at, barcode, reorder_level)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            prices = [row[2] for row in rows]
+            # Trigger watchlist mengisi "since" dengan jam sekarang; samakan agar hasilnya tetap deterministik
+            conn.execute("UPDATE low_stock SET since = ?", (created_at,))
+
+            sales_total = items_total = 0
+            sales_buffer, items_buffer = [], []
+            for sales, items in sale_batches(rng, prices, first_day, end_date, sales_per_day):
+                sales_buffer.extend(sales)
+                items_buffer.extend(items)
+                if len(items_buffer) >= INSERT_BATCH:
+                    _flush(conn, sales_buffer, items_buffer)
+                    sales_total += len(sales_buffer)
+                    items_total += len(items_buffer)
+                    sales_buffer, items_buffer = [], []
+                    if progress:
+                        progress(sales_total, items_total)
+            _flush(conn, sales_buffer, items_buffer)
+            sales_total += len(sales_buffer)
+            items_total += len(items_buffer)
+
+            db._rebuild_rollups(conn.cursor())
+        with db.transaction() as conn:
+            conn.execute("ANALYZE")
+    finally:
+        db.close_connections()
+        db.DB_PATH = previous_path
+
+    return {
+        "path": str(path),
+        "products": products,
+        "sales": sales_total,
+        "sales_items": items_total,
+        "first_day": first_day.isoformat(),
+        "last_day": end_date.isoformat(),
+        "seed": seed,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _flush(conn, sales, items):
+    conn.executemany("INSERT INTO sales (id, sale_date, total) VALUES (?, ?, ?)", sales)
+    conn.executemany(
+        "INSERT INTO sales_items (id, sale_id, product_id, qty, price) VALUES (?, ?, ?, ?, ?)", items
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat pos.db sintetis untuk benchmark.")
+    parser.add_argument("output", help="file database baru")
+    parser.add_argument("--size", choices=sorted(SIZES), help="ukuran siap pakai (menimpa angka di bawah)")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--sales-per-day", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--end-date", type=date.fromisoformat, help="YYYY-MM-DD (default hari ini)")
+    args = parser.parse_args(argv)
+
+    params = dict(products=args.products, years=args.years, sales_per_day=args.sales_per_day)
+    if args.size:
+        params = dict(SIZES[args.size])
+
+    def progress(sales, items):
+        print(f"\r{sales:,} transaksi, {items:,} item...", end="", file=sys.stderr, flush=True)
+
+    summary = generate(args.output, seed=args.seed, end_date=args.end_date, progress=progress, **params)
+    print(file=sys.stderr)
+    print(f"{summary['path']}: {summary['products']:,} produk, {summary['sales']:,} transaksi, "
+          f"{summary['sales_items']:,} item ({summary['first_day']} s/d {summary['last_day']}) "
+          f"dalam {summary['seconds']} detik")
+
+
+if __name__ == "__main__":
+    main()
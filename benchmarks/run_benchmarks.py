@@ -0,0 +1,292 @@
+# --- benchmarks/run_benchmarks.py ---
+# Benchmark lapisan database dan layar Qt pada beberapa ukuran data, hasil disimpan sebagai JSON.
+#
+#   python -m benchmarks.run_benchmarks                               ; ukuran small + medium
+#   python -m benchmarks.run_benchmarks --sizes small large --repeat 10
+#   python -m benchmarks.run_benchmarks --compare benchmarks/results/lama.json
+#
+# Database tiap ukuran dibuat sekali oleh generate_data (disimpan di benchmarks/data/)
+# lalu disalin ke folder sementara sebelum diukur, jadi benchmark checkout tidak
+# mengubah data aslinya. Layar dibuat dengan platform Qt "offscreen" (tanpa display).
+#
+# Setiap benchmark dijalankan ``--warmup`` kali tanpa dicatat, lalu ``--repeat`` kali;
+# yang disimpan min/median/mean/max dalam milidetik. ``screen.*.construct`` = waktu
+# konstruktor, ``screen.*.ready`` = sampai semua query awal layar selesai dan tampil.
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from app.database import db
+from benchmarks.generate_data import SIZES, DEFAULT_SEED, generate
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_DIR = BENCH_DIR / "data"
+RESULTS_DIR = BENCH_DIR / "results"
+CHECKOUT_ITEMS = 3
+
+
+# ==========================================
+# PENGUKURAN
+# ==========================================
+def summarize(samples):
+    return {
+        "runs": len(samples),
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def measure(fn, repeat, warmup=1, setup=None):
+    """Jalankan ``fn()`` ``warmup + repeat`` kali; ``setup()`` (tidak ikut diukur) sebelum tiap run."""
+    samples = []
+    for run in range(warmup + repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        if run >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+# ==========================================
+# DATA
+# ==========================================
+def dataset_path(size, seed, end_date):
+    """Database hasil generate_data untuk satu ukuran (dibuat jika belum ada)."""
+    path = DATA_DIR / f"{size}-seed{seed}-{end_date.isoformat()}.db"
+    if not path.exists():
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        print(f"[{size}] membuat data di {path} ...", file=sys.stderr)
+        partial = path.with_suffix(".tmp")
+        partial.unlink(missing_ok=True)
+        generate(partial, seed=seed, end_date=end_date, **SIZES[size])
+        partial.rename(path)
+    return path
+
+
+def dataset_info(path):
+    conn = sqlite3.connect(path)
+    try:
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("products", "sales", "sales_items")
+        }
+    finally:
+        conn.close()
+    counts["file_mb"] = round(path.stat().st_size / 1024 / 1024, 1)
+    return counts
+
+
+# ==========================================
+# BENCHMARK DATABASE
+# ==========================================
+def bench_database(repeat, warmup, end_date):
+    from app.services.report_cache import clear_report_cache
+    from app.services.reports import fetch_report_totals, fetch_report_page, stream_report_rows
+
+    year, month = end_date.year, end_date.month
+    results = {}
+
+    def reopen():
+        db.close_connections()
+
+    results["init_db"] = measure(db.init_db, repeat, warmup, setup=reopen)
+    results["get_dashboard_stats"] = measure(db.get_dashboard_stats, repeat, warmup)
+    results["get_last_3_months_revenue"] = measure(db.get_last_3_months_revenue, repeat, warmup)
+
+    # Query ReportWindow untuk bulan berjalan, tanpa cache
+    results["report_totals"] = measure(
+        lambda: fetch_report_totals(year, month), repeat, warmup, setup=clear_report_cache
+    )
+    results["report_first_page"] = measure(
+        lambda: fetch_report_page(year, month), repeat, warmup, setup=clear_report_cache
+    )
+    results["report_full_month"] = measure(
+        lambda: sum(len(rows) for rows in stream_report_rows(year, month)), repeat, warmup
+    )
+
+    # Checkout: satu transaksi dengan beberapa item; stok dinaikkan dulu agar tidak pernah kurang
+    with db.transaction() as conn:
+        product_ids = [row[0] for row in conn.execute(
+            "SELECT id FROM products ORDER BY id LIMIT ?", (CHECKOUT_ITEMS,)
+        )]
+        conn.executemany("UPDATE products SET stock = 1000000 WHERE id = ?", [(pid,) for pid in product_ids])
+    items = [(pid, 1, 1000.0) for pid in product_ids]
+    results["checkout_save_sale"] = measure(lambda: db.save_sale(items), repeat * 10, warmup)
+    return results
+
+
+# ==========================================
+# BENCHMARK LAYAR (Qt offscreen)
+# ==========================================
+def wait_until_idle(app, runner, timeout=120):
+    from PyQt6.QtCore import QThreadPool
+
+    deadline = time.perf_counter() + timeout
+    while runner.is_busy and time.perf_counter() < deadline:
+        QThreadPool.globalInstance().waitForDone(5)
+        app.processEvents()
+    app.processEvents()
+
+
+def bench_screens(repeat, warmup):
+    from PyQt6.QtWidgets import QApplication
+    from app.services.report_cache import clear_report_cache
+    from app.ui.main_window import MainWindow
+    from app.ui.product_window import ProductWindow
+    from app.ui.sales_window import SalesWindow
+    from app.ui.report_window import ReportWindow
+
+    app = QApplication.instance() or QApplication([])
+    results = {}
+
+    start = time.perf_counter()
+    main_window = MainWindow()
+    results["screen.MainWindow.construct"] = summarize([(time.perf_counter() - start) * 1000])
+    main_window.resize(1280, 800)
+    main_window.show()
+    wait_until_idle(app, main_window.dashboard_tasks)
+
+    for cls in (ProductWindow, SalesWindow, ReportWindow):
+        construct, ready = [], []
+        for run in range(warmup + repeat):
+            clear_report_cache()
+            start = time.perf_counter()
+            screen = cls(main_window)
+            built = time.perf_counter()
+            main_window.stack.addWidget(screen)
+            main_window.stack.setCurrentWidget(screen)
+            wait_until_idle(app, screen.tasks)
+            done = time.perf_counter()
+            if run >= warmup:
+                construct.append((built - start) * 1000)
+                ready.append((done - start) * 1000)
+            main_window.stack.removeWidget(screen)
+            screen.deleteLater()
+            app.processEvents()
+        results[f"screen.{cls.__name__}.construct"] = summarize(construct)
+        results[f"screen.{cls.__name__}.ready"] = summarize(ready)
+
+    main_window.receipt_spooler.retry_timer.stop()
+    main_window.timer.stop()
+    main_window.close()
+    main_window.deleteLater()
+    wait_until_idle(app, main_window.receipt_spooler.tasks)
+    return results
+
+
+# ==========================================
+# RUN
+# ==========================================
+def run_size(size, args, end_date):
+    source = dataset_path(size, args.seed, end_date)
+    workdir = Path(tempfile.mkdtemp(prefix=f"pos-bench-{size}-"))
+    previous_path = db.DB_PATH
+    try:
+        shutil.copy(source, workdir / "pos.db")
+        db.close_connections()
+        db.DB_PATH = workdir / "pos.db"
+        db.init_db()
+
+        print(f"[{size}] database ...", file=sys.stderr)
+        results = bench_database(args.repeat, args.warmup, end_date)
+        if not args.skip_ui:
+            print(f"[{size}] layar ...", file=sys.stderr)
+            results.update(bench_screens(args.repeat, args.warmup))
+        return {"data": {**SIZES[size], **dataset_info(source)}, "results": results}
+    finally:
+        db.close_connections()
+        db.DB_PATH = previous_path
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR.parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args, end_date):
+    try:
+        from PyQt6.QtCore import QT_VERSION_STR
+    except ImportError:
+        QT_VERSION_STR = None
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "qt": QT_VERSION_STR,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "end_date": end_date.isoformat(),
+    }
+
+
+def print_report(report, baseline=None):
+    """Tabel median per benchmark; dengan ``baseline`` ditambah rasio (baru / lama)."""
+    for size, entry in report["sizes"].items():
+        data = entry["data"]
+        print(f"\n== {size}: {data['products']:,} produk, {data['sales']:,} transaksi, "
+              f"{data['sales_items']:,} item ==")
+        old = (baseline or {}).get("sizes", {}).get(size, {}).get("results", {})
+        for name, stats in entry["results"].items():
+            line = f"{name:<36} {stats['median_ms']:>10.2f} ms"
+            if name in old:
+                ratio = stats["median_ms"] / old[name]["median_ms"] if old[name]["median_ms"] else float("inf")
+                line += f"   lama {old[name]['median_ms']:>10.2f} ms   x{ratio:.2f}"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark database & layar POS.")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--end-date", type=date.fromisoformat,
+                        help="hari terakhir data (default hari ini, agar dashboard terisi)")
+    parser.add_argument("--skip-ui", action="store_true", help="lewati benchmark layar Qt")
+    parser.add_argument("--output", type=Path, help="file JSON hasil (default benchmarks/results/<waktu>.json)")
+    parser.add_argument("--compare", type=Path, help="file JSON run sebelumnya untuk dibandingkan")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    end_date = args.end_date or date.today()
+
+    report = {"meta": metadata(args, end_date), "sizes": {}}
+    for size in args.sizes:
+        report["sizes"][size] = run_size(size, args, end_date)
+
+    output = args.output or RESULTS_DIR / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    print_report(report, baseline)
+    print(f"\nHasil disimpan di {output}")
+
+
+if __name__ == "__main__":
+    main()
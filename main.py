@@ -1,12 +1,29 @@
-from PyQt6.QtWidgets import QApplication
-from app.ui.main_window import MainWindow
-from app.database.db import init_db
 import sys
 
+from app.startup import StartupTimer
+
 if __name__ == "__main__":
-    init_db()
+    # Timer dipasang paling awal agar import PyQt6 & modul aplikasi ikut tercatat
+    startup = StartupTimer.from_config()
+
+    with startup.phase("import PyQt6"):
+        from PyQt6.QtWidgets import QApplication
+        from PyQt6.QtCore import QTimer
+    with startup.phase("import app"):
+        from app.ui.main_window import MainWindow
+        from app.database.db import init_db, close_connections
+
+    with startup.phase("init_db"):
+        init_db()
+
+    with startup.phase("QApplication"):
+        app = QApplication(sys.argv)
+        app.aboutToQuit.connect(close_connections)
+    with startup.phase("MainWindow"):
+        window = MainWindow()
+    with startup.phase("window.show"):
+        window.show()
 
-    app = QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
+    # Laporan dicetak saat event loop pertama kali berjalan (window sudah tampil)
+    QTimer.singleShot(0, startup.finish)
     sys.exit(app.exec())
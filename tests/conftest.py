@@ -0,0 +1,49 @@
+# --- tests/conftest.py ---
+# Fixture bersama: setiap test memakai pos.db baru di folder sementara.
+#
+#   python -m pytest -q
+
+import pytest
+
+from app import config
+from app.database import db
+
+
+@pytest.fixture
+def pos_db(tmp_path, monkeypatch):
+    """Database kosong hasil init_db(); pos.ini pengguna tidak ikut dibaca."""
+    monkeypatch.setenv("POS_CONFIG", str(tmp_path / "pos.ini"))
+    monkeypatch.setenv("POS_PROFILING_ENABLED", "0")
+    monkeypatch.setenv("POS_REPORT_CACHE_FILE", "")
+    monkeypatch.setenv("POS_RECEIPT_LANE", "kasir-1")
+    monkeypatch.setattr(config, "_config", None)
+
+    from app.services import report_cache
+    monkeypatch.setattr(report_cache, "_cache", None)
+
+    db.close_connections()
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "pos.db")
+    db.init_db()
+    yield db
+    db.close_connections()
+    db.remove_change_listener(report_cache._on_data_changed)
+
+
+@pytest.fixture
+def make_product(pos_db):
+    def make(name="Produk", price=1000.0, stock=10, barcode=None, reorder_level=0):
+        with pos_db.transaction() as conn:
+            return conn.execute(
+                "INSERT INTO products (name, price, stock, barcode, reorder_level) VALUES (?, ?, ?, ?, ?)",
+                (name, price, stock, barcode, reorder_level)
+            ).lastrowid
+    return make
+
+
+@pytest.fixture
+def scalar(pos_db):
+    """``scalar(sql, params)`` -> kolom pertama baris pertama hasil query."""
+    def query(sql, params=()):
+        with pos_db.read_connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+    return query
@@ -0,0 +1,38 @@
+from app.services.cart import Cart
+
+
+def test_add_merges_same_product():
+    cart = Cart()
+    assert cart.add(1, "Gula", 12000, 2) == (0, True)
+    assert cart.add(2, "Kopi", 3000, 1) == (1, True)
+    assert cart.add(1, "Gula", 12000, 1) == (0, False)
+
+    assert len(cart) == 2
+    assert cart.qty_of(1) == 3 and cart.qty_of(99) == 0
+    assert cart.total == 39000
+    assert cart.total_qty == 4
+
+
+def test_remove_reindexes_rows_and_totals():
+    cart = Cart()
+    for pid in (1, 2, 3):
+        cart.add(pid, f"Produk {pid}", 1000 * pid, 1)
+
+    line = cart.remove_at(0)
+
+    assert line.product_id == 1
+    assert [cart.row_of(pid) for pid in (1, 2, 3)] == [None, 0, 1]
+    assert cart.line_at(1).name == "Produk 3"
+    assert cart.total == 5000 and cart.total_qty == 2
+
+
+def test_sale_items_and_clear():
+    cart = Cart()
+    cart.add(5, "Teh", 2500.0, 2)
+    cart.add(7, "Susu", 8000.0, 1)
+
+    assert cart.sale_items() == [(5, 2, 2500.0), (7, 1, 8000.0)]
+
+    cart.clear()
+    assert len(cart) == 0 and cart.total == 0 and cart.total_qty == 0
+    assert cart.sale_items() == []
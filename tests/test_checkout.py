@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from app.database.db import InsufficientStockError
+
+
+def test_save_sale_updates_stock_and_items(pos_db, make_product, scalar):
+    pid = make_product(price=2500.0, stock=10)
+    sale_id = pos_db.save_sale([(pid, 3, 2500.0)], sale_date="2025-03-04 10:15:00")
+
+    assert scalar("SELECT stock FROM products WHERE id = ?", (pid,)) == 7
+    assert scalar("SELECT total FROM sales WHERE id = ?", (sale_id,)) == 7500.0
+    assert scalar("SELECT SUM(qty) FROM sales_items WHERE sale_id = ?", (sale_id,)) == 3
+
+
+def test_insufficient_stock_rolls_back_whole_sale(pos_db, make_product, scalar):
+    first = make_product("Gula", stock=5)
+    second = make_product("Kopi", stock=1)
+
+    with pytest.raises(InsufficientStockError) as info:
+        pos_db.save_sale([(first, 2, 1000.0), (second, 3, 1000.0)])
+
+    error = info.value
+    assert (error.line, error.product_id, error.name, error.requested, error.available) == (1, second, "Kopi", 3, 1)
+    assert scalar("SELECT stock FROM products WHERE id = ?", (first,)) == 5
+    assert scalar("SELECT COUNT(*) FROM sales") == 0
+    assert scalar("SELECT COUNT(*) FROM sales_daily") == 0
+
+
+def test_concurrent_checkouts_never_oversell(pos_db, make_product, scalar):
+    pid = make_product(stock=5)
+    results, errors = [], []
+    start = threading.Barrier(10)
+
+    def checkout():
+        start.wait()
+        try:
+            results.append(pos_db.save_sale([(pid, 1, 1000.0)]))
+        except InsufficientStockError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=checkout) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 5 and len(errors) == 5
+    assert scalar("SELECT stock FROM products WHERE id = ?", (pid,)) == 0
+    assert scalar("SELECT COUNT(*) FROM sales") == 5
@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+
+
+def test_failed_commit_rolls_back_and_writer_stays_usable(pos_db, make_product):
+    # Regresi: COMMIT yang gagal dulu meninggalkan transaksi terbuka di koneksi writer,
+    # sehingga transaksi berikutnya ikut ter-rollback.
+    with pos_db.transaction() as conn:
+        conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE child (parent_id INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED)")
+    pos_db.get_manager()._writer.execute("PRAGMA foreign_keys = ON")
+    pid = make_product(stock=10)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with pos_db.transaction() as conn:
+            conn.execute("INSERT INTO child VALUES (99)")   # FK dicek saat COMMIT
+
+    assert not pos_db.get_manager()._writer.in_transaction
+    sale_id = pos_db.save_sale([(pid, 1, 1000.0)])
+    pos_db.close_connections()
+
+    conn = sqlite3.connect(pos_db.DB_PATH)
+    try:
+        assert conn.execute("SELECT id FROM sales").fetchall() == [(sale_id,)]
+        assert conn.execute("SELECT COUNT(*) FROM child").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_error_in_nested_transaction_rolls_back_outer(pos_db, make_product, scalar):
+    pid = make_product(stock=10)
+
+    with pytest.raises(RuntimeError):
+        with pos_db.transaction() as outer:
+            outer.execute("UPDATE products SET stock = 1 WHERE id = ?", (pid,))
+            with pos_db.transaction() as inner:
+                inner.execute("UPDATE products SET stock = 2 WHERE id = ?", (pid,))
+                raise RuntimeError("gagal")
+
+    assert pos_db.get_manager()._depth == 0
+    assert scalar("SELECT stock FROM products WHERE id = ?", (pid,)) == 10
@@ -0,0 +1,83 @@
+from datetime import date, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.forecast import (  # noqa: E402
+    SalesHistory, days_of_cover, forecast_demand, history_days_needed, load_sales_history, reorder_list
+)
+
+SETTINGS = {"method": "sma", "window": 7, "alpha": 0.1, "history_days": 30, "lead_time_days": 7, "target_days": 30}
+
+
+def history(stock, sales, days=7, age_days=None):
+    """``sales`` = [(index produk, hari ke-, qty)]."""
+    n = len(stock)
+    rows = np.array(sales, dtype=np.float64).reshape(-1, 3)
+    return SalesHistory(
+        np.arange(1, n + 1, dtype=np.int64), [f"Produk {i + 1}" for i in range(n)],
+        np.array(stock, dtype=np.float64), np.array(age_days or [days] * n, dtype=np.int64),
+        rows[:, 0].astype(np.int64), rows[:, 1].astype(np.int64), rows[:, 2],
+        days, date(2025, 3, 31),
+    )
+
+
+def test_empty_history_has_no_demand():
+    empty = history([5, 0], [])
+
+    assert forecast_demand(empty, "sma", window=7).tolist() == [0.0, 0.0]
+    assert forecast_demand(empty, "ewma").tolist() == [0.0, 0.0]
+    assert reorder_list(empty, SETTINGS) == []
+
+
+def test_moving_average_and_cover():
+    small = history([10, 3], [(0, day, 2) for day in range(7)] + [(1, 6, 7)])
+
+    demand = forecast_demand(small, "sma", window=7)
+
+    assert demand.tolist() == [2.0, 1.0]
+    assert days_of_cover(small.stock, demand).tolist() == [5.0, 3.0]
+
+
+def test_ewma_of_constant_demand_is_that_demand():
+    steady = history([100], [(0, day, 4) for day in range(30)], days=30)
+
+    assert forecast_demand(steady, "ewma", alpha=0.2)[0] == pytest.approx(4.0)
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        forecast_demand(history([1], []), "arima")
+
+
+def test_reorder_list_orders_by_days_left():
+    small = history([10, 3, 50], [(0, day, 2) for day in range(7)] + [(1, 6, 7)] + [(2, 6, 7)])
+
+    result = reorder_list(small, SETTINGS)
+
+    assert [row[0] for row in result] == [2, 1]
+    product_id, name, stock, demand, days_left, empty_on, order_qty = result[0]
+    assert (stock, demand, days_left, empty_on) == (3, 1.0, 3.0, date(2025, 4, 3))
+    assert order_qty == 34     # 1/hari x (7 + 30) hari - stok 3
+
+
+def test_history_days_needed():
+    assert history_days_needed({**SETTINGS, "method": "sma"}) == 7
+    assert history_days_needed({**SETTINGS, "method": "ewma", "alpha": 1.0}) == 1
+    assert history_days_needed({**SETTINGS, "method": "ewma", "alpha": 0.01}) == 30   # dibatasi history_days
+
+
+def test_load_sales_history_from_rollups(pos_db, make_product):
+    today = date.today()
+    first = make_product("Gula", stock=20)
+    make_product("Kopi", stock=5)
+    for days_ago in (0, 1, 2):
+        day = today - timedelta(days=days_ago)
+        pos_db.save_sale([(first, 3, 1000.0)], sale_date=f"{day.isoformat()} 10:00:00")
+
+    loaded = load_sales_history(history_days=7, today=today)
+
+    assert loaded.product_ids.tolist() == [first, first + 1]
+    assert loaded.stock.tolist() == [11.0, 5.0]
+    assert forecast_demand(loaded, "sma", window=3).tolist() == [3.0, 0.0]
@@ -0,0 +1,57 @@
+import pytest
+
+from app.services.imports import parse_price, parse_stock, import_products_csv
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("12000", 12000.0),
+    ("12.000", 12000.0),
+    ("Rp 12.000", 12000.0),
+    ("1.234.567", 1234567.0),
+    ("12,50", 12.5),
+    ("1.234,5", 1234.5),
+    (" Rp 1.500,00", 1500.0),
+    ("12.50", 12.5),            # regresi: dulu menjadi 1250
+    ("1,234.56", 1234.56),      # regresi: dulu menjadi 1.23456
+    ("1,234,567", 1234567.0),
+    ("-5", -5.0),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
+
+
+@pytest.mark.parametrize("text", ["1,234", "1234.567", "1.234.56", "1,234,56", "1.2.3", "12.", "abc", ""])
+def test_parse_price_rejects_ambiguous_values(text):
+    with pytest.raises(ValueError):
+        parse_price(text)
+
+
+@pytest.mark.parametrize("text, expected", [("1.200", 1200), ("1200", 1200), ("", 0)])
+def test_parse_stock(text, expected):
+    assert parse_stock(text) == expected
+
+
+def test_parse_stock_rejects_fractions():
+    with pytest.raises(ValueError):
+        parse_stock("1.5")
+
+
+def test_ambiguous_price_is_reported_per_line(pos_db, tmp_path):
+    path = tmp_path / "produk.csv"
+    path.write_text(
+        "Nama Produk;Harga (Rp);Stok\n"
+        "Gula;12.000;5\n"
+        "Kopi;1,234;3\n"
+        "Teh;12.50;2\n",
+        encoding="utf-8",
+    )
+
+    result = import_products_csv(str(path))
+
+    assert result["inserted"] == 2
+    assert result["error_count"] == 1
+    assert result["errors"][0].startswith("Baris 3: harga tidak valid")
+    with pos_db.read_connection() as conn:
+        assert conn.execute("SELECT name, price FROM products ORDER BY id").fetchall() == [
+            ("Gula", 12000.0), ("Teh", 12.5)
+        ]
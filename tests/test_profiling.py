@@ -0,0 +1,66 @@
+import gc
+
+import pytest
+
+from app.database import profiling
+
+
+class ListLogger:
+    def __init__(self):
+        self.messages = []
+
+    def info(self, message):
+        self.messages.append(message)
+
+    error = info
+
+
+@pytest.fixture
+def profiler(pos_db, monkeypatch):
+    """Profiler yang mencatat setiap query sebagai query lambat; koneksi dibuka ulang terinstrumentasi."""
+    logger = ListLogger()
+    monkeypatch.setattr(profiling, "_profiler", profiling.QueryProfiler(slow_ms=0, explain=True, logger=logger))
+    pos_db.close_connections()
+    pos_db.get_manager()
+    yield logger
+    pos_db.close_connections()
+
+
+def slow_logs(logger, sql):
+    return [m for m in logger.messages if m.startswith("SLOW QUERY") and sql in m]
+
+
+def test_exhausted_select_is_logged_with_plan(pos_db, profiler):
+    sql = "SELECT id, name FROM products WHERE stock >= ?"
+    with pos_db.read_connection() as conn:
+        assert conn.execute(sql, (0,)).fetchall() == []
+
+    [message] = slow_logs(profiler, sql)
+    assert "params=tuple[1]" in message
+    assert "\n    " in message     # EXPLAIN QUERY PLAN ikut dicatat
+
+
+def test_cursor_dropped_after_fetchone_does_not_touch_connection(pos_db, profiler, make_product, monkeypatch):
+    make_product("Gula")
+    make_product("Kopi")
+    explained = []
+    monkeypatch.setattr(profiling, "explain_plan", lambda *args: explained.append(args) or [])
+
+    sql = "SELECT name FROM products WHERE price > ? ORDER BY id"
+    with pos_db.read_connection() as conn:
+        cursor = conn.execute(sql, (0,))
+        assert cursor.fetchone() == ("Gula",)
+    # Koneksi sudah kembali ke pool; cursor baru dibuang sesudahnya
+    del cursor
+    gc.collect()
+
+    [message] = slow_logs(profiler, sql)
+    assert "rows=1" in message and "\n" not in message
+    assert explained == []
+
+    manager = pos_db.get_manager()
+    assert manager._readers.qsize() == pos_db.READER_POOL_SIZE
+    for _ in range(pos_db.READER_POOL_SIZE + 1):
+        with pos_db.read_connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM products").fetchone() == (2,)
@@ -0,0 +1,29 @@
+def enqueue(pos_db, sale_id, lane):
+    with pos_db.transaction() as conn:
+        return pos_db.enqueue_receipt(conn.cursor(), sale_id, 10000.0, 0.0, lane=lane)
+
+
+def test_each_lane_claims_only_its_own_jobs(pos_db, make_product, scalar):
+    pid = make_product(stock=10)
+    sales = [pos_db.save_sale([(pid, 1, 1000.0)]) for _ in range(3)]
+    enqueue(pos_db, sales[0], "kasir-1")
+    enqueue(pos_db, sales[1], "kasir-2")
+    enqueue(pos_db, sales[2], "")           # job dari database lama, tanpa lane
+
+    claimed = pos_db.claim_due_receipt_jobs(lane="kasir-1")
+
+    assert sorted(job[1] for job in claimed) == [sales[0], sales[2]]
+    assert pos_db.claim_due_receipt_jobs(lane="kasir-1") == []
+    assert [job[1] for job in pos_db.claim_due_receipt_jobs(lane="kasir-2")] == [sales[1]]
+    assert scalar("SELECT COUNT(*) FROM receipt_jobs WHERE status = 'printing'") == 3
+
+
+def test_interrupted_jobs_are_requeued_for_their_lane(pos_db, make_product):
+    pid = make_product(stock=10)
+    enqueue(pos_db, pos_db.save_sale([(pid, 1, 1000.0)]), "kasir-1")
+    pos_db.claim_due_receipt_jobs(lane="kasir-1")
+
+    assert pos_db.requeue_interrupted_receipts(lane="kasir-2") == 0
+    assert pos_db.requeue_interrupted_receipts(lane="kasir-1") == 1
+    assert pos_db.count_pending_receipts(lane="kasir-1") == 1
+    assert len(pos_db.claim_due_receipt_jobs(lane="kasir-1")) == 1
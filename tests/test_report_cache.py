@@ -0,0 +1,80 @@
+import csv
+from datetime import datetime
+
+from app.services import reports
+from app.services.exports import export_report_csv
+from app.services.report_cache import ReportCache, get_report_cache
+
+
+def previous_month(today):
+    return (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+
+
+def test_open_period_invalidated_after_sale(pos_db, make_product):
+    pid = make_product(stock=100)
+    now = datetime.now()
+    closed = previous_month(now)
+    pos_db.save_sale([(pid, 2, 1000.0)], sale_date=f"{closed[0]}-{closed[1]:02d}-10 09:00:00")
+
+    assert reports.fetch_report_totals(now.year, now.month) == (0, 0, 0)
+    assert reports.fetch_report_totals(*closed) == (1, 2000.0, 2)
+
+    pos_db.save_sale([(pid, 1, 1000.0)])
+
+    # Bulan berjalan dihitung ulang; bulan yang sudah lewat tetap dari cache
+    assert reports.fetch_report_totals(now.year, now.month) == (1, 1000.0, 1)
+    cache = get_report_cache()
+    hits = cache.hits
+    assert reports.fetch_report_totals(*closed) == (1, 2000.0, 2)
+    assert cache.hits == hits + 1
+
+
+def test_keyword_and_default_arguments_share_a_key(pos_db):
+    cache = get_report_cache()
+    reports.fetch_report_page(2025, 3)
+    reports.fetch_report_page(2025, 3, limit=reports.REPORT_PAGE_SIZE)
+    reports.fetch_report_page(year=2025, month=3, after=None)
+
+    assert (cache.misses, cache.hits, len(cache)) == (1, 2, 1)
+
+
+def test_export_reads_database_not_cache(pos_db, make_product, tmp_path):
+    pid = make_product(stock=100)
+    for day in range(1, 4):
+        pos_db.save_sale([(pid, day, 1000.0)], sale_date=f"2025-03-{day:02d} 10:00:00")
+    cache = get_report_cache()
+
+    count = export_report_csv(str(tmp_path / "laporan.csv"), 2025, 3)
+
+    assert count == 3
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+    with open(tmp_path / "laporan.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[-1] == ["", "TOTAL", "", "6", "Rp 6.000"]
+
+
+def test_cache_file_is_keyed_by_database(tmp_path):
+    path = str(tmp_path / "report_cache.db")
+    database = {"name": "toko-a.db"}
+    ReportCache(path=path, database=lambda: database["name"]).put(("totals", 2020, 1), (1, 2.0, 3))
+
+    reopened = ReportCache(path=path, database=lambda: database["name"])
+    assert reopened.get(("totals", 2020, 1)) == (True, (1, 2.0, 3))
+    database["name"] = "toko-b.db"
+    assert reopened.get(("totals", 2020, 1)) == (False, None)
+
+
+def test_cache_file_round_trips_nested_results(tmp_path):
+    value = {
+        "top": [(1, "Gula", 3, 12000.0)],
+        "comparison": {"current": {"revenue": 1.5, "start": "2020-01-01"}, "vs_previous": {"revenue": None}},
+        "heatmap": [[0, 1], [2, 3]],
+        "by_key": {(2020, 1): (1, 2)},
+    }
+    path = str(tmp_path / "report_cache.db")
+    ReportCache(path=path).put(("analytics", 2020, 1, 10), value)
+
+    found, restored = ReportCache(path=path).get(("analytics", 2020, 1, 10))
+
+    assert found and restored == value
+    assert type(restored["top"][0]) is tuple and type(restored["heatmap"][0]) is list
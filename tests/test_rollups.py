@@ -0,0 +1,66 @@
+import random
+
+RAW_DAILY = """
+    SELECT substr(s.sale_date, 1, 10), COUNT(DISTINCT s.id), SUM(si.qty * si.price), SUM(si.qty)
+    FROM sales s JOIN sales_items si ON s.id = si.sale_id
+    GROUP BY 1 ORDER BY 1
+"""
+RAW_MONTHLY = """
+    SELECT substr(s.sale_date, 1, 7), COUNT(DISTINCT s.id), SUM(si.qty * si.price), SUM(si.qty)
+    FROM sales s JOIN sales_items si ON s.id = si.sale_id
+    GROUP BY 1 ORDER BY 1
+"""
+RAW_HOURLY = """
+    SELECT substr(s.sale_date, 1, 10), CAST(substr(s.sale_date, 12, 2) AS INTEGER),
+           COUNT(DISTINCT s.id), SUM(si.qty * si.price), SUM(si.qty)
+    FROM sales s JOIN sales_items si ON s.id = si.sale_id
+    GROUP BY 1, 2 ORDER BY 1, 2
+"""
+RAW_PRODUCT_DAILY = """
+    SELECT substr(s.sale_date, 1, 10), si.product_id, SUM(si.qty), SUM(si.qty * si.price)
+    FROM sales s JOIN sales_items si ON s.id = si.sale_id
+    GROUP BY 1, 2 ORDER BY 1, 2
+"""
+
+
+def rows(pos_db, sql):
+    with pos_db.read_connection() as conn:
+        return conn.execute(sql).fetchall()
+
+
+def rollups(pos_db):
+    return {
+        "daily": rows(pos_db, "SELECT day, sales_count, revenue, items_qty FROM sales_daily ORDER BY 1"),
+        "monthly": rows(pos_db, "SELECT month, sales_count, revenue, items_qty FROM sales_monthly ORDER BY 1"),
+        "hourly": rows(pos_db, "SELECT day, hour, sales_count, revenue, items_qty FROM sales_hourly ORDER BY 1, 2"),
+        "product_daily": rows(pos_db, "SELECT day, product_id, qty, revenue FROM sales_product_daily ORDER BY 1, 2"),
+    }
+
+
+def record_random_sales(pos_db, make_product, count=200, seed=7):
+    rng = random.Random(seed)
+    products = [make_product(f"Produk {i}", price=500.0 * (i + 1), stock=100000) for i in range(8)]
+    for _ in range(count):
+        sale_date = f"2025-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d} {rng.randint(7, 21):02d}:{rng.randrange(60):02d}:00"
+        chosen = rng.sample(products, rng.randint(1, 4))
+        pos_db.save_sale([(pid, rng.randint(1, 5), 500.0 * pid) for pid in chosen], sale_date=sale_date)
+
+
+def test_rollups_match_raw_sales(pos_db, make_product, scalar):
+    record_random_sales(pos_db, make_product)
+
+    result = rollups(pos_db)
+    assert result["daily"] == rows(pos_db, RAW_DAILY)
+    assert result["monthly"] == rows(pos_db, RAW_MONTHLY)
+    assert result["hourly"] == rows(pos_db, RAW_HOURLY)
+    assert result["product_daily"] == rows(pos_db, RAW_PRODUCT_DAILY)
+    assert scalar("SELECT SUM(revenue) FROM sales_monthly") == scalar("SELECT SUM(total) FROM sales")
+
+
+def test_rebuild_rollups_gives_same_result(pos_db, make_product):
+    record_random_sales(pos_db, make_product, count=50)
+    incremental = rollups(pos_db)
+
+    pos_db.rebuild_rollups()
+
+    assert rollups(pos_db) == incremental